@@ -0,0 +1,3 @@
+"""
+benchmarks包初始化文件
+"""
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Batch Throughput Benchmark
+
+Compares CalculatorCore.evaluate_many against a per-call
+evaluate_expression loop on the same batch.
+
+Usage:
+    python -m benchmarks.batch_throughput [--count N] [--unique N]
+"""
+
+import argparse
+import random
+import time
+
+from core.calculator_core import CalculatorCore
+
+_TEMPLATES = [
+    '{a}+{b}*{c}',
+    '({a}-{b})/{c}',
+    'sin({a})+cos({b})',
+    '√({a})×{b}',
+    '{c}!+{a}x²',
+    'log({a})+ln({b})',
+]
+
+def build_batch(count, unique, seed=0):
+    """
+    Build a batch of expressions drawn from a fixed pool
+    
+    Args:
+        count (int): Batch size
+        unique (int): Number of distinct expressions in the pool
+        seed (int): Random seed
+    
+    Returns:
+        list: Expression strings
+    """
+    rng = random.Random(seed)
+    pool = [
+        rng.choice(_TEMPLATES).format(a=rng.randint(1, 360), b=rng.randint(1, 99), c=rng.randint(1, 9))
+        for _ in range(unique)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+def _time(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1_000_000, help='expressions per batch')
+    parser.add_argument('--unique', type=int, default=2000, help='distinct expressions in the batch')
+    args = parser.parse_args(argv)
+    
+    batch = build_batch(args.count, args.unique)
+    
+    def per_call():
+        core = CalculatorCore()
+        evaluate = core.evaluate_expression
+        for expression in batch:
+            evaluate(expression)
+    
+    runs = [
+        ('per-call loop', per_call),
+        ('evaluate_many', lambda: CalculatorCore().evaluate_many(batch)),
+        ('evaluate_many (no history)', lambda: CalculatorCore().evaluate_many(batch, record_history=False)),
+    ]
+    
+    print(f"{args.count} expressions, {args.unique} unique")
+    baseline = None
+    for name, func in runs:
+        elapsed = _time(func)
+        baseline = baseline or elapsed
+        print(f"{name:28s} {elapsed:8.3f} s  {args.count / elapsed:12,.0f} expr/s  x{baseline / elapsed:.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Bulk Formatting Benchmark
+
+Checks that utils.helpers.format_results and are_valid_numbers give
+exactly the output of format_result and is_valid_number applied one by
+one, for every notation and several digit counts, on calculator results,
+edge cases and NumPy arrays. Then times both on a large result set.
+
+Usage:
+    python -m benchmarks.bulk_format [--count N] [--unique N] [--no-numpy]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from core.calculator_core import CalculatorCore
+from utils import helpers
+from utils.helpers import NOTATIONS, are_valid_numbers, format_result, format_results, is_valid_number
+
+from .batch_throughput import build_batch
+
+EDGE_CASES = [
+    '0', '-0', '007', '-0.0', '2.0', '-2.5', '0.1', '0.30000000000000004', '1e5', '1E5', '1e16',
+    '1e-300', '5e-324', '999.9999999999', '123456789012345678', '0.3333333333333333333333333333',
+    '1606938044258990275541962092341162602522202993782792835301376', '9.990020930143845e+30102',
+    'inf', '-inf', 'nan', 'Error', '1/3', '1_000', ' 3 ', '',
+]
+
+def build_results(count, unique, seed=0):
+    """Calculator results of a random batch, with edge cases mixed in"""
+    rng = random.Random(seed)
+    core = CalculatorCore()
+    results = [result if isinstance(result, str) else "Error"
+               for result in core.evaluate_many(build_batch(count, unique, seed), record_history=False)]
+    results += [repr(rng.uniform(-1, 1) * 10 ** rng.randint(-20, 20)) for _ in range(unique)]
+    results += EDGE_CASES
+    rng.shuffle(results)
+    return results
+
+def check_equivalence(results):
+    """
+    Compare the bulk functions with the scalar ones
+    
+    Returns:
+        list: Descriptions of mismatches (empty when equivalent)
+    """
+    numpy = helpers._numpy()
+    problems = []
+    numbers = [float(result) for result in results if is_valid_number(result)]
+    for notation in NOTATIONS:
+        for digits in (1, 3, 4, 10, 15):
+            inputs = [('strings', results, results), ('numbers', numbers, numbers)]
+            if numpy is not None:
+                cubes = [value ** 3 for value in range(-500, 500)]
+                inputs.append(('float array', numpy.array(numbers), numbers))
+                inputs.append(('int array', numpy.array(cubes), cubes))
+            for name, values, scalars in inputs:
+                expected = [format_result(value, digits, notation) for value in scalars]
+                if format_results(values, digits, notation) != expected:
+                    problems.append(f"format_results differs on {name} ({notation}, {digits} digits)")
+    if are_valid_numbers(results) != [is_valid_number(result) for result in results]:
+        problems.append("are_valid_numbers differs")
+    return problems
+
+def _time(func, repeat=5):
+    """Best of `repeat` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=200000, help='results to format')
+    parser.add_argument('--unique', type=int, default=20000, help='distinct expressions')
+    parser.add_argument('--no-numpy', action='store_true', help='run as if NumPy were not installed')
+    args = parser.parse_args(argv)
+    if args.no_numpy:
+        helpers._numpy = lambda: None
+    
+    problems = check_equivalence(build_results(2000, 1000, seed=1))
+    for problem in problems:
+        print(f"MISMATCH: {problem}")
+    print(f"equivalence: {'FAILED' if problems else 'ok'} (NumPy {'off' if helpers._numpy() is None else 'on'})")
+    
+    results = build_results(args.count, args.unique)
+    distinct = len(set(results))
+    print(f"{len(results)} results, {distinct} distinct")
+    cases = [
+        ('format', lambda: [format_result(result) for result in results], lambda: format_results(results)),
+        ('format sci', lambda: [format_result(result, 6, 'sci') for result in results],
+         lambda: format_results(results, 6, 'sci')),
+        ('validate', lambda: [is_valid_number(result) for result in results], lambda: are_valid_numbers(results)),
+    ]
+    for name, scalar, bulk in cases:
+        scalar_time, bulk_time = _time(scalar), _time(bulk)
+        print(f"{name:12s} scalar {scalar_time:7.3f} s  bulk {bulk_time:7.3f} s  x{scalar_time / bulk_time:.1f}")
+    
+    unique = list(set(results))
+    scalar_time = _time(lambda: [format_result(result) for result in unique])
+    bulk_time = _time(lambda: format_results(unique))
+    print(f"{'all distinct':12s} scalar {scalar_time:7.3f} s  bulk {bulk_time:7.3f} s  x{scalar_time / bulk_time:.1f}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
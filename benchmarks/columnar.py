@@ -0,0 +1,122 @@
+"""
+Columnar Streaming Benchmark
+
+Writes random input columns to a temporary directory (in chunks, so the
+benchmark itself stays small), then streams formulas over them from
+memory-mapped binary files and from CSV, at several chunk sizes. Reports
+rows/sec and the peak memory allocated while streaming (traced in a
+second run), which depends on the chunk size and not on the file size,
+against a loop sending one substituted expression per row through
+evaluate_expression.
+
+Usage:
+    python -m benchmarks.columnar [--rows N] [--csv-rows N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from core.calculator_core import CalculatorCore
+from core.columnar import BinaryColumns, BinaryColumnWriter, CSVColumns, CSVWriter
+from core.vectorized import np
+
+FORMULAS = ['r = sqrt(x²+y²)', 'phi = atan(y/x)', 'z = sin(x)*r+ln(r+1)']
+CHUNK_SIZES = (1 << 12, 1 << 16, 1 << 20)
+
+def write_inputs(directory, rows, csv_rows, seed=0):
+    """
+    Write x and y as raw float64 files, and the first csv_rows of them as CSV
+    
+    Returns:
+        tuple: (dict of column name -> binary path, CSV path)
+    """
+    rng = np.random.default_rng(seed)
+    paths = {name: os.path.join(directory, f"{name}.f64") for name in ('x', 'y')}
+    csv_path = os.path.join(directory, 'input.csv')
+    files = {name: open(path, 'wb') for name, path in paths.items()}
+    with open(csv_path, 'w', encoding='utf-8') as csv_file:
+        csv_file.write('x,y\n')
+        written = 0
+        while written < rows:
+            count = min(1 << 20, rows - written)
+            x, y = rng.uniform(-100, 100, count), rng.uniform(-100, 100, count)
+            x.tofile(files['x'])
+            y.tofile(files['y'])
+            if written < csv_rows:
+                part = min(count, csv_rows - written)
+                csv_file.write('\n'.join(f"{a!r},{b!r}" for a, b in zip(x[:part].tolist(), y[:part].tolist())))
+                csv_file.write('\n')
+            written += count
+    for file in files.values():
+        file.close()
+    return paths, csv_path
+
+def peak_allocated(run, *args):
+    """Peak memory allocated by run(*args), in MiB (NumPy buffers included)"""
+    tracemalloc.start()
+    try:
+        run(*args)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+def run_binary(core, paths, directory, chunk_rows):
+    source = BinaryColumns(paths)
+    writer = BinaryColumnWriter({name: os.path.join(directory, f"{name}.out") for name in ('r', 'phi', 'z')})
+    try:
+        return core.evaluate_columns(FORMULAS, source, writer, chunk_rows)
+    finally:
+        writer.close()
+        source.close()
+
+def run_csv(core, csv_path, directory, chunk_rows):
+    source = CSVColumns(csv_path)
+    writer = CSVWriter(os.path.join(directory, 'output.csv'), ['r', 'phi', 'z'])
+    try:
+        return core.evaluate_columns(FORMULAS, source, writer, chunk_rows)
+    finally:
+        writer.close()
+        source.close()
+
+def run_per_row(core, paths, rows):
+    """The per-row loop this replaces, on the first rows; returns rows/sec"""
+    x, y = (np.memmap(paths[name], np.float64, mode='r')[:rows].tolist() for name in ('x', 'y'))
+    start = time.perf_counter()
+    for a, b in zip(x, y):
+        r = core.evaluate_expression(f"sqrt(({a!r})²+({b!r})²)")
+        core.evaluate_expression(f"atan(({b!r})/({a!r}))")
+        core.evaluate_expression(f"sin({a!r})*{r}+ln({r}+1)")
+    return rows / (time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20_000_000, help='rows of the binary input')
+    parser.add_argument('--csv-rows', type=int, default=500_000, help='rows of the CSV input')
+    parser.add_argument('--per-row', type=int, default=20_000, help='rows for the evaluate_expression loop')
+    args = parser.parse_args(argv)
+    if np is None:
+        print("NumPy is not installed")
+        return 1
+    
+    core = CalculatorCore()
+    with tempfile.TemporaryDirectory() as directory:
+        paths, csv_path = write_inputs(directory, args.rows, min(args.csv_rows, args.rows))
+        size = sum(os.path.getsize(path) for path in paths.values()) / 2 ** 20
+        print(f"binary input: {args.rows:,} rows, {size:,.0f} MiB; "
+              f"CSV input: {min(args.csv_rows, args.rows):,} rows, {os.path.getsize(csv_path) / 2 ** 20:,.0f} MiB")
+        print(f"{'source':8s} {'chunk rows':>10s} {'rows/s':>14s} {'seconds':>8s} {'peak MiB':>9s}")
+        for name, run, target in (('binary', run_binary, paths), ('csv', run_csv, csv_path)):
+            for chunk_rows in CHUNK_SIZES:
+                state = run(core, target, directory, chunk_rows)
+                peak = peak_allocated(run, core, target, directory, chunk_rows)
+                print(f"{name:8s} {chunk_rows:10,d} {state.rows_per_sec:14,.0f} {state.elapsed:8.2f} {peak:9,.1f}")
+        rate = run_per_row(core, paths, min(args.per_row, args.rows))
+        print(f"{'per-row evaluate_expression':30s} {rate:12,.0f} rows/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Numerical Methods Benchmark
+
+Compares solve(), integrate() and derivative() with what they replace:
+substituting each point into the expression text and sending the string
+through evaluate_expression (bisection, composite Simpson's rule and a
+central difference). Reports the answers, evaluation counts and times,
+with and without vectorized NumPy batches.
+
+Usage:
+    python -m benchmarks.numerics [--repeat N]
+"""
+
+import argparse
+import math
+import sys
+import time
+
+from core.calculator_core import CalculatorCore
+from core.numerics import compile_function, derivative, integrate, solve
+from core.vectorized import HAS_NUMPY
+
+# (expression, bracket, exact root) in radians
+ROOTS = [
+    ('cos(x)-x', (0, 1), 0.7390851332151607),
+    ('x^3-2*x-5', (2, 3), 2.0945514815423265),
+    ('exp(-x)-x^2', (0, 1), 0.7034674224983917),
+]
+# (expression, a, b, exact integral) in radians
+INTEGRALS = [
+    ('sin(x)', 0, math.pi, 2.0),
+    ('exp(-x^2)', -5, 5, math.sqrt(math.pi) * math.erf(5)),
+    ('sqrt(x)*ln(x+1)', 0, 1, 2 / 3 * math.log(2) - math.pi / 3 + 8 / 9),
+    ('1/(1+25*x^2)', -1, 1, 0.4 * math.atan(5)),
+]
+# (expression, point, exact derivative) in radians
+DERIVATIVES = [
+    ('sin(x)*x²', 1.0, math.cos(1) + 2 * math.sin(1)),
+    ('exp(x)/(1+x^2)', 0.5, math.exp(0.5) * (1 - 0.5) ** 2 / (1 + 0.25) ** 2),
+    # Close to the edge of the domain
+    ('ln(x)', 0.05, 20.0),
+    ('sqrt(x)', 0.01, 5.0),
+    ('asin(x)', 0.95, 1 / math.sqrt(1 - 0.95 ** 2)),
+]
+
+def _text(expression, x):
+    """Expression text with the point substituted, as callers used to build it"""
+    return expression.replace('exp', '\0').replace('x', f"({x!r})").replace('\0', 'exp')
+
+def bisect_by_text(core, expression, a, b, tolerance=1e-12):
+    """Bisection through evaluate_expression; returns (root, evaluations)"""
+    fa = float(core.evaluate_expression(_text(expression, a)))
+    evaluations = 1
+    while b - a > tolerance:
+        middle = 0.5 * (a + b)
+        fm = float(core.evaluate_expression(_text(expression, middle)))
+        evaluations += 1
+        if (fm > 0) == (fa > 0):
+            a, fa = middle, fm
+        else:
+            b = middle
+    return 0.5 * (a + b), evaluations
+
+def simpson_by_text(core, expression, a, b, intervals=2000):
+    """Composite Simpson's rule through evaluate_expression; returns (integral, evaluations)"""
+    h = (b - a) / intervals
+    total = 0.0
+    for index in range(intervals + 1):
+        weight = 1 if index in (0, intervals) else 4 if index % 2 else 2
+        total += weight * float(core.evaluate_expression(_text(expression, a + index * h)))
+    return total * h / 3, intervals + 1
+
+def difference_by_text(core, expression, x, h=1e-5):
+    """Central difference through evaluate_expression; returns (derivative, evaluations)"""
+    high = float(core.evaluate_expression(_text(expression, x + h)))
+    low = float(core.evaluate_expression(_text(expression, x - h)))
+    return (high - low) / (2 * h), 2
+
+def _timed(func, repeat):
+    best, result = math.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def _report(name, exact, results):
+    print(name)
+    for label, (elapsed, (value, evaluations)) in results:
+        print(f"  {label:16s} {value:<22.16g} error {abs(value - exact):8.1e}  "
+              f"{evaluations:6d} evaluations  {elapsed * 1000:9.3f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is kept)')
+    args = parser.parse_args(argv)
+    
+    core = CalculatorCore(cache_size=0)  # Every substituted string is new anyway
+    core.set_angle_mode('rad')
+    modes = [('compiled', False)] + ([('compiled+numpy', True)] if HAS_NUMPY else [])
+    
+    def built_in(method, expression, use_numpy, *args):
+        def run():
+            result = method(compile_function(expression, 'x', 'rad', use_numpy), *args)
+            return result.value, result.evaluations
+        return run
+    
+    for expression, bracket, exact in ROOTS:
+        results = [('evaluate loop', _timed(lambda: bisect_by_text(core, expression, *bracket), args.repeat))]
+        results += [(label, _timed(built_in(solve, expression, use_numpy, bracket), args.repeat))
+                    for label, use_numpy in modes]
+        _report(f"solve {expression} in {bracket}", exact, results)
+    
+    for expression, a, b, exact in INTEGRALS:
+        results = [('evaluate loop', _timed(lambda: simpson_by_text(core, expression, a, b), args.repeat))]
+        results += [(label, _timed(built_in(integrate, expression, use_numpy, a, b), args.repeat))
+                    for label, use_numpy in modes]
+        _report(f"integrate {expression} over [{a}, {b:.6g}]", exact, results)
+    
+    for expression, x, exact in DERIVATIVES:
+        results = [('evaluate loop', _timed(lambda: difference_by_text(core, expression, x), args.repeat))]
+        results += [(label, _timed(built_in(derivative, expression, use_numpy, x), args.repeat))
+                    for label, use_numpy in modes]
+        _report(f"derivative of {expression} at {x}", exact, results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Expression Optimizer Benchmark
+
+Checks that compiling with constant folding, common subexpression
+elimination and memoized pure calls (compile_tree(optimize=True)) gives
+exactly the results of the plain compiler, on the suite corpora, on
+expressions with variables (scalar and NumPy) and on their errors. Then
+times both.
+
+Usage:
+    python -m benchmarks.optimizer [--size N] [--points N]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from core import compiler
+from core.compiler import CONSTANTS, FUNCTION_TABLES, compile_tree
+from core.parser import parse
+from core.vectorized import NUMPY_FUNCTION_TABLES, np
+
+from .suite import build_corpora
+
+# Expressions with free variables x and y, several with repeated subexpressions
+VARIABLE_EXPRESSIONS = [
+    'sin(x)^2+cos(x)^2',
+    'sin(x)*sin(x)+sin(x)/(1+sin(x))',
+    '(x^2+y^2)*sqrt(x^2+y^2)-ln(x^2+y^2)',
+    'exp(-x^2/2)/sqrt(2*pi)+exp(-x^2/2)*y',
+    '(sin(30)+cos(60))*x+log(1000)*y',
+    'factorial(20)/factorial(18)*x-12!/10!',
+    'abs(x-y)/(abs(x-y)+1)+abs(x-y)',
+    'tan(x)+cot(x)-1/0',
+    '-x+-x*-(y)',
+    'x',
+]
+
+def _outcome(func, *args):
+    """Result, or exception type and message, of func(*args)"""
+    try:
+        value = func(*args)
+    except Exception as error:
+        return ('error', type(error).__name__, str(error))
+    return ('value', type(value).__name__, repr(value))
+
+def _compiled_pair(tree, functions, variables=()):
+    """(plain, optimized) compiled expressions"""
+    return tuple(compile_tree(tree, functions, CONSTANTS, variables, optimize=optimize) for optimize in (False, True))
+
+def check_equivalence(corpora, points):
+    """
+    Compare optimized and plain compilation
+    
+    Returns:
+        list: Descriptions of mismatches (empty when equivalent)
+    """
+    problems = []
+    for mode in FUNCTION_TABLES:
+        functions = FUNCTION_TABLES[mode]
+        for expressions in corpora.values():
+            for expression in expressions:
+                tree = parse(expression.replace('×', '*').replace('÷', '/'))
+                plain, optimized = _compiled_pair(tree, functions)
+                if _outcome(plain.evaluate, ()) != _outcome(optimized.evaluate, ()):
+                    problems.append(f"{expression!r} ({mode})")
+        
+        for expression in VARIABLE_EXPRESSIONS:
+            tree = parse(expression)
+            plain, optimized = _compiled_pair(tree, functions, ('x', 'y'))
+            for x, y in points:
+                if _outcome(plain, x, y) != _outcome(optimized, x, y):
+                    problems.append(f"{expression!r} at x={x!r}, y={y!r} ({mode})")
+                    break
+            if np is not None:
+                x, y = (np.array(column) for column in zip(*points))
+                with np.errstate(all='ignore'):
+                    plain, optimized = _compiled_pair(tree, NUMPY_FUNCTION_TABLES[mode], ('x', 'y'))
+                    expected, actual = _outcome(plain, x, y), _outcome(optimized, x, y)
+                    if expected[0] == 'error' or actual[0] == 'error':
+                        equal = expected == actual
+                    else:
+                        equal = np.array_equal(plain(x, y), optimized(x, y), equal_nan=True)
+                if not equal:
+                    problems.append(f"{expression!r} over arrays ({mode})")
+    return problems
+
+def _best_time(func, repeat=5):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _report(name, plain_time, optimized_time):
+    print(f"{name:28s} plain {plain_time * 1000:9.2f} ms  optimized {optimized_time * 1000:9.2f} ms"
+          f"  x{plain_time / optimized_time:.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=200, help='expressions per corpus')
+    parser.add_argument('--points', type=int, default=2000, help='variable values per expression')
+    args = parser.parse_args(argv)
+    
+    rng = random.Random(0)
+    points = [(rng.uniform(-10, 10), rng.uniform(-10, 10)) for _ in range(args.points)]
+    points += [(0.0, -0.0), (-0.0, 0.0), (1, 2), (90, 45), (0.5, 0.5)]
+    corpora = build_corpora(args.size)
+    problems = check_equivalence(corpora, points)
+    for problem in problems:
+        print(f"MISMATCH: {problem}")
+    print(f"equivalence: {'FAILED' if problems else 'ok'}")
+    
+    functions = FUNCTION_TABLES['deg']
+    for corpus, expressions in corpora.items():
+        trees = [parse(expression.replace('×', '*').replace('÷', '/')) for expression in expressions]
+        pairs = [_compiled_pair(tree, functions) for tree in trees]
+        
+        def run(which):
+            for pair in pairs:
+                try:
+                    pair[which].evaluate(())
+                except Exception:
+                    pass
+        
+        _report(f"evaluate/{corpus}", _best_time(lambda: run(0)), _best_time(lambda: run(1)))
+        
+        def compile_and_run(optimize):
+            for tree in trees:
+                try:
+                    compile_tree(tree, functions, CONSTANTS, optimize=optimize).evaluate(())
+                except Exception:
+                    pass
+        
+        _report(f"compile+evaluate/{corpus}", _best_time(lambda: compile_and_run(False)),
+                _best_time(lambda: compile_and_run(True)))
+    
+    # Distinct expressions sharing a large factorial: the pure call cache
+    # computes it once across compilations
+    factorials = [parse(f"3000!%{n}") for n in range(2, 200)]
+    
+    def compile_factorials(optimize):
+        for tree in factorials:
+            compile_tree(tree, functions, CONSTANTS, optimize=optimize).evaluate(())
+    
+    _report("compile+evaluate/3000!", _best_time(lambda: compile_factorials(False)),
+            _best_time(lambda: compile_factorials(True)))
+    
+    for expression in VARIABLE_EXPRESSIONS[:6]:
+        plain, optimized = _compiled_pair(parse(expression), functions, ('x', 'y'))
+        
+        def sweep(compiled):
+            for x, y in points:
+                try:
+                    compiled(x, y)
+                except Exception:
+                    pass
+        
+        _report(f"points/{expression[:21]}", _best_time(lambda: sweep(plain)), _best_time(lambda: sweep(optimized)))
+    
+    if np is not None:
+        x, y = (np.array(column) for column in zip(*(points * 100)))
+        for expression in VARIABLE_EXPRESSIONS[:6]:
+            plain, optimized = _compiled_pair(parse(expression), NUMPY_FUNCTION_TABLES['deg'], ('x', 'y'))
+            with np.errstate(all='ignore'):
+                _report(f"arrays/{expression[:21]}", _best_time(lambda: plain(x, y)),
+                        _best_time(lambda: optimized(x, y)))
+    
+    print(f"pure call cache: {compiler.PURE_CALL_CACHE.stats()}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
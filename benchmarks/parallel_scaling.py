@@ -0,0 +1,55 @@
+"""
+Parallel Scaling Benchmark
+
+Times ParallelEvaluator on a CPU-heavy batch (big-integer powers) with
+an increasing number of worker processes, against a single-process
+evaluate_many baseline.
+
+Usage:
+    python -m benchmarks.parallel_scaling [--count N] [--max-workers N]
+"""
+
+import argparse
+import os
+import time
+
+from core.calculator_core import CalculatorCore
+from core.parallel import ParallelEvaluator
+
+def build_batch(count):
+    """
+    Build distinct CPU-heavy expressions (a few ms each)
+    
+    Args:
+        count (int): Batch size
+    
+    Returns:
+        list: Expression strings
+    """
+    return [f"({3 + i % 5}^{150000 + i})%1000003" for i in range(count)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=400, help='expressions per batch')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='largest pool size tried')
+    args = parser.parse_args(argv)
+    
+    batch = build_batch(args.count)
+    
+    start = time.perf_counter()
+    CalculatorCore().evaluate_many(batch, record_history=False)
+    baseline = time.perf_counter() - start
+    print(f"{'single process':16s} {baseline:8.3f} s  {args.count / baseline:10,.0f} expr/s  x1.0")
+    
+    workers = 1
+    while workers <= args.max_workers:
+        with ParallelEvaluator(workers=workers, timeout=10) as evaluator:
+            evaluator.map(['1'] * workers)  # Start worker processes outside the timing
+            start = time.perf_counter()
+            evaluator.map(batch)
+            elapsed = time.perf_counter() - start
+        print(f"{workers:2d} workers       {elapsed:8.3f} s  {args.count / elapsed:10,.0f} expr/s  x{baseline / elapsed:.1f}")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Service Load Benchmark
+
+Starts a CalculatorService in-process and drives it with many sessions
+spread over a few pipelined connections, checking every result against
+CalculatorCore. Also times one expensive expression while the cheap load
+runs, to show it does not stall the event loop.
+
+Usage:
+    python -m benchmarks.service_load [--sessions N] [--connections N] [--requests N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from core.calculator_core import CalculatorCore
+from core.service import CalculatorService, ServiceClient
+
+from .batch_throughput import build_batch
+
+async def _drive(address, sessions, requests, expressions, expected):
+    """Send `requests` pipelined evaluations per session on one connection"""
+    client = await ServiceClient.connect(*address)
+    futures = []
+    for index in range(requests):
+        for session in sessions:
+            expression = expressions[(index + len(futures)) % len(expressions)]
+            futures.append((expression, client.send('evaluate', session=session, expression=expression)))
+    errors = 0
+    for expression, future in futures:
+        response = await future
+        if response.get('result') != expected[expression]:
+            errors += 1
+    await client.close()
+    return errors
+
+async def run(session_count, connection_count, requests):
+    expressions = build_batch(2000, 500)
+    core = CalculatorCore()
+    expected = {expression: core.calculate(expression) for expression in set(expressions)}
+    
+    async with CalculatorService(idle_timeout=60.0, workers=1) as service:
+        names = [f"user-{number}" for number in range(session_count)]
+        groups = [names[index::connection_count] for index in range(connection_count)]
+        
+        start = time.perf_counter()
+        heavy = ServiceClient.connect(*service.address)
+        drivers = [_drive(service.address, group, requests, expressions, expected) for group in groups]
+        heavy_client = await heavy
+        
+        async def heavy_request():
+            heavy_start = time.perf_counter()
+            result = await heavy_client.evaluate('50000!%1000003')
+            return time.perf_counter() - heavy_start, result
+        
+        *errors, (heavy_time, _) = await asyncio.gather(*drivers, heavy_request())
+        elapsed = time.perf_counter() - start
+        await heavy_client.close()
+        
+        total = session_count * requests
+        stats = service.stats()
+        print(f"{session_count} sessions over {connection_count} connections, {requests} requests each")
+        print(f"{total} requests in {elapsed:.2f} s: {total / elapsed:,.0f} req/s, {sum(errors)} wrong results")
+        print(f"sessions alive: {stats['sessions']}, offloaded: {stats['offloaded']}, "
+              f"expensive request took {heavy_time * 1000:.0f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=5000, help='concurrent sessions')
+    parser.add_argument('--connections', type=int, default=50, help='client connections')
+    parser.add_argument('--requests', type=int, default=20, help='requests per session')
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.sessions, args.connections, args.requests))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
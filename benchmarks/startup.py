@@ -0,0 +1,163 @@
+"""
+Startup Latency Benchmark
+
+Measures, each in a fresh interpreter:
+
+* import time of the GUI entry (``main``) and the headless entry
+  (``core.cli``), from ``python -X importtime``, with the slowest modules
+  and every project module listed
+* time from process launch to the first frame drawn by the calculator
+  window, and to the frame after deferred widgets were built
+
+Limits can be given to turn the report into a check (exit status 1 when
+exceeded). Without a display the window is created offscreen.
+
+Usage:
+    python -m benchmarks.startup [--runs N] [--top N] [--json FILE]
+                                 [--max-first-frame-ms MS] [--max-import-ms MS]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_PACKAGES = ('main', 'core', 'ui', 'utils')
+
+# Runs the app until the calculator has drawn its first frame and the frame
+# after its deferred widgets were built, printing time.time() once imports
+# are done and at both frames
+_FIRST_FRAME_PROBE = """
+import sys, time
+sys.argv = sys.argv[:1]
+import main
+from kivy.core.window import Window
+
+app = main.CalculatorApp()
+marks = [time.time()]
+
+def on_flip(*args):
+    root = app.root
+    if root is None:
+        return
+    if len(marks) == 1:
+        marks.append(time.time())
+    if getattr(root, 'fully_built', True):
+        marks.append(time.time())
+        Window.unbind(on_flip=on_flip)
+        print(*marks, flush=True)
+        app.stop()
+
+Window.bind(on_flip=on_flip)
+app.run()
+"""
+
+def _environment():
+    env = dict(os.environ, KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1', KIVY_NO_FILELOG='1')
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    return env
+
+def import_times(module):
+    """
+    Import a module in a fresh interpreter under -X importtime
+    
+    Args:
+        module (str): Module to import
+    
+    Returns:
+        list: (module name, self us, cumulative us, depth) in import order
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=_environment(), capture_output=True, text=True, check=True
+    )
+    records = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+def first_frame_times():
+    """
+    Launch the app in a fresh interpreter and time its first frames
+    
+    Returns:
+        tuple: (imports done, first frame, fully built frame) in ms since launch
+    """
+    start = time.time()
+    completed = subprocess.run(
+        [sys.executable, '-c', _FIRST_FRAME_PROBE],
+        env=_environment(), capture_output=True, text=True, check=True, timeout=120
+    )
+    marks = map(float, completed.stdout.split()[-3:])
+    return tuple((mark - start) * 1000 for mark in marks)
+
+def _is_project_module(name):
+    return name.split('.')[0] in PROJECT_PACKAGES
+
+def _import_report(module, runs, top):
+    """Print the import breakdown of the fastest run, return its total in ms"""
+    def total(records):
+        # Cumulative time of the module itself, excluding interpreter startup
+        return next(r[2] for r in reversed(records) if r[0] == module and r[3] == 0)
+    
+    best = min((import_times(module) for _ in range(runs)), key=total)
+    total_ms = total(best) / 1000
+    print(f"import {module}: {total_ms:.1f} ms")
+    
+    print(f"  slowest {top} modules (self time):")
+    for name, self_us, cumulative_us, _ in sorted(best, key=lambda record: -record[1])[:top]:
+        print(f"    {self_us / 1000:8.1f} ms  {name}")
+    
+    print("  project modules (self / cumulative):")
+    seen = set()
+    for name, self_us, cumulative_us, _ in best:
+        if _is_project_module(name) and name not in seen:
+            seen.add(name)
+            print(f"    {self_us / 1000:8.1f} / {cumulative_us / 1000:8.1f} ms  {name}")
+    return total_ms
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help='runs per measurement (best is reported)')
+    parser.add_argument('--top', type=int, default=10, help='slowest modules listed per import')
+    parser.add_argument('--json', metavar='FILE', help='also write the results as JSON')
+    parser.add_argument('--max-first-frame-ms', type=float, help='fail if the first frame is slower')
+    parser.add_argument('--max-import-ms', type=float, help='fail if importing the headless entry is slower')
+    args = parser.parse_args(argv)
+    
+    results = {
+        'import_main_ms': _import_report('main', args.runs, args.top),
+        'import_cli_ms': _import_report('core.cli', args.runs, args.top),
+    }
+    
+    frames = [first_frame_times() for _ in range(args.runs)]
+    results['first_frame_ms'] = min(first for _, first, _ in frames)
+    results['fully_built_ms'] = min(built for _, _, built in frames)
+    # Widget construction and drawing alone, without interpreter and Kivy startup
+    results['build_to_first_frame_ms'] = min(first - imported for imported, first, _ in frames)
+    print(f"first frame: {results['first_frame_ms']:.0f} ms, "
+          f"fully built: {results['fully_built_ms']:.0f} ms, "
+          f"after imports: {results['build_to_first_frame_ms']:.0f} ms (best of {args.runs})")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as out:
+            json.dump(results, out, indent=2)
+    
+    failures = []
+    if args.max_first_frame_ms is not None and results['first_frame_ms'] > args.max_first_frame_ms:
+        failures.append(f"first frame {results['first_frame_ms']:.0f} ms > {args.max_first_frame_ms:.0f} ms")
+    if args.max_import_ms is not None and results['import_cli_ms'] > args.max_import_ms:
+        failures.append(f"import core.cli {results['import_cli_ms']:.1f} ms > {args.max_import_ms:.1f} ms")
+    for failure in failures:
+        print(f"over budget: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
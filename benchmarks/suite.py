@@ -0,0 +1,300 @@
+"""
+Core Pipeline Benchmark Suite
+
+Times the hot paths of the calculator core on realistic expression
+corpora and guards them against regressions:
+
+* evaluate/<corpus>: evaluate_expression with a warm compiled-expression cache
+* uncached/<corpus>: calculate with caching disabled, i.e. tokenizing,
+  parsing, cost checking and compiling every time (the stage that replaced
+  the old string preprocessing of scientific functions)
+* keystroke/<size>: checking, applying and undoing one keypad key with the
+  incremental input validator, after a short and a very long expression
+  (the two should run at the same speed)
+* get_history and format_result
+
+Each benchmark reports throughput, per-call latency percentiles and the
+memory allocated per call (peak and retained, traced with tracemalloc in
+a separate pass). --save-baseline writes the results to a JSON file;
+later runs compare against it and exit with status 1 if any benchmark's
+throughput dropped by more than --threshold. Runs headless: Kivy is never
+imported.
+
+Usage:
+    python -m benchmarks.suite [--save-baseline] [--baseline FILE] [--threshold 0.2] [--filter TEXT]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from core.calculator_core import CalculatorCore
+from core.input_validator import InputValidator
+from utils.helpers import format_result
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def _simple(rng):
+    a, b, c, d = (rng.randint(1, 999) for _ in range(4))
+    return rng.choice([
+        f"{a}+{b}*{c}-{d}",
+        f"({a}-{b})/{c}",
+        f"{a}.{b}×{c}÷{d}",
+        f"{a}//{c}+{b}%{d}",
+        f"{a}^2-{b}^0.5",
+    ])
+
+def _nested(rng):
+    depth = rng.randint(8, 30)
+    expression = str(rng.randint(1, 9))
+    for _ in range(depth):
+        operator = rng.choice('+-*/')
+        expression = f"({expression}{operator}{rng.randint(1, 9)})"
+    return expression
+
+def _trig(rng):
+    a, b, c = (rng.randint(1, 89) for _ in range(3))
+    return rng.choice([
+        f"sin({a})+cos({b})*tan({c})",
+        f"asin(0.{a})+acos(0.{b})",
+        f"atan({a})-cot({b})",
+        f"sin({a})^2+cos({a})^2",
+    ])
+
+def _factorial(rng):
+    n, m = rng.randint(5, 170), rng.randint(1, 20)
+    return rng.choice([
+        f"{n}!",
+        f"factorial({n})/{m}!",
+        f"{n}!%1000003",
+        f"{m}!+{m + 1}!",
+    ])
+
+def _long(rng):
+    terms = [rng.choice([_simple, _trig])(rng) for _ in range(rng.randint(10, 25))]
+    return '+'.join(f"({term})" for term in terms)
+
+CORPUS_BUILDERS = {
+    'simple': _simple,
+    'nested': _nested,
+    'trig': _trig,
+    'factorial': _factorial,
+    'long': _long,
+}
+
+def build_corpora(size=200, seed=0):
+    """
+    Build the expression corpora
+    
+    Args:
+        size (int): Expressions per corpus
+        seed (int): Random seed, so runs compare like with like
+    
+    Returns:
+        dict: corpus name -> list of expression strings
+    """
+    rng = random.Random(seed)
+    return {name: [build(rng) for _ in range(size)] for name, build in CORPUS_BUILDERS.items()}
+
+def build_benchmarks(corpora):
+    """
+    Build the benchmarks
+    
+    Args:
+        corpora (dict): From build_corpora()
+    
+    Returns:
+        list: (name, func, items) tuples; func is called with one item per call
+    """
+    benchmarks = []
+    for corpus, expressions in corpora.items():
+        modes = ('deg', 'rad') if corpus == 'trig' else ('deg',)
+        for mode in modes:
+            suffix = f"-{mode}" if corpus == 'trig' else ''
+            core = CalculatorCore()
+            core.set_angle_mode(mode)
+            benchmarks.append((f"evaluate/{corpus}{suffix}", core.evaluate_expression, expressions))
+            uncached = CalculatorCore(cache_size=0)
+            uncached.set_angle_mode(mode)
+            benchmarks.append((f"uncached/{corpus}{suffix}", uncached.calculate, expressions))
+    
+    history = CalculatorCore(history_size=1000)
+    history.evaluate_many([expression for expressions in corpora.values() for expression in expressions][:1000])
+    benchmarks.append(("get_history/all", lambda item: history.get_history(), [None]))
+    benchmarks.append(("get_history/latest20", lambda item: history.get_history(20), [None]))
+    
+    # Each key valid at that point, as the UI handles it: apply it, refresh
+    # the enabled buttons, then undo it
+    for size, text in (('short', '12+'), ('long', '(12+' * 2500)):
+        validator = InputValidator(text)
+        
+        def keystroke(key, validator=validator):
+            validator.press(key)
+            validator.valid_keys()
+            validator.delete()
+        
+        benchmarks.append((f"keystroke/{size}", keystroke, sorted(validator.valid_keys())))
+    
+    core = CalculatorCore()
+    results = [core.evaluate_expression(expression) for expressions in corpora.values() for expression in expressions]
+    benchmarks.append(("format_result", format_result, results))
+    return benchmarks
+
+def _percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def measure(func, items, min_time=0.5, rounds=5):
+    """
+    Time calls of func over items
+    
+    Throughput is the best of several rounds, which filters out most of
+    the noise from other processes; latency percentiles cover all calls.
+    
+    Args:
+        func (callable): Function called with one item
+        items (list): Call arguments, cycled through
+        min_time (float): Seconds to keep calling for, over all rounds
+        rounds (int): Number of rounds
+    
+    Returns:
+        dict: ops_per_sec, p50_us, p90_us, p99_us and calls
+    """
+    for item in items:
+        func(item)  # Warm up caches
+    clock = time.perf_counter_ns
+    timings = []
+    record = timings.append
+    best = 0.0
+    for _ in range(rounds):
+        first = len(timings)
+        deadline = clock() + int(min_time * 1e9 / rounds)
+        while clock() < deadline:
+            for item in items:
+                start = clock()
+                func(item)
+                record(clock() - start)
+        best = max(best, (len(timings) - first) * 1e9 / sum(timings[first:]))
+    timings.sort()
+    return {
+        'ops_per_sec': best,
+        'p50_us': _percentile(timings, 0.50) / 1000,
+        'p90_us': _percentile(timings, 0.90) / 1000,
+        'p99_us': _percentile(timings, 0.99) / 1000,
+        'calls': len(timings),
+    }
+
+def measure_allocations(func, items, calls=200):
+    """
+    Trace memory allocated per call
+    
+    Args:
+        func (callable): Function called with one item
+        items (list): Call arguments, cycled through
+        calls (int): Number of traced calls
+    
+    Returns:
+        dict: peak_bytes (transient allocation high-water mark per call, on
+        average) and retained_bytes (memory still held afterwards, per call)
+    """
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        peak_total = 0
+        for index in range(calls):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func(items[index % len(items)])
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_bytes': peak_total / calls, 'retained_bytes': max(end - start, 0) / calls}
+
+def load_baseline(path):
+    """
+    Load a baseline file
+    
+    Returns:
+        dict: benchmark name -> saved results, or None if there is no file
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)['results']
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path, results):
+    """Write results as the new baseline"""
+    data = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fail if throughput drops by more than this fraction (default: %(default)s)')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='re-measure a benchmark up to this many times before reporting a regression')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds per benchmark')
+    parser.add_argument('--size', type=int, default=200, help='expressions per corpus')
+    args = parser.parse_args(argv)
+    
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    benchmarks = [benchmark for benchmark in build_benchmarks(build_corpora(args.size))
+                  if args.filter in benchmark[0]]
+    results = {}
+    regressions = []
+    print(f"{'benchmark':24s} {'ops/s':>12s} {'p50 us':>9s} {'p90 us':>9s} {'p99 us':>9s} "
+          f"{'peak B':>9s} {'kept B':>8s} {'vs base':>8s}")
+    for name, func, items in benchmarks:
+        result = measure(func, items, args.min_time)
+        change = ''
+        if baseline and name in baseline:
+            expected = baseline[name]['ops_per_sec']
+            for _ in range(args.retries):
+                if result['ops_per_sec'] >= expected * (1 - args.threshold):
+                    break
+                # Confirm a slowdown before reporting it: keep the best run
+                retry = measure(func, items, args.min_time)
+                if retry['ops_per_sec'] > result['ops_per_sec']:
+                    result = retry
+            ratio = result['ops_per_sec'] / expected
+            change = f"{ratio - 1:+.1%}"
+            if ratio < 1 - args.threshold:
+                regressions.append(f"{name}: {result['ops_per_sec']:,.0f} ops/s, "
+                                   f"baseline {expected:,.0f} ({change})")
+        result.update(measure_allocations(func, items))
+        results[name] = result
+        print(f"{name:24s} {result['ops_per_sec']:12,.0f} {result['p50_us']:9.2f} {result['p90_us']:9.2f} "
+              f"{result['p99_us']:9.2f} {result['peak_bytes']:9,.0f} {result['retained_bytes']:8,.0f} {change:>8s}")
+    
+    if 'kivy' in sys.modules:
+        print("error: Kivy was imported, the suite must stay headless")
+        return 2
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"baseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
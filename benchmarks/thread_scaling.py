@@ -0,0 +1,183 @@
+"""
+Thread Stress and Scaling Benchmark
+
+Hammers one calculator from several threads (evaluate_expression plus
+memory_add) and checks the outcome: every history number handed out
+exactly once, every recorded result correct, no memory update lost.
+Runs against ThreadSafeCalculatorCore and, for comparison, the plain
+CalculatorCore, with a tiny thread switch interval to provoke races.
+Then stresses ConcurrentHistory directly: short-lived writer threads
+append while reader threads check every read is strictly newest-first
+and untorn, and the final records are complete and in order.
+Exits with status 1 if the thread-safe classes show any problem.
+
+Usage:
+    python -m benchmarks.thread_scaling [--threads 1,2,4,8] [--ops N]
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from core.calculator_core import CalculatorCore
+from core.history import ConcurrentHistory
+from core.threadsafe import ThreadSafeCalculatorCore
+
+def _expressions(thread, count):
+    """Per-thread expressions with known integer results"""
+    return [(f"{thread}*{count}+{index}", str(thread * count + index)) for index in range(count)]
+
+def stress(core_class, threads, ops):
+    """
+    Run the stress workload
+    
+    Args:
+        core_class (type): Calculator class to test
+        threads (int): Number of threads
+        ops (int): Evaluations (and memory additions) per thread
+    
+    Returns:
+        tuple: (elapsed seconds, list of problems found)
+    """
+    core = core_class(history_size=threads * ops)
+    work = [_expressions(thread, ops) for thread in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    failures = []
+    
+    def worker(expressions):
+        barrier.wait()
+        evaluate = core.evaluate_expression
+        memory_add = core.memory_add
+        for expression, expected in expressions:
+            if evaluate(expression) != expected:
+                failures.append(expression)
+            memory_add(1)
+    
+    pool = [threading.Thread(target=worker, args=(expressions,)) for expressions in work]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    problems = []
+    if failures:
+        problems.append(f"{len(failures)} wrong results")
+    total = threads * ops
+    if core.memory != total:
+        problems.append(f"memory {core.memory:g} != {total} ({total - core.memory:g} updates lost)")
+    entries = list(core.iter_history(newest_first=False))
+    numbers = [entry.number for entry in entries]
+    if sorted(numbers) != list(range(1, total + 1)):
+        problems.append(f"history numbers: {len(set(numbers))} distinct of {len(numbers)} records, {total} expected")
+    expected = dict(pair for expressions in work for pair in expressions)
+    wrong = sum(1 for entry in entries if expected.get(entry.expression) != entry.result)
+    if wrong:
+        problems.append(f"{wrong} history records with a wrong result")
+    return elapsed, problems
+
+def history_stress(threads, ops, capacity, readers=2, waves=4):
+    """
+    Append from waves of short-lived threads while other threads read
+    
+    Args:
+        threads (int): Writer threads per wave
+        ops (int): Records appended per writer thread
+        capacity (int): History capacity
+        readers (int): Reader threads running throughout
+        waves (int): Writer threads started one wave after the other
+    
+    Returns:
+        tuple: (elapsed seconds, list of problems found)
+    """
+    history = ConcurrentHistory(capacity)
+    appended = {}  # number -> (expression, result), as returned by append()
+    problems = []
+    done = threading.Event()
+    
+    def writer(name):
+        append = history.append
+        for index in range(ops):
+            expression = f"{name}:{index}"
+            appended[append(expression, str(index))] = (expression, str(index))
+    
+    def reader():
+        while not done.is_set():
+            records = history.latest(capacity)
+            numbers = [entry.number for entry in records]
+            if any(newer <= older for newer, older in zip(numbers, numbers[1:])):
+                problems.append(f"latest() not strictly newest first: {numbers[:10]}...")
+                return
+            if any(entry.expression.split(':')[1] != entry.result for entry in records):
+                problems.append("latest() returned a torn record")
+                return
+    
+    reading = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in reading:
+        thread.start()
+    start = time.perf_counter()
+    for wave in range(waves):
+        pool = [threading.Thread(target=writer, args=(f"{wave}.{thread}",)) for thread in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reading:
+        thread.join()
+    
+    total = threads * ops * waves
+    if sorted(appended) != list(range(1, total + 1)):
+        problems.append(f"append() numbers: {len(appended)} distinct, {total} expected")
+    entries = list(history.iter_entries())
+    numbers = [entry.number for entry in entries]
+    expected = list(range(max(total - capacity, 0) + 1, total + 1))
+    if numbers != expected:
+        problems.append(f"kept {len(numbers)} records, not the newest {len(expected)} in order")
+    if any(appended.get(entry.number) != (entry.expression, entry.result) for entry in entries):
+        problems.append("records differ from what was appended")
+    if history._epoch.buffers:
+        problems.append(f"{len(history._epoch.buffers)} buffers of finished threads not released")
+    return elapsed, problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', default='1,2,4,8', help='comma-separated thread counts')
+    parser.add_argument('--ops', type=int, default=20000, help='evaluations per thread')
+    parser.add_argument('--switch-interval', type=float, default=1e-6,
+                        help='sys.setswitchinterval() during the runs, in seconds')
+    args = parser.parse_args(argv)
+    
+    counts = [int(count) for count in args.threads.split(',')]
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(args.switch_interval)
+    failed = False
+    try:
+        for core_class in (ThreadSafeCalculatorCore, CalculatorCore):
+            print(core_class.__name__)
+            for threads in counts:
+                elapsed, problems = stress(core_class, threads, args.ops)
+                rate = threads * args.ops / elapsed
+                print(f"  {threads:3d} threads {elapsed:8.3f} s {rate:12,.0f} ops/s  "
+                      f"{'; '.join(problems) if problems else 'ok'}")
+                # The plain class is only there for comparison
+                failed = failed or (bool(problems) and core_class is ThreadSafeCalculatorCore)
+        
+        print("ConcurrentHistory (4 waves of writers, 2 readers)")
+        for threads in counts:
+            for capacity in (50, threads * args.ops * 4):
+                elapsed, problems = history_stress(threads, args.ops, capacity)
+                rate = threads * args.ops * 4 / elapsed
+                print(f"  {threads:3d} threads capacity {capacity:9,d} {elapsed:8.3f} s {rate:12,.0f} appends/s  "
+                      f"{'; '.join(problems) if problems else 'ok'}")
+                failed = failed or bool(problems)
+    finally:
+        sys.setswitchinterval(previous)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Worksheet Recomputation Benchmark
+
+Builds a worksheet of independent chains of definitions sharing a few
+user functions, then changes the input of one chain. Checks that exactly
+that chain is re-evaluated, to the same values a worksheet built from
+scratch gets, and compares the time with re-evaluating every cell.
+
+Usage:
+    python -m benchmarks.worksheet [--chains N] [--length N]
+"""
+
+import argparse
+import math
+import sys
+import time
+
+from core.compiler import FUNCTION_TABLES
+from core.worksheet import Worksheet, split_definition
+
+def build_definitions(chains, length, seed=1.0):
+    """
+    Definition texts of the benchmark worksheet
+    
+    Returns:
+        list: Definitions, each after those it uses
+    """
+    definitions = ['f(x) = sin(x)*x²', 'g(x, y) = sqrt(x²+y²)/(1+abs(y))']
+    for chain in range(chains):
+        definitions.append(f"x{chain}_0 = {seed + chain}")
+        for step in range(1, length):
+            previous = f"x{chain}_{step - 1}"
+            definitions.append(f"x{chain}_{step} = g(f({previous}), {previous})+{step}")
+    return definitions
+
+def build_worksheet(definitions, mode='deg'):
+    """Worksheet with the definitions entered in order"""
+    worksheet = Worksheet(FUNCTION_TABLES[mode])
+    for definition in definitions:
+        worksheet.define(*split_definition(definition))
+    return worksheet
+
+def _best_time(func, repeat=5):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chains', type=int, default=100, help='independent chains of definitions')
+    parser.add_argument('--length', type=int, default=50, help='definitions per chain')
+    args = parser.parse_args(argv)
+    
+    start = time.perf_counter()
+    worksheet = build_worksheet(build_definitions(args.chains, args.length))
+    print(f"built {len(worksheet)} definitions in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    # Change the input of the middle chain
+    chain = args.chains // 2
+    before = worksheet.evaluations
+    updated = worksheet.define(f"x{chain}_0", None, "0.5")
+    evaluated = worksheet.evaluations - before
+    reference = build_worksheet([
+        definition.replace(f"x{chain}_0 = {1.0 + chain}", f"x{chain}_0 = 0.5")
+        for definition in build_definitions(args.chains, args.length)
+    ])
+    mismatches = [name for name, cell in worksheet.cells.items()
+                  if cell.params is None and repr(cell.value) != repr(reference.cells[name].value)]
+    ok = evaluated == args.length and not mismatches
+    print(f"changed x{chain}_0: {evaluated} cells evaluated ({len(updated)} updated), "
+          f"{'ok' if ok else f'FAILED, {len(mismatches)} mismatched values'}")
+    
+    values = iter([0.25, 0.75] * 10)
+    incremental = _best_time(lambda: worksheet.define(f"x{chain}_0", None, str(next(values))))
+    # Evaluating every cell in topological order, as without dependency tracking
+    everything = worksheet._order(list(worksheet.cells))
+    full = _best_time(lambda: worksheet._update(everything, recompile=False))
+    print(f"incremental update {incremental * 1000:9.3f} ms")
+    print(f"full recompute     {full * 1000:9.3f} ms  x{full / incremental:.1f}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
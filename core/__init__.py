@@ -3,5 +3,8 @@ core包初始化文件
 """
 
 from .calculator_core import CalculatorCore
+from .compiler import compile_expression
+from .parser import ExpressionError
+from .threadsafe import ThreadSafeCalculatorCore
 
-__all__ = ['CalculatorCore']
\ No newline at end of file
+__all__ = ['CalculatorCore', 'ThreadSafeCalculatorCore', 'compile_expression', 'ExpressionError']
\ No newline at end of file
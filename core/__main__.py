@@ -0,0 +1,9 @@
+"""
+core包命令行入口: python -m core
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
\ No newline at end of file
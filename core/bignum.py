@@ -0,0 +1,183 @@
+"""
+Big Integer Result Module
+
+Exact integer results such as 100000! or 2^3000000 can have millions of
+digits. CPython converts an int to decimal text in quadratic time and
+refuses beyond sys.get_int_max_str_digits() digits, so big results are
+kept as ints and displayed in scientific notation computed from the bit
+length and the leading bits. The full digits are produced only on
+request, by a subquadratic divide-and-conquer conversion.
+"""
+
+import decimal
+import math
+from decimal import Decimal
+
+EXACT_DIGITS = 4300  # Integers of up to about this many digits are shown in full
+DISPLAY_DIGITS = 16  # Significant digits of the scientific display
+
+# Largest bit length whose integers are guaranteed to have <= EXACT_DIGITS digits
+_EXACT_BITS = int((EXACT_DIGITS - 1) / math.log10(2))
+_LEADING_BITS = 128  # Leading bits kept for the scientific display
+_SPLIT_BITS = 1024  # Below this size Decimal(int) is faster than splitting
+
+class BigInteger(str):
+    """
+    Result string of a big integer
+    
+    The string itself is the scientific display text, e.g.
+    '2.824229407960348e+456573', so it can be shown, stored in history and
+    compared like any other result. The exact int stays available.
+    """
+    
+    def __new__(cls, value, digits=DISPLAY_DIGITS):
+        self = super().__new__(cls, scientific(value, digits))
+        self.value = value  # Exact integer
+        return self
+    
+    def __reduce__(self):
+        # Pickle the int, not the display text (for worker processes)
+        return (BigInteger, (self.value,))
+    
+    def digits(self):
+        """
+        Get all decimal digits of the exact value
+        
+        Returns:
+            str: Full decimal representation
+        """
+        return int_to_string(self.value)
+
+def scientific(value, digits=DISPLAY_DIGITS):
+    """
+    Format an integer in scientific notation without converting it to text
+    
+    Only the leading bits are used, so the cost does not depend on the
+    number of digits.
+    
+    Args:
+        value (int): Integer to format
+        digits (int): Significant digits to show
+    
+    Returns:
+        str: e.g. '9.332621544394415e+157' for 100!
+    """
+    magnitude = abs(value)
+    shift = max(magnitude.bit_length() - _LEADING_BITS, 0)
+    with decimal.localcontext() as ctx:
+        ctx.prec = digits + 10
+        ctx.Emax = decimal.MAX_EMAX
+        approximation = Decimal(magnitude >> shift) * Decimal(2) ** shift
+        text = f"{approximation:.{digits - 1}e}"
+    return '-' + text if value < 0 else text
+
+def _int_to_decimal(value):
+    """
+    Exact Decimal of a non-negative int by splitting it into binary halves
+    
+    Decimal(int) is quadratic; combining the halves with Decimal
+    multiplication (number theoretic transform for large operands) is not.
+    """
+    two = Decimal(2)
+    powers = {}  # Bit count -> Decimal power of two, shared across branches
+    
+    def power(bits):
+        result = powers.get(bits)
+        if result is None:
+            if bits <= _SPLIT_BITS:
+                result = two ** bits
+            else:
+                half = bits >> 1
+                result = power(half) * power(bits - half)
+            powers[bits] = result
+        return result
+    
+    def convert(value, bits):
+        if bits <= _SPLIT_BITS:
+            return Decimal(value)
+        half = bits >> 1
+        high = value >> half
+        low = value - (high << half)
+        return convert(high, bits - half) * power(half) + convert(low, half)
+    
+    with decimal.localcontext() as ctx:
+        ctx.prec = decimal.MAX_PREC
+        ctx.Emax = decimal.MAX_EMAX
+        ctx.Emin = decimal.MIN_EMIN
+        ctx.traps[decimal.Inexact] = True
+        return convert(value, value.bit_length())
+
+def int_to_decimal(value):
+    """
+    Convert an int of any size to an exact Decimal in subquadratic time
+    
+    Args:
+        value (int): Integer to convert
+    
+    Returns:
+        Decimal: Exact value
+    """
+    if value.bit_length() <= _SPLIT_BITS:
+        return Decimal(value)
+    result = _int_to_decimal(abs(value))
+    return -result if value < 0 else result
+
+def int_to_string(value):
+    """
+    Convert an int of any size to its full decimal text
+    
+    Unlike str(), this ignores sys.get_int_max_str_digits() and takes
+    well under a second for a million digits.
+    
+    Args:
+        value (int): Integer to convert
+    
+    Returns:
+        str: Decimal digits, with a leading '-' if negative
+    """
+    if value.bit_length() <= _EXACT_BITS:
+        return str(value)
+    return str(int_to_decimal(value))
+
+def format_integer(value):
+    """
+    Format an integer result
+    
+    Args:
+        value (int): Integer result
+    
+    Returns:
+        str: Full digits, or a BigInteger showing scientific notation when
+        the value has more than EXACT_DIGITS digits
+    """
+    if value.bit_length() <= _EXACT_BITS:
+        return str(value)
+    return BigInteger(value)
+
+def format_number(value):
+    """
+    Format a calculation result, keeping big integers exact but unconverted
+    
+    Args:
+        value: int, float or other number
+    
+    Returns:
+        str: Result string
+    """
+    if value.__class__ is int and value.bit_length() > _EXACT_BITS:
+        return BigInteger(value)
+    return str(value)
+
+def full_digits(result):
+    """
+    Get the full text of a result string
+    
+    Args:
+        result (str): Result returned by the calculator
+    
+    Returns:
+        str: All digits for a BigInteger, otherwise the result unchanged
+    """
+    if isinstance(result, BigInteger):
+        return result.digits()
+    return result
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Bounded LRU Cache Module
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit/miss/eviction counters"""
+    
+    def __init__(self, maxsize=1024):
+        """
+        Initialize cache
+        
+        Args:
+            maxsize (int): Maximum number of entries kept (0 disables caching)
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, key):
+        return key in self._data
+    
+    def get(self, key, default=None):
+        """
+        Look up a key and mark it as most recently used
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Cached value or default
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        """
+        Insert or refresh a key, evicting the oldest entry when full
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.maxsize == 0:
+            return
+        data = self._data
+        if key in data:
+            data.move_to_end(key)
+        data[key] = value
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+    
+    def resize(self, maxsize):
+        """
+        Change the capacity, evicting the oldest entries if needed
+        
+        Args:
+            maxsize (int): New maximum number of entries
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        self._data.clear()
+    
+    def reset_stats(self):
+        """Reset hit/miss/eviction counters"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            dict: size, maxsize, hits, misses and evictions
+        """
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+class SharedCache:
+    """
+    Bounded cache safe to share between threads
+    
+    Lookups take no lock: they read a plain dict, which is only ever
+    replaced, never reordered. Inserts take a lock; when full, the oldest
+    half is dropped by building a new dict. Same interface as LRUCache,
+    but eviction is in insertion order and the counters are approximate
+    under concurrent use.
+    """
+    
+    def __init__(self, maxsize=1024):
+        """
+        Initialize cache
+        
+        Args:
+            maxsize (int): Maximum number of entries kept (0 disables caching)
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, key):
+        return key in self._data
+    
+    def get(self, key, default=None):
+        """
+        Look up a key
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Cached value or default
+        """
+        value = self._data.get(key, default)
+        if value is default:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        """
+        Insert a key, evicting the oldest half of the entries when full
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            data = self._data
+            if key not in data and len(data) >= self.maxsize:
+                data = self._evict(data, self.maxsize // 2)
+            data[key] = value
+    
+    def _evict(self, data, keep):
+        """Replace the dict by one with its `keep` newest entries"""
+        kept = dict(itertools.islice(data.items(), len(data) - keep, None)) if keep else {}
+        self.evictions += len(data) - len(kept)
+        # Readers holding the old dict keep using it safely
+        self._data = kept
+        return kept
+    
+    def resize(self, maxsize):
+        """
+        Change the capacity, evicting the oldest entries if needed
+        
+        Args:
+            maxsize (int): New maximum number of entries
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        with self._lock:
+            self.maxsize = maxsize
+            if len(self._data) > maxsize:
+                self._evict(self._data, maxsize)
+    
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._data = {}
+    
+    def reset_stats(self):
+        """Reset hit/miss/eviction counters"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            dict: size, maxsize, hits, misses and evictions
+        """
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
\ No newline at end of file
@@ -2,24 +2,64 @@
 Calculator Core Calculation Logic Module
 """
 
-import datetime
-import math
+import time
+
+from .cache import LRUCache
+from .cost import DEFAULT_COST_BUDGET, estimate_cost, value_bound
+from .bignum import format_number
+from .compiler import CONSTANTS, FUNCTION_TABLES, compile_tree
+from .history import HistoryBuffer
+from .input_validator import InputValidator
+from .instrumentation import Instrumentation, Stopwatch
+from .parser import ExpressionError, Parser, parse
+from .worksheet import Worksheet, split_definition
+
+def _normalize(expression):
+    """Strip expression and replace × and ÷ with * and /"""
+    return expression.strip().replace('×', '*').replace('÷', '/')
 
 class CalculatorCore:
     """Calculator Core Calculation Logic Class"""
     
-    def __init__(self):
-        """Initialize calculator core"""
-        self.history = []  # History records list with timestamps
-        self.history_counter = 1  # Counter for numbering history records
+    HISTORY_LIMIT = 10  # Default number of history records kept
+    history_class = HistoryBuffer  # Container of history records
+    cache_class = LRUCache  # Compiled expression cache
+    
+    def __init__(self, cache_size=1024, cost_budget=DEFAULT_COST_BUDGET, history_size=HISTORY_LIMIT,
+                 history_log=None, expression_cache=None):
+        """
+        Initialize calculator core
+        
+        Args:
+            cache_size (int): Maximum number of compiled expressions kept (0 disables caching)
+            history_size (int): Number of most recent history records kept
+            history_log (HistoryLog or str): Persistent log (or its path) every record is appended to
+            cost_budget (CostBudget): Limits for rejecting expensive expressions (None disables)
+            expression_cache (LRUCache): Compiled expression cache shared with other
+                calculators using the same cost budget (replaces cache_size)
+        """
+        self.cost_budget = cost_budget
+        # (expression, angle_mode) -> compiled expression
+        self.expression_cache = self.cache_class(cache_size) if expression_cache is None else expression_cache
+        self.history = self.history_class(history_size)  # Numbered history records with timestamps
+        self.history_log = None
+        if history_log is not None:
+            self.attach_history_log(history_log)
         self.angle_mode = 'deg'  # Default angle mode: 'deg' or 'rad'
+        self.precision_mode = 'float'  # Number domain: 'float', 'decimal' or 'fraction'
+        self.precision = None  # Significant digits in 'decimal' mode
         self.memory = 0  # Memory value
         self.last_result = None  # Last calculation result
+        self.instrumentation = None  # Instrumentation collector while enabled
+        # User variables and functions, e.g. 'a = 3' or 'f(x) = x²+1'
+        self.worksheet = Worksheet(FUNCTION_TABLES[self.angle_mode], cost_budget=cost_budget)
     
     def set_angle_mode(self, mode):
         """Set angle mode (deg or rad)"""
         if mode in ['deg', 'rad']:
-            self.angle_mode = mode
+            if mode != self.angle_mode:
+                self.angle_mode = mode
+                self.worksheet.set_functions(FUNCTION_TABLES[mode])
             return True
         return False
     
@@ -27,12 +67,34 @@ class CalculatorCore:
         """Get current angle mode"""
         return self.angle_mode
     
+    def set_precision(self, mode, digits=None):
+        """
+        Set the number domain results are calculated in
+        
+        Args:
+            mode (str): 'float' (native doubles), 'decimal' (digits significant
+                digits, 28 by default) or 'fraction' (exact rationals)
+            digits (int): Significant digits; in 'float' mode results are
+                rounded to this many digits when given
+        
+        Returns:
+            bool: Whether the mode was valid and set
+        """
+        from .precision import DEFAULT_DECIMAL_DIGITS, PRECISION_MODES
+        if mode not in PRECISION_MODES or digits is not None and digits < 1:
+            return False
+        if mode == 'decimal' and digits is None:
+            digits = DEFAULT_DECIMAL_DIGITS
+        self.precision_mode = mode
+        self.precision = None if mode == 'fraction' else digits
+        return True
+    
     def memory_store(self, value):
         """Store value in memory"""
         try:
             self.memory = float(value)
             return True
-        except:
+        except (ValueError, TypeError, ArithmeticError):
             return False
     
     def memory_recall(self):
@@ -48,7 +110,7 @@ class CalculatorCore:
         try:
             self.memory += float(value)
             return True
-        except:
+        except (ValueError, TypeError, ArithmeticError):
             return False
     
     def memory_subtract(self, value):
@@ -56,7 +118,7 @@ class CalculatorCore:
         try:
             self.memory -= float(value)
             return True
-        except:
+        except (ValueError, TypeError, ArithmeticError):
             return False
     
     def evaluate_expression(self, expression):
@@ -69,132 +131,684 @@ class CalculatorCore:
         Returns:
             str: Calculation result or error message
         """
+        if self.instrumentation is not None:
+            result, error = self._evaluate_instrumented(expression, record=True)
+            return "Error" if error is not None else result
+        
         try:
-            # Replace × and ÷ with * and /
-            expression = expression.replace('×', '*').replace('÷', '/')
-            
-            # Handle scientific functions
-            expression = self._preprocess_scientific_functions(expression)
+            outcome = self._evaluate(expression)
             
-            if expression:
-                # Use eval to calculate expression (Note: Use safer parser in production)
-                result = str(eval(expression))
-                self.last_result = result
-                
-                # Get current time with seconds precision
-                current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Record history with timestamp and numbering
-                history_entry = {
-                    'number': self.history_counter,
-                    'time': current_time,
-                    'expression': expression,
-                    'result': result
-                }
-                self.history.append(history_entry)
-                self.history_counter += 1
-                
-                # Limit history records (keep last 10)
-                if len(self.history) > 10:
-                    self.history = self.history[-10:]
-                
+            if outcome:
+                expression, result = outcome
+                self.record(expression, result)
                 return result
         except Exception as e:
             return "Error"
     
-    def _preprocess_scientific_functions(self, expression):
-        """Preprocess scientific functions in expression"""
-        import re
-        
-        # Handle trigonometric functions with angle mode conversion
-        trig_functions = ['sin', 'cos', 'tan', 'cot']
-        for func in trig_functions:
-            pattern = rf'{func}\(([^)]+)\)'
-            matches = re.findall(pattern, expression)
-            for match in matches:
-                if self.angle_mode == 'deg':
-                    # Convert degrees to radians
-                    replacement = f'math.{func}(math.radians({match}))'
-                else:
-                    replacement = f'math.{func}({match})'
-                expression = expression.replace(f'{func}({match})', replacement)
-        
-        # Handle inverse trigonometric functions with angle mode conversion
-        inv_trig_functions = ['asin', 'acos', 'atan']
-        for func in inv_trig_functions:
-            pattern = rf'{func}\(([^)]+)\)'
-            matches = re.findall(pattern, expression)
-            for match in matches:
-                if self.angle_mode == 'deg':
-                    # Convert radians to degrees
-                    replacement = f'math.degrees(math.{func}({match}))'
+    def record(self, expression, result, timestamp=None):
+        """
+        Record a calculation result as the last result and in history
+        
+        Args:
+            expression (str): Calculated expression
+            result (str): Calculation result
+            timestamp (float): Seconds since the epoch (default: now)
+        """
+        self.last_result = result
+        # Timestamp is formatted only when displayed
+        timestamp = time.time() if timestamp is None else timestamp
+        self.history.append(expression, result, timestamp)
+        if self.history_log is not None:
+            self.history_log.append(expression, result, timestamp)
+    
+    def calculate(self, expression):
+        """
+        Calculate expression without touching history or last result
+        
+        Args:
+            expression (str): Mathematical expression string
+            
+        Returns:
+            str: Calculation result, or None for empty input
+            
+        Raises:
+            Exception: Whatever parsing or evaluation raised
+        """
+        if self.instrumentation is not None:
+            result, error = self._evaluate_instrumented(expression, record=False)
+            if error is not None:
+                raise error
+            return result
+        
+        outcome = self._evaluate(expression)
+        return outcome[1] if outcome else None
+    
+    def calculate_tokens(self, text, tokens):
+        """
+        calculate() of input the caller has already lexed, e.g. the live
+        preview's incrementally lexed display text
+        
+        Definitions cannot be lexed, so this never changes the worksheet.
+        Calls are not instrumented.
+        
+        Args:
+            text (str): Expression string the tokens stand for (the cache key)
+            tokens (list): Its tokens, terminated by an END token
+        
+        Returns:
+            str: Calculation result, or None for empty input
+        
+        Raises:
+            Exception: Whatever parsing or evaluation raised
+        """
+        normalized = _normalize(text)
+        entry = self.expression_cache.get(self._cache_key(normalized))
+        if entry is None:
+            tree = Parser(tokens).parse()
+            if tree is None:
+                return None
+            entry = self._compile_parsed(normalized, tree)
+        compiled = entry[1]
+        return compiled.format(compiled.evaluate(()))
+    
+    def evaluate_many(self, expressions, record_history=True):
+        """
+        Calculate a batch of expressions
+        
+        Identical expressions inside the batch are compiled and evaluated
+        once (until a definition changes the worksheet). All history records
+        of the batch share a single timestamp.
+        
+        Args:
+            expressions (iterable): Mathematical expression strings
+            record_history (bool): Whether successful results are added to history
+            
+        Returns:
+            list: One item per input, in order: the result string, the
+            exception raised for that expression, or None for empty input
+        """
+        results = []
+        outcomes = {}  # expression -> (normalized expression or None, result)
+        append_history = self.history.append if record_history else None
+        logged = [] if record_history and self.history_log is not None else None
+        timestamp = time.time()
+        last_result = None
+        
+        for expression in expressions:
+            outcome = outcomes.get(expression)
+            if outcome is None:
+                try:
+                    outcome = self._evaluate(expression) or (None, None)
+                except Exception as e:
+                    outcome = (None, e)
+                if split_definition(expression) is None:
+                    outcomes[expression] = outcome
                 else:
-                    replacement = f'math.{func}({match})'
-                expression = expression.replace(f'{func}({match})', replacement)
+                    outcomes.clear()  # Later expressions may read the new definition
+            
+            normalized, result = outcome
+            results.append(result)
+            if normalized is not None:
+                last_result = result
+                if append_history:
+                    append_history(normalized, result, timestamp)
+                    if logged is not None:
+                        logged.append(outcome)
         
-        # Handle other scientific functions
-        expression = expression.replace('log(', 'math.log10(')
-        expression = expression.replace('ln(', 'math.log(')
-        expression = expression.replace('π', 'math.pi')
-        expression = expression.replace('e', 'math.e')
-        expression = expression.replace('√(', 'math.sqrt(')
-        expression = expression.replace('³√(', 'math.cbrt(') if hasattr(math, 'cbrt') else expression.replace('³√(', '**(1/3)')
-        expression = expression.replace('!', 'math.factorial(') + ')' if '!' in expression else expression
-        expression = expression.replace('|', 'abs(') + ')' if '|' in expression else expression
+        if logged:
+            self.history_log.extend(logged, timestamp)
         
-        # Handle power functions
-        expression = expression.replace('x²', '**2')
-        expression = expression.replace('x³', '**3')
-        expression = expression.replace('x^y', '**')
+        if last_result is not None:
+            self.last_result = last_result
         
-        return expression
+        return results
+    
+    def vectorize(self, expression, variables):
+        """
+        Compile expression for evaluation over arrays of variable values
+        
+        Args:
+            expression (str): Expression with free variables, e.g. 'sin(x)*x²+ln(y)'
+            variables (tuple): Free variable names, in argument order
+            
+        Returns:
+            VectorizedExpression: Callable taking one array per variable,
+            using the current angle mode
+        """
+        # Imported on use: NumPy is slow to load and unneeded for scalar work
+        from .vectorized import compile_vectorized
+        return compile_vectorized(expression, variables, self.angle_mode)
     
-    def get_history(self):
+    def evaluate_columns(self, formulas, source, writer, chunk_rows=None, progress=None):
+        """
+        Evaluate formulas over every row of a large table, chunk by chunk
+        
+        Args:
+            formulas: 'name = expression' strings over the source's column
+                names, or a dict of result name -> expression
+            source: columnar.BinaryColumns (memory-mapped) or columnar.CSVColumns
+            writer: columnar.BinaryColumnWriter or columnar.CSVWriter
+            chunk_rows (int): Rows evaluated at once (default: columnar.DEFAULT_CHUNK_ROWS)
+            progress (callable): Called with a StreamProgress after each chunk
+        
+        Returns:
+            StreamProgress: Rows, chunks and elapsed time, using the current angle mode
+        """
+        # Imported on use: needs NumPy
+        from .columnar import DEFAULT_CHUNK_ROWS, evaluate_columns
+        return evaluate_columns(formulas, source, writer, chunk_rows or DEFAULT_CHUNK_ROWS, self.angle_mode, progress)
+    
+    def solve(self, expression, variable, bracket, tolerance=1e-12):
+        """
+        Find a root of an expression in one variable (Brent's method)
+        
+        Args:
+            expression (str): Expression, e.g. 'cos(x)-x'; may use worksheet
+                variables and functions
+            variable (str): Variable solved for
+            bracket (tuple): (a, b) interval to search, numbers or
+                expression strings such as 'pi/2'
+            tolerance (float): Absolute tolerance on the root
+        
+        Returns:
+            NumericResult: Root as value, with error estimate, evaluation
+            count and elapsed time
+        
+        Raises:
+            ExpressionError: For a malformed expression
+            ValueError: If no sign change is found in the bracket
+        """
+        from .numerics import solve
+        bracket = [self._number(end) for end in bracket]
+        function = self._function(expression, variable, bracket)
+        return solve(function, bracket, tolerance)
+    
+    def integrate(self, expression, variable, a, b, tolerance=1e-10):
+        """
+        Integrate an expression over [a, b] (adaptive Gauss–Kronrod)
+        
+        Args:
+            expression (str): Integrand, e.g. 'sin(x)*x²'
+            variable (str): Integration variable
+            a, b: Bounds, numbers or expression strings
+            tolerance (float): Absolute or relative error tolerance
+        
+        Returns:
+            NumericResult: Integral as value (see solve())
+        
+        Raises:
+            ExpressionError: For a malformed expression
+            ValueError: For infinite bounds or an integrand that is not
+                finite on the interval
+        """
+        from .numerics import integrate
+        a, b = self._number(a), self._number(b)
+        function = self._function(expression, variable, (a, b))
+        return integrate(function, a, b, tolerance)
+    
+    def derivative(self, expression, variable, at):
+        """
+        Differentiate an expression at a point (Ridders' extrapolation)
+        
+        Args:
+            expression (str): Expression, e.g. 'sin(x)'; in 'deg' mode the
+                derivative is per degree
+            variable (str): Variable differentiated by
+            at: Point, a number or expression string
+        
+        Returns:
+            NumericResult: Derivative as value (see solve())
+        
+        Raises:
+            ExpressionError: For a malformed expression
+            ValueError: If the expression is not finite around the point
+        """
+        from .numerics import derivative
+        at = self._number(at)
+        # The steps stay well within the point's magnitude (or 1)
+        function = self._function(expression, variable, (2 * max(abs(at), 1.0),))
+        return derivative(function, at)
+    
+    def _function(self, expression, variable, extent):
+        """
+        Compile an expression into a numerics.Function of one variable,
+        evaluated with floats in the current angle mode
+        
+        Args:
+            extent (sequence): Numbers bounding the magnitude of the points
+                the variable takes, for the cost check
+        """
+        from .numerics import Function, compile_function
+        normalized = expression.strip().replace('×', '*').replace('÷', '/')
+        tree = parse(normalized)
+        if tree is None:
+            raise ExpressionError("Empty expression")
+        # The variable only takes float values up to the extent
+        bounds = {variable: value_bound(max(abs(end) for end in extent))}
+        if self.worksheet.uses(tree):
+            # User functions run point by point: no vectorized batches
+            return Function(self._compile_over_worksheet(tree, (variable,), bounds))
+        self._check_cost(tree, bounds)
+        return compile_function(normalized, variable, self.angle_mode)
+    
+    def _number(self, value):
+        """A float from a number or an expression string"""
+        if isinstance(value, str):
+            entry = self._compile(value)
+            if not entry:
+                raise ExpressionError("Empty expression")
+            return float(entry[1].evaluate(()))
+        return float(value)
+    
+    def _evaluate(self, expression):
+        """
+        Evaluate expression, or apply it to the worksheet if it is a definition
+        
+        Args:
+            expression (str): Raw mathematical expression string
+            
+        Returns:
+            tuple: (normalized expression, result string) or None for empty input
+        """
+        normalized = _normalize(expression)
+        definition = split_definition(normalized)
+        if definition is not None:
+            return normalized, self._define(*definition)
+        entry = self._compile(normalized)
+        if entry:
+            compiled = entry[1]
+            return entry[0], compiled.format(compiled.evaluate(()))
+        return None
+    
+    def _compile(self, expression):
+        """
+        Compile expression, reusing cached code for repeated input
+        
+        Compiling never changes the calculator: definitions are applied by
+        _evaluate() and are a syntax error here.
+        
+        Args:
+            expression (str): Raw mathematical expression string
+            
+        Returns:
+            tuple: (normalized expression, CompiledExpression) or None for empty input
+        """
+        normalized = _normalize(expression)
+        compiled = self.expression_cache.get(self._cache_key(normalized))
+        if compiled is not None:
+            return compiled
+        
+        # Parse scientific notation into an expression tree in one pass
+        tree = parse(normalized)
+        if tree is None:
+            return None
+        return self._compile_parsed(normalized, tree)
+    
+    def _cache_key(self, normalized):
+        """Expression cache key of a normalized expression"""
+        # Trig calls depend on the angle mode and literals on the number
+        # domain, so both are part of the key
+        return (normalized, self.angle_mode, self.precision_mode, self.precision)
+    
+    def _compile_parsed(self, normalized, tree):
+        """
+        _compile() of an expression already parsed, after a cache miss
+        
+        Returns:
+            tuple: (normalized expression, CompiledExpression)
+        """
+        if self.worksheet.uses(tree):
+            # Reads this calculator's variables: not shareable through the
+            # cache, and checked against their current values
+            return normalized, self._compile_over_worksheet(tree)
+        
+        # Reject pathological expressions before spending any time on them
+        self._check_cost(tree)
+        compiled = (normalized, self._compile_tree(tree))
+        self.expression_cache.put(self._cache_key(normalized), compiled)
+        return compiled
+    
+    def _compile_timed(self, normalized, stopwatch):
+        """
+        _compile() of a normalized expression that charges each stage to a stopwatch
+        
+        Returns:
+            tuple: (_compile() result, whether it came from the cache)
+        """
+        key = self._cache_key(normalized)
+        compiled = self.expression_cache.get(key)
+        stopwatch.lap('cache')
+        if compiled is not None:
+            return compiled, True
+        tree = parse(normalized)
+        stopwatch.lap('parse')
+        if tree is None:
+            return None, False
+        if self.worksheet.uses(tree):
+            compiled = (normalized, self._compile_over_worksheet(tree))
+            stopwatch.lap('compile')
+            return compiled, False
+        self._check_cost(tree)
+        stopwatch.lap('cost')
+        compiled = (normalized, self._compile_tree(tree))
+        self.expression_cache.put(key, compiled)
+        # Without variables the compiler evaluates the whole tree right away
+        stopwatch.lap('evaluate')
+        return compiled, False
+    
+    def _compile_over_worksheet(self, tree, variables=(), bounds=None):
+        """Compile a tree reading worksheet names (see Worksheet.compile)"""
+        return self.worksheet.compile(tree, variables, bounds)
+    
+    def _check_cost(self, tree, names=None):
+        """Raise CostLimitError if the tree exceeds the cost budget (see estimate_cost for names)"""
+        if self.cost_budget is not None:
+            estimate_cost(tree, self.cost_budget, rational=self.precision_mode == 'fraction', names=names)
+    
+    def _compile_tree(self, tree):
+        """Compile a tree for the current angle and precision modes"""
+        if self.precision_mode == 'float' and self.precision is None:
+            return compile_tree(tree, FUNCTION_TABLES[self.angle_mode], CONSTANTS)
+        # Imported on use: only needed once a precision mode is chosen
+        from .precision import compile_precise
+        return compile_precise(tree, self.angle_mode, self.precision_mode, self.precision)
+    
+    def _define(self, name, params, body, values=None):
+        """
+        Apply a definition to the worksheet
+        
+        Args:
+            values (dict): Precomputed variable values (see Worksheet.define)
+        
+        Returns:
+            str: The variable's new value or, for a function, its signature
+        
+        Raises:
+            Exception: The definition's error, or the variable's evaluation error
+        """
+        # The worksheet checks the cost for the current values of the names
+        self.worksheet.define(name, params, body, values)
+        if params is not None:
+            return f"{name}({', '.join(params)})"
+        return format_number(self.worksheet.value(name))
+    
+    def define(self, definition):
+        """
+        Define a variable or function, e.g. 'a = 3' or 'f(x) = sin(x)*x²'
+        
+        Only the definitions depending on the name are recomputed. Like
+        evaluate_expression(), the definition is recorded in history.
+        
+        Args:
+            definition (str): Definition text
+        
+        Returns:
+            str: The variable's value or the function's signature, or "Error"
+        """
+        if split_definition(definition) is None:
+            return "Error"
+        return self.evaluate_expression(definition)
+    
+    def undefine(self, name):
+        """
+        Remove a variable or function
+        
+        Returns:
+            bool: Whether it was defined and no other definition uses it
+        """
+        try:
+            self.worksheet.undefine(name)
+        except ExpressionError:
+            return False
+        return True
+    
+    def get_variables(self):
+        """
+        Get the defined variables and functions
+        
+        Returns:
+            dict: Definition text -> formatted value ("Error" for failed
+            definitions, the signature for functions), in dependency order
+        """
+        variables = {}
+        for cell in self.worksheet:
+            if cell.params is not None:
+                variables[cell.text] = f"{cell.name}({', '.join(cell.params)})"
+            elif cell.error is not None or cell.compiled is None:
+                variables[cell.text] = "Error"
+            else:
+                variables[cell.text] = format_number(cell.value)
+        return variables
+    
+    def _evaluate_instrumented(self, expression, record):
+        """
+        Evaluate with per-stage timing, reporting to the instrumentation
+        
+        Args:
+            expression (str): Mathematical expression string
+            record (bool): Whether to record the result like evaluate_expression
+        
+        Returns:
+            tuple: (result string or None, exception raised or None)
+        """
+        stopwatch = Stopwatch()
+        result = error = None
+        cache_hit = False
+        try:
+            normalized = _normalize(expression)
+            definition = split_definition(normalized)
+            stopwatch.lap('normalize')
+            if definition is not None:
+                entry = (normalized, None)
+                result = self._define(*definition)
+                stopwatch.lap('evaluate')
+            else:
+                entry, cache_hit = self._compile_timed(normalized, stopwatch)
+                if entry:
+                    compiled = entry[1]
+                    value = compiled.evaluate(())
+                    stopwatch.lap('evaluate')
+                    result = compiled.format(value)
+                    stopwatch.lap('format')
+            if entry:
+                if record:
+                    self.record(normalized, result)
+                    stopwatch.lap('record')
+        except Exception as e:
+            result, error = None, e
+        self.instrumentation.observe(expression, result, error, stopwatch, cache_hit)
+        return result, error
+    
+    def enable_instrumentation(self, instrumentation=None):
+        """
+        Time every evaluate_expression and calculate call stage by stage
+        
+        Args:
+            instrumentation (Instrumentation): Collector to report to, e.g.
+                one shared by several calculators (default: a new one)
+        
+        Returns:
+            Instrumentation: The active collector (add hooks to it)
+        """
+        if instrumentation is None:
+            instrumentation = self.instrumentation or Instrumentation()
+        self.instrumentation = instrumentation
+        return instrumentation
+    
+    def disable_instrumentation(self):
+        """Stop timing evaluations (collected statistics are kept by the collector)"""
+        self.instrumentation = None
+    
+    def get_stats(self):
+        """
+        Get a snapshot of the instrumentation counters
+        
+        Returns:
+            dict: See Instrumentation.snapshot(), or None when instrumentation is off
+        """
+        if self.instrumentation is None:
+            return None
+        return self.instrumentation.snapshot()
+    
+    def set_cost_budget(self, budget):
+        """
+        Set the cost budget used to reject expensive expressions
+        
+        Args:
+            budget (CostBudget): New limits, or None to disable the check
+        """
+        self.cost_budget = budget
+        self.worksheet.cost_budget = budget
+        # Cached expressions were only checked against the old budget
+        self.expression_cache.clear()
+    
+    def get_cache_stats(self):
+        """
+        Get compiled expression cache statistics
+        
+        Returns:
+            dict: size, maxsize, hits, misses and evictions
+        """
+        return self.expression_cache.stats()
+    
+    def clear_cache(self):
+        """Clear compiled expression cache"""
+        self.expression_cache.clear()
+    
+    def get_history(self, limit=None):
         """
         Get history records
         
+        Args:
+            limit (int): Only return the most recent `limit` records
+        
+        Returns:
+            list: History records list with formatted display text, oldest first
+        """
+        # Format: [1] 2024-01-01 12:30:45: 2+2 = 4
+        if limit is None:
+            return [entry.format() for entry in self.history]
+        return [entry.format() for entry in reversed(self.history.latest(limit))]
+    
+    def get_history_page(self, offset=0, limit=20):
+        """
+        Get one page of history records, newest first
+        
+        Args:
+            offset (int): Number of newest records to skip
+            limit (int): Maximum number of records in the page
+            
         Returns:
-            list: History records list with formatted display text
+            list: HistoryEntry objects (format() them for display)
         """
-        formatted_history = []
-        for entry in self.history:
-            # Format: [1] 2024-01-01 12:30:45: 2+2 = 4
-            formatted_entry = f"[{entry['number']}] {entry['time']}: {entry['expression']} = {entry['result']}"
-            formatted_history.append(formatted_entry)
-        return formatted_history
+        return self.history.page(offset, limit)
+    
+    def iter_history(self, newest_first=True):
+        """
+        Iterate over history records without formatting them
+        
+        Args:
+            newest_first (bool): Iteration order
+            
+        Returns:
+            iterator: HistoryEntry objects
+        """
+        return self.history.iter_entries(newest_first)
     
     def clear_history(self):
-        """Clear history records"""
-        self.history = []
-        self.history_counter = 1  # Reset counter when clearing history
+        """Clear history records (a persistent log keeps them and its numbering)"""
+        if self.history_log is not None:
+            self.history.clear(self.history_log.next_number)
+        else:
+            self.history.clear()  # Restart numbering at 1
+    
+    def attach_history_log(self, history_log):
+        """
+        Append all future history records to a persistent log
+        
+        The most recent records of the log are loaded into the in-memory
+        history, and numbering continues from the log.
+        
+        Args:
+            history_log (HistoryLog or str): Log, or path of the log to open
+        """
+        from .history_log import HistoryLog
+        if not isinstance(history_log, HistoryLog):
+            history_log = HistoryLog(history_log)
+        self.history_log = history_log
+        tail = history_log.tail(self.history.capacity)
+        self.history.clear(tail[0].number if tail else history_log.next_number)
+        for entry in tail:
+            self.history.append(entry.expression, entry.result, entry.timestamp)
+    
+    def close(self):
+        """Flush and close the persistent history log, if any"""
+        if self.history_log is not None:
+            self.history_log.close()
+    
+    def export_state(self):
+        """
+        Get the user-visible state, e.g. to carry it across a code reload
+        
+        Returns:
+            dict: angle_mode, precision_mode, precision, memory, last_result,
+            history (the history container), history_log and definitions
+            (worksheet definition texts, in an order they can be replayed)
+        """
+        return {
+            'angle_mode': self.angle_mode,
+            'precision_mode': self.precision_mode,
+            'precision': self.precision,
+            'memory': self.memory,
+            'last_result': self.last_result,
+            'history': self.history,
+            'history_log': self.history_log,
+            'definitions': self.worksheet.definitions(),
+        }
+    
+    def import_state(self, state):
+        """
+        Take over state from export_state(), possibly of an older version of this class
+        
+        The history container is adopted as is when it is of this version's
+        history class, otherwise its records are copied.
+        
+        Args:
+            state (dict): From export_state(); missing keys keep their current value
+        """
+        self.set_angle_mode(state.get('angle_mode', self.angle_mode))
+        if state.get('precision_mode', 'float') != 'float' or state.get('precision') is not None:
+            self.set_precision(state['precision_mode'], state.get('precision'))
+        self.memory = state.get('memory', self.memory)
+        self.last_result = state.get('last_result', self.last_result)
+        self.history_log = state.get('history_log', self.history_log)
+        for definition in state.get('definitions', ()):
+            self.worksheet.define(*split_definition(definition))
+        history = state.get('history')
+        if history is None:
+            return
+        if type(history) is self.history_class:
+            self.history = history
+            return
+        entries = list(history.iter_entries())
+        self.history = self.history_class(history.capacity)
+        self.history.clear(entries[0].number if entries else history.next_number)
+        for entry in entries:
+            self.history.append(entry.expression, entry.result, entry.timestamp)
     
     @staticmethod
     def validate_input(current_text, new_char):
         """
         Validate input character
         
+        Checks the key against the whole text, O(len(current_text)); while
+        typing, keep an InputValidator instead, which checks each key in O(1).
+        
         Args:
             current_text (str): Current display text
-            new_char (str): New input character
+            new_char (str): New input character (keypad button label)
             
         Returns:
             bool: Whether input is allowed
         """
-        if not current_text:
-            return True
-            
-        # Avoid consecutive operators
-        if (current_text[-1] in ['+', '-', '*', '/', '.'] and 
-            new_char in ['+', '-', '*', '/', '.']):
-            return False
-        
-        # Validate scientific function inputs
-        scientific_functions = ['sin', 'cos', 'tan', 'cot', 'asin', 'acos', 'atan', 'log', 'ln', 'π', 'e', 'x^y']
-        for func in scientific_functions:
-            if new_char in func:
-                # Allow function input if current text ends with operator or is empty
-                if not current_text or current_text[-1] in ['+', '-', '*', '/', '(']:
-                    return True
-                return False
-        
-        return True
\ No newline at end of file
+        return InputValidator(current_text).is_valid(new_char)
\ No newline at end of file
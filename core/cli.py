@@ -0,0 +1,179 @@
+"""
+Headless Command Line Interface Module
+
+Evaluates expressions line by line from stdin or files and streams the
+results to stdout, without importing any GUI code::
+
+    echo "sin(30)+2^10" | python -m core
+    python -m core --angle rad --format json expressions.txt
+    python main.py --batch < expressions.txt
+
+Each input line is one expression; blank lines are skipped. Memory use
+does not grow with the input: lines are read, evaluated and written one
+at a time, and only the bounded compiled-expression cache is kept.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .bignum import full_digits
+from .calculator_core import CalculatorCore
+
+OUTPUT_FORMATS = ('plain', 'tsv', 'json')
+ERROR_MODES = ('report', 'skip', 'abort')
+
+def build_parser():
+    """
+    Build the command line argument parser
+    
+    Returns:
+        argparse.ArgumentParser: Parser for the batch options
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m core',
+        description="Evaluate one expression per line and stream the results."
+    )
+    parser.add_argument('files', nargs='*', default=['-'], metavar='FILE',
+                        help="input files ('-' or none for stdin)")
+    parser.add_argument('-a', '--angle', choices=('deg', 'rad'), default='deg',
+                        help="angle mode for trigonometric functions (default: deg)")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default='plain',
+                        help="plain: result only, tsv: expression<TAB>result, "
+                             "json: one object per line (default: plain)")
+    parser.add_argument('-e', '--on-error', choices=ERROR_MODES, default='report',
+                        help="report: output 'Error' and describe it on stderr, "
+                             "skip: output nothing, abort: stop at the first error "
+                             "(default: report)")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="do not describe errors on stderr")
+    parser.add_argument('--full-digits', action='store_true',
+                        help="print every digit of huge integer results instead of "
+                             "scientific notation")
+    parser.add_argument('--stats', action='store_true',
+                        help="time every evaluation stage and print a summary to stderr at the end")
+    parser.add_argument('--line-buffered', action='store_true',
+                        help="flush after every result (default when stdin is a terminal)")
+    return parser
+
+def _format_line(output_format, expression, result, error):
+    """Render one output line, without the newline"""
+    if output_format == 'json':
+        record = {'expression': expression}
+        if error is None:
+            record['result'] = result
+        else:
+            record['error'] = str(error) or type(error).__name__
+        return json.dumps(record, ensure_ascii=False)
+    if error is not None:
+        result = "Error"
+    if output_format == 'tsv':
+        return f"{expression}\t{result}"
+    return result
+
+def _open_input(name):
+    if name == '-':
+        return sys.stdin
+    return open(name, encoding='utf-8')
+
+def run(args, stdout=None, stderr=None):
+    """
+    Evaluate all input lines according to parsed arguments
+    
+    Args:
+        args (argparse.Namespace): Options from build_parser()
+        stdout: Text stream for results (default: sys.stdout)
+        stderr: Text stream for error descriptions (default: sys.stderr)
+    
+    Returns:
+        int: Exit status: 0 if every expression evaluated, 1 otherwise
+    """
+    stdout = sys.stdout if stdout is None else stdout
+    stderr = sys.stderr if stderr is None else stderr
+    core = CalculatorCore()
+    core.set_angle_mode(args.angle)
+    if args.stats:
+        core.enable_instrumentation()
+    flush = args.line_buffered or '-' in args.files and sys.stdin.isatty()
+    try:
+        return _run_files(args, core, stdout, stderr, flush)
+    finally:
+        if args.stats:
+            _write_stats(core.get_stats(), stderr)
+
+def _write_stats(stats, stderr):
+    """Print an instrumentation snapshot as a small table"""
+    errors = ', '.join(f"{name} {count}" for name, count in stats['errors'].items()) or 'none'
+    stderr.write(f"{stats['calls']} evaluations, {stats['cache_hits']} cache hits, errors: {errors}\n")
+    stderr.write(f"{'stage':10s} {'calls':>8s} {'total ms':>10s} {'mean us':>9s} {'max us':>9s}\n")
+    for stage, timer in list(stats['stages'].items()) + [('total', stats['total'])]:
+        if timer['calls']:
+            stderr.write(f"{stage:10s} {timer['calls']:8d} {timer['total_us'] / 1000:10.2f} "
+                         f"{timer['mean_us']:9.2f} {timer['max_us']:9.2f}\n")
+
+def _run_files(args, core, stdout, stderr, flush):
+    """Evaluate every input file; returns the exit status"""
+    calculate = core.calculate
+    write = stdout.write
+    status = 0
+    
+    for name in args.files:
+        source = _open_input(name)
+        try:
+            for number, line in enumerate(source, 1):
+                expression = line.strip()
+                if not expression:
+                    continue
+                try:
+                    result = calculate(expression)
+                    if args.full_digits and result is not None:
+                        result = full_digits(result)
+                    error = None
+                except Exception as e:
+                    result = None
+                    error = e
+                
+                if error is not None:
+                    status = 1
+                    if not args.quiet:
+                        stderr.write(f"{name}:{number}: {expression}: {error or type(error).__name__}\n")
+                    if args.on_error == 'abort':
+                        return status
+                    if args.on_error == 'skip':
+                        continue
+                
+                write(_format_line(args.format, expression, result, error))
+                write('\n')
+                if flush:
+                    stdout.flush()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+    return status
+
+def main(argv=None):
+    """
+    Command line entry point
+    
+    Args:
+        argv (list): Arguments without the program name (default: sys.argv[1:])
+    
+    Returns:
+        int: Exit status
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        status = run(args)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Output closed early (e.g. piped into head): stop quietly, and keep
+        # the interpreter from failing again when it flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except OSError as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+    return status
\ No newline at end of file
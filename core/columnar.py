@@ -0,0 +1,368 @@
+"""
+Columnar Streaming Evaluation Module
+
+Applies calculator formulas to every row of tables larger than memory.
+Input columns are raw binary files, memory-mapped, or the columns of a
+CSV file parsed in large chunks; each column is bound to the expression
+variable of the same name. Formulas are compiled once and evaluated with
+NumPy one chunk of rows at a time, and the result columns of a chunk are
+written out before the next one is read, so memory use depends on the
+chunk size and not on the file size::
+    
+    python -m core.columnar --csv data.csv --output results.csv "r = sqrt(x²+y²)" "phi = atan(y/x)"
+    python -m core.columnar --column x=x.f64 --column y=y.f64 --output-dir out "r = sqrt(x²+y²)"
+
+Later formulas may use the results of earlier ones. Invalid points
+(domain errors, division by zero) give nan or inf, as in vectorize().
+"""
+
+import argparse
+import io
+import itertools
+import os
+import sys
+import time
+
+from .compiler import CONSTANTS, _children
+from .parser import ExpressionError, Name, parse
+from .vectorized import HAS_NUMPY, VectorizedExpression, np
+from .worksheet import split_definition
+
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for columnar evaluation")
+
+class BinaryColumns:
+    """Input columns stored as raw binary arrays, one file per column"""
+    
+    def __init__(self, paths, dtype='float64'):
+        """
+        Args:
+            paths (dict): Column name -> file path
+            dtype (str): NumPy dtype of the stored values, native byte order
+                unless given (e.g. '<f4')
+        
+        Raises:
+            ValueError: If a file ends in a partial value or the files hold
+                different numbers of values
+            OSError: If a file cannot be read
+        """
+        _require_numpy()
+        self.dtype = np.dtype(dtype)
+        self._paths = dict(paths)
+        lengths = set()
+        for path in self._paths.values():
+            rows, extra = divmod(os.path.getsize(path), self.dtype.itemsize)
+            if extra:
+                raise ValueError(f"{path}: size is not a multiple of {self.dtype.itemsize} bytes ({self.dtype})")
+            lengths.add(rows)
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        self.rows = lengths.pop() if lengths else 0
+    
+    @property
+    def columns(self):
+        """Column names"""
+        return tuple(self._paths)
+    
+    def chunks(self, names, chunk_rows):
+        """
+        Read columns a chunk at a time
+        
+        Each chunk maps its own window of the files, unmapped once the chunk
+        is dropped, so the pages already read do not accumulate in memory.
+        
+        Args:
+            names (iterable): Columns to read
+            chunk_rows (int): Rows per chunk
+        
+        Yields:
+            tuple: (dict of column name -> array view, number of rows,
+            fraction of the input read)
+        """
+        paths = [(name, self._paths[name]) for name in names]
+        dtype, rows = self.dtype, self.rows
+        for start in range(0, rows, chunk_rows):
+            count = min(chunk_rows, rows - start)
+            columns = {name: np.memmap(path, dtype, mode='r', offset=start * dtype.itemsize, shape=(count,))
+                       for name, path in paths}
+            yield columns, count, (start + count) / rows
+    
+    def close(self):
+        """Nothing to release: windows are unmapped chunk by chunk"""
+
+class CSVColumns:
+    """Input columns of a CSV file with a header row, parsed in chunks"""
+    
+    def __init__(self, path, delimiter=','):
+        """
+        Args:
+            path (str): CSV file; the first line names the columns
+            delimiter (str): Field separator
+        """
+        _require_numpy()
+        self.delimiter = delimiter
+        self._size = os.path.getsize(path)
+        # Binary mode: lines are split without decoding and tell() works while iterating
+        self._file = open(path, 'rb')
+        header = self._file.readline().decode('utf-8-sig').strip()
+        self._columns = tuple(name.strip() for name in header.split(delimiter)) if header else ()
+        self.rows = None  # Unknown until read
+    
+    @property
+    def columns(self):
+        """Column names"""
+        return self._columns
+    
+    def chunks(self, names, chunk_rows):
+        """
+        Read columns a chunk at a time
+        
+        Args:
+            names (iterable): Columns to read
+            chunk_rows (int): Rows per chunk
+        
+        Yields:
+            tuple: (dict of column name -> float array, number of rows,
+            fraction of the file read)
+        
+        Raises:
+            ValueError: For rows that are not numbers in every column read
+        """
+        names = list(names)
+        indices = [self._columns.index(name) for name in names]
+        file = self._file
+        while True:
+            lines = list(itertools.islice(file, chunk_rows))
+            if not lines:
+                return
+            text = io.StringIO(b''.join(lines).decode('utf-8'))
+            table = np.loadtxt(text, delimiter=self.delimiter, usecols=indices or None, dtype=float, ndmin=2)
+            yield ({name: table[:, index] for index, name in enumerate(names)}, len(table),
+                   file.tell() / self._size)
+    
+    def close(self):
+        """Close the file"""
+        self._file.close()
+
+class BinaryColumnWriter:
+    """Result columns written as raw binary arrays, one file per column"""
+    
+    def __init__(self, paths, dtype='float64'):
+        """
+        Args:
+            paths (dict): Result name -> file path
+            dtype (str): NumPy dtype to store the values as
+        """
+        _require_numpy()
+        self.dtype = np.dtype(dtype)
+        self._files = {name: open(path, 'wb') for name, path in paths.items()}
+    
+    def write(self, columns):
+        """Append a chunk: dict of result name -> array"""
+        for name, file in self._files.items():
+            np.asarray(columns[name], dtype=self.dtype).tofile(file)
+    
+    def close(self):
+        for file in self._files.values():
+            file.close()
+
+class CSVWriter:
+    """Result columns written to a CSV file with a header row"""
+    
+    def __init__(self, path, names, delimiter=','):
+        """
+        Args:
+            path (str): Output file
+            names (list): Result names, in column order
+            delimiter (str): Field separator
+        """
+        self.names = list(names)
+        self.delimiter = delimiter
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._file.write(delimiter.join(self.names) + '\n')
+    
+    def write(self, columns):
+        """Append a chunk: dict of result name -> array"""
+        # repr() gives the shortest text that reads back as the same float
+        texts = [map(repr, columns[name].tolist()) for name in self.names]
+        lines = map(self.delimiter.join, zip(*texts)) if len(texts) > 1 else texts[0]
+        self._file.write('\n'.join(lines))
+        self._file.write('\n')
+    
+    def close(self):
+        self._file.close()
+
+class StreamProgress:
+    """Progress of a streaming evaluation, passed to progress callbacks"""
+    __slots__ = ('rows', 'chunks', 'fraction', 'elapsed')
+    
+    def __init__(self, rows, chunks, fraction, elapsed):
+        self.rows = rows  # Rows evaluated so far
+        self.chunks = chunks
+        self.fraction = fraction  # Fraction of the input read
+        self.elapsed = elapsed  # Seconds
+    
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+    
+    def __repr__(self):
+        return (f"StreamProgress(rows={self.rows}, chunks={self.chunks}, fraction={self.fraction:.3f}, "
+                f"elapsed={self.elapsed:.3f} s, rows_per_sec={self.rows_per_sec:,.0f})")
+
+def compile_formulas(formulas, columns, angle_mode='deg'):
+    """
+    Compile formulas over named columns
+    
+    Args:
+        formulas: Iterable of 'name = expression' strings, or a dict of
+            result name -> expression
+        columns (iterable): Input column names available as variables
+        angle_mode (str): 'deg' or 'rad'
+    
+    Returns:
+        list: (result name, VectorizedExpression) in evaluation order
+    
+    Raises:
+        ExpressionError: For malformed formulas or variables that are
+            neither input columns nor earlier results
+    """
+    _require_numpy()
+    if isinstance(formulas, dict):
+        formulas = [f"{name} = {expression}" for name, expression in formulas.items()]
+    available = set(columns)
+    compiled = []
+    for formula in formulas:
+        definition = split_definition(formula)
+        if definition is None or definition[1] is not None:
+            raise ExpressionError(f"Expected 'name = expression', got {formula!r}")
+        name, _, expression = definition
+        expression = expression.replace('×', '*').replace('÷', '/')
+        tree = parse(expression)
+        if tree is None:
+            raise ExpressionError(f"Empty formula for {name!r}")
+        variables = tuple(sorted(_free_names(tree)))
+        for variable in variables:
+            if variable not in available:
+                raise ExpressionError(f"Unknown column {variable!r} in {formula!r}")
+        compiled.append((name, VectorizedExpression(expression, variables, angle_mode, use_numpy=True)))
+        available.add(name)
+    return compiled
+
+def _free_names(tree):
+    """Names in a tree that are not built-in constants"""
+    names = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Name):
+            if node.name not in CONSTANTS:
+                names.add(node.name)
+        stack.extend(_children(node))
+    return names
+
+def evaluate_columns(formulas, source, writer, chunk_rows=DEFAULT_CHUNK_ROWS, angle_mode='deg', progress=None):
+    """
+    Evaluate formulas over every row of a column source, streaming the results
+    
+    Args:
+        formulas: 'name = expression' strings or a dict (see compile_formulas)
+        source: BinaryColumns or CSVColumns
+        writer: BinaryColumnWriter or CSVWriter receiving the result columns
+        chunk_rows (int): Rows evaluated at once; memory use is proportional
+        angle_mode (str): 'deg' or 'rad'
+        progress (callable): Called with a StreamProgress after each chunk
+    
+    Returns:
+        StreamProgress: Final totals
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be positive")
+    compiled = compile_formulas(formulas, source.columns, angle_mode)
+    results = {name for name, _ in compiled}
+    needed = sorted({variable for _, expression in compiled for variable in expression.variables} - results)
+    start = time.perf_counter()
+    state = StreamProgress(0, 0, 0.0, 0.0)
+    for chunk, rows, fraction in source.chunks(needed, chunk_rows):
+        for name, expression in compiled:
+            value = expression(*(chunk[variable] for variable in expression.variables))
+            if value.shape != (rows,):
+                value = np.broadcast_to(value, (rows,))  # Formula without variables
+            chunk[name] = value
+        writer.write(chunk)
+        state = StreamProgress(state.rows + rows, state.chunks + 1, fraction, time.perf_counter() - start)
+        if progress is not None:
+            progress(state)
+    state.elapsed = time.perf_counter() - start
+    return state
+
+def _parse_column(text):
+    name, separator, path = text.partition('=')
+    if not separator or not name or not path:
+        raise argparse.ArgumentTypeError(f"expected NAME=PATH, got {text!r}")
+    return name.strip(), path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m core.columnar',
+                                     description="Evaluate formulas over every row of large column files.")
+    parser.add_argument('formulas', nargs='+', metavar='FORMULA', help="'name = expression' over input columns")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help="input CSV file with a header row")
+    source.add_argument('--column', type=_parse_column, action='append', metavar='NAME=PATH',
+                        help="raw binary input column (repeat for each column)")
+    parser.add_argument('--dtype', default='float64', help="dtype of binary input columns (default: float64)")
+    parser.add_argument('--output', help="output CSV file")
+    parser.add_argument('--output-dir', help="directory for raw float64 result files named NAME.f64")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="rows evaluated at once (default: %(default)s)")
+    parser.add_argument('--angle', choices=('deg', 'rad'), default='deg', help="angle mode (default: deg)")
+    parser.add_argument('--quiet', action='store_true', help="do not report progress on stderr")
+    args = parser.parse_args(argv)
+    if (args.output is None) == (args.output_dir is None):
+        parser.error("give exactly one of --output and --output-dir")
+    
+    definitions = [split_definition(formula) for formula in args.formulas]
+    if None in definitions:
+        parser.error(f"expected 'name = expression', got {args.formulas[definitions.index(None)]!r}")
+    names = [definition[0] for definition in definitions]
+    try:
+        source = CSVColumns(args.csv) if args.csv else BinaryColumns(dict(args.column), args.dtype)
+    except OSError as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 2
+    except ValueError as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 1
+    try:
+        if args.output:
+            writer = CSVWriter(args.output, names)
+        else:
+            os.makedirs(args.output_dir, exist_ok=True)
+            writer = BinaryColumnWriter({name: os.path.join(args.output_dir, f"{name}.f64") for name in names})
+        
+        def report(state):
+            sys.stderr.write(f"\r{state.fraction:6.1%}  {state.rows:,} rows  {state.rows_per_sec:,.0f} rows/s")
+            sys.stderr.flush()
+        
+        try:
+            state = evaluate_columns(args.formulas, source, writer, args.chunk_rows, args.angle,
+                                     None if args.quiet else report)
+        finally:
+            writer.close()
+    except (ExpressionError, ValueError) as e:
+        sys.stderr.write(f"\nerror: {e}\n")
+        return 1
+    except OSError as e:
+        sys.stderr.write(f"\nerror: {e}\n")
+        return 2
+    finally:
+        source.close()
+    if not args.quiet:
+        sys.stderr.write(f"\n{state.rows:,} rows in {state.elapsed:.2f} s ({state.rows_per_sec:,.0f} rows/s)\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
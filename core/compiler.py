@@ -0,0 +1,455 @@
+"""
+Expression Tree Compiler Module
+
+Compiles parsed expression trees into nested Python closures, so an
+expression is analysed once and can then be executed repeatedly without
+any string processing or eval. Before compiling, constant subtrees are
+folded into their values and common subexpressions are factored out.
+"""
+
+import math
+import operator
+
+from .bignum import format_number
+from .cache import SharedCache
+from .parser import BinOp, Call, ExpressionError, Name, Number, UnaryOp, parse
+
+ANGLE_MODES = ('deg', 'rad')
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '//': operator.floordiv,
+    '%': operator.mod,
+    '^': operator.pow,
+}
+
+CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e,
+}
+
+def _factorial(x):
+    """Factorial that also accepts integral floats such as 5.0"""
+    if isinstance(x, float) and x.is_integer():
+        x = int(x)
+    return math.factorial(x)
+
+def _cbrt(x):
+    """Real cube root"""
+    return math.copysign(abs(x) ** (1 / 3), x)
+
+def _cot(x):
+    """Cotangent"""
+    return 1 / math.tan(x)
+
+def _degrees_in(func):
+    """Wrap a trig function so it takes its argument in degrees"""
+    def wrapped(x):
+        return func(math.radians(x))
+    return wrapped
+
+def _degrees_out(func):
+    """Wrap an inverse trig function so it returns degrees"""
+    def wrapped(x):
+        return math.degrees(func(x))
+    return wrapped
+
+_TRIG_FUNCTIONS = {'sin': math.sin, 'cos': math.cos, 'tan': math.tan, 'cot': _cot}
+_INV_TRIG_FUNCTIONS = {'asin': math.asin, 'acos': math.acos, 'atan': math.atan}
+_OTHER_FUNCTIONS = {
+    'log': math.log10,
+    'ln': math.log,
+    'sqrt': math.sqrt,
+    'cbrt': getattr(math, 'cbrt', _cbrt),
+    'abs': abs,
+    'exp': math.exp,
+    'factorial': _factorial,
+}
+
+def _build_function_table(angle_mode):
+    """
+    Build name -> (callable, arity) table for an angle mode
+    
+    Args:
+        angle_mode (str): 'deg' or 'rad'
+    
+    Returns:
+        dict: Function table
+    """
+    table = {}
+    for name, func in _TRIG_FUNCTIONS.items():
+        table[name] = (_degrees_in(func) if angle_mode == 'deg' else func, 1)
+    for name, func in _INV_TRIG_FUNCTIONS.items():
+        table[name] = (_degrees_out(func) if angle_mode == 'deg' else func, 1)
+    for name, func in _OTHER_FUNCTIONS.items():
+        table[name] = (func, 1)
+    return table
+
+FUNCTION_TABLES = {mode: _build_function_table(mode) for mode in ANGLE_MODES}
+
+# Results of pure function calls, shared by all compilations: folding sin(30)
+# or 170! in one expression serves every later expression containing it
+PURE_CALL_CACHE = SharedCache(1024)
+_PURE_FUNCTIONS = frozenset(func for table in FUNCTION_TABLES.values() for func, _ in table.values())
+# Memoized at run time too: cheaper to look up than to recompute
+_RUNTIME_MEMOIZED = frozenset([_factorial])
+_MAX_CACHED_BITS = 1 << 16  # Larger integer results are not pinned in memory
+_MISSING = object()
+
+def _call_pure(func, arg):
+    """Call a one-argument pure function through PURE_CALL_CACHE"""
+    if not arg:
+        # 0.0 and -0.0 are equal keys, but e.g. sin() keeps the sign
+        return func(arg)
+    key = (func, arg.__class__, arg)
+    result = PURE_CALL_CACHE.get(key, _MISSING)
+    if result is _MISSING:
+        result = func(arg)
+        if result.__class__ is not int or result.bit_length() <= _MAX_CACHED_BITS:
+            PURE_CALL_CACHE.put(key, result)
+    return result
+
+class Constant:
+    """Folded constant subtree (created by the optimizer, not the parser)"""
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __repr__(self):
+        return f"Constant({self.value!r})"
+
+class Shared:
+    """Common subexpression, evaluated once per evaluate() call into an extra env slot"""
+    __slots__ = ('index',)
+    
+    def __init__(self, index):
+        self.index = index
+    
+    def __repr__(self):
+        return f"Shared({self.index})"
+
+class CompiledExpression:
+    """Executable form of an expression tree"""
+    __slots__ = ('tree', 'variables', 'evaluate', 'format')
+    
+    def __init__(self, tree, variables, evaluate, format=format_number):
+        self.tree = tree
+        self.variables = variables
+        # evaluate(env) takes a tuple of variable values in `variables` order
+        self.evaluate = evaluate
+        # format(value) renders an evaluate() result as the result string
+        self.format = format
+    
+    def __call__(self, *values):
+        if len(values) != len(self.variables):
+            raise TypeError(f"expected {len(self.variables)} values, got {len(values)}")
+        return self.evaluate(values)
+    
+    def __repr__(self):
+        return f"CompiledExpression({self.tree!r}, variables={self.variables!r})"
+
+def compile_tree(tree, functions, constants=CONSTANTS, variables=(), literal=None, operators=BINARY_OPERATORS,
+                 optimize=True):
+    """
+    Compile an expression tree into a CompiledExpression
+    
+    Args:
+        tree: Expression tree root node
+        functions (dict): name -> (callable, arity) function table
+        constants (dict): name -> value for named constants
+        variables (tuple): Free variable names, in argument order
+        literal (callable): Number node -> value, for number types other
+            than the parsed int/float (default: the node's value)
+        operators (dict): Binary operator symbol -> callable
+        optimize (bool): Fold constants and factor out common subexpressions
+            first (see optimize_tree); results are identical either way
+    
+    Returns:
+        CompiledExpression: Executable expression
+    
+    Raises:
+        ExpressionError: For unknown names, unknown functions or wrong arity
+    """
+    variables = tuple(variables)
+    slots = {name: index for index, name in enumerate(variables)}
+    if not optimize:
+        evaluate = _compile_node(tree, functions, constants, slots, literal, operators)
+        return CompiledExpression(tree, variables, evaluate)
+    
+    if not slots:
+        # Usual calculator input: the whole tree is one constant
+        try:
+            value = _constant_value(tree, functions, constants, literal, operators)
+        except (KeyError, ExpressionError):
+            pass  # Invalid: compiled below, raising the proper ExpressionError
+        except Exception as error:
+            # Raises at run time: checked for invalid names, but not folded
+            # again only to hit the same error
+            _compile_node(tree, functions, constants, slots, literal, operators)
+            return CompiledExpression(tree, variables, _raising(error.with_traceback(None)))
+        else:
+            return CompiledExpression(tree, variables, lambda env: value)
+    
+    root, definitions = optimize_tree(tree, functions, constants, slots, literal, operators)
+    evaluate = _compile_node(root, functions, constants, slots, literal, operators, memoize=True)
+    if definitions:
+        steps = tuple(_compile_node(definition, functions, constants, slots, literal, operators, memoize=True)
+                      for definition in definitions)
+        result = evaluate
+        
+        def evaluate(env):
+            for step in steps:
+                env = env + (step(env),)
+            return result(env)
+    
+    return CompiledExpression(tree, variables, evaluate)
+
+def optimize_tree(tree, functions, constants=CONSTANTS, slots=None, literal=None, operators=BINARY_OPERATORS):
+    """
+    Fold constant subtrees and factor out common subexpressions
+    
+    Constant subtrees are evaluated here, once, with the same functions and
+    operators evaluate() would use, so results are identical; a subtree
+    whose evaluation raises is kept, to raise at run time as before. Calls
+    of pure functions go through PURE_CALL_CACHE. With variables, a
+    subtree occurring more than once is evaluated once per evaluate() call.
+    
+    Args:
+        tree: Expression tree root node
+        functions (dict): name -> (callable, arity) function table
+        constants (dict): name -> value for named constants
+        slots (dict): Variable name -> env index
+        literal (callable): Number node -> value (default: the node's value)
+        operators (dict): Binary operator symbol -> callable
+    
+    Returns:
+        tuple: (root, definitions); both may contain Constant nodes and
+        Shared(index) references, where index counts on from the variables
+        and definitions[index - len(slots)] computes the value
+    
+    Raises:
+        ExpressionError: For unknown names, unknown functions or wrong arity
+    """
+    slots = slots or {}
+    track = bool(slots)  # Without variables everything valid folds, no CSE needed
+    keys = {}  # id(BinOp/Call node) -> structural key
+    
+    def fold(node):
+        """Return (folded node, structural key or None)"""
+        if isinstance(node, Number):
+            folded = Constant(node.value if literal is None else literal(node))
+            return folded, track and ('number', node.value.__class__, node.value, node.text)
+        
+        if isinstance(node, Name):
+            name = node.name
+            if name in slots:
+                return node, ('name', name)
+            if name in constants:
+                return Constant(constants[name]), track and ('name', name)
+            raise ExpressionError(f"Unknown name {name!r}")
+        
+        if isinstance(node, UnaryOp):
+            operand, key = fold(node.operand)
+            folded = UnaryOp(node.op, operand)
+            if isinstance(operand, Constant):
+                func = operator.neg if node.op == '-' else operator.pos
+                folded = _fold_call(folded, func, (operand.value,))
+            return folded, track and ('unary', node.op, key)
+        
+        if isinstance(node, BinOp):
+            func = operators[node.op]
+            (left, left_key), (right, right_key) = fold(node.left), fold(node.right)
+            folded = BinOp(node.op, left, right)
+            if isinstance(left, Constant) and isinstance(right, Constant):
+                folded = _fold_call(folded, func, (left.value, right.value))
+            key = track and ('binary', node.op, left_key, right_key)
+            if track:
+                keys[id(folded)] = key
+            return folded, key
+        
+        if isinstance(node, Call):
+            try:
+                func, arity = functions[node.name]
+            except KeyError:
+                raise ExpressionError(f"Unknown function {node.name!r}") from None
+            if len(node.args) != arity:
+                raise ExpressionError(f"{node.name}() takes {arity} argument(s), got {len(node.args)}")
+            args, arg_keys = zip(*map(fold, node.args)) if node.args else ((), ())
+            folded = Call(node.name, args)
+            if all(isinstance(arg, Constant) for arg in args):
+                values = tuple(arg.value for arg in args)
+                if arity == 1 and func in _PURE_FUNCTIONS:
+                    folded = _fold_call(folded, _call_pure, (func, values[0]))
+                else:
+                    folded = _fold_call(folded, func, values)
+            key = track and ('call', node.name, arg_keys)
+            if track:
+                keys[id(folded)] = key
+            return folded, key
+        
+        raise ExpressionError(f"Unsupported node {node!r}")
+    
+    root, _ = fold(tree)
+    if not track:
+        return root, []
+    
+    # Count uses, not descending into repeats: their insides are shared with them
+    uses = {}
+    
+    def count(node):
+        if isinstance(node, (BinOp, Call)):
+            key = keys[id(node)]
+            uses[key] = uses.get(key, 0) + 1
+            if uses[key] > 1:
+                return
+        for child in _children(node):
+            count(child)
+    
+    shared = {}  # key -> Shared reference
+    definitions = []
+    
+    def rewrite(node):
+        if isinstance(node, (BinOp, Call)):
+            key = keys[id(node)]
+            if uses[key] > 1:
+                reference = shared.get(key)
+                if reference is None:
+                    # Children first, so definitions only refer to earlier ones
+                    definitions.append(rebuild(node))
+                    reference = shared[key] = Shared(len(slots) + len(definitions) - 1)
+                return reference
+        return rebuild(node)
+    
+    def rebuild(node):
+        if isinstance(node, UnaryOp):
+            return UnaryOp(node.op, rewrite(node.operand))
+        if isinstance(node, BinOp):
+            return BinOp(node.op, rewrite(node.left), rewrite(node.right))
+        if isinstance(node, Call):
+            return Call(node.name, [rewrite(arg) for arg in node.args])
+        return node
+    
+    count(root)
+    return rewrite(root), definitions
+
+def _raising(error):
+    """evaluate() raising an error found at compile time"""
+    
+    def evaluate(env):
+        raise error.with_traceback(None)
+    
+    return evaluate
+
+def _constant_value(node, functions, constants, literal, operators):
+    """Value of a tree without variables, evaluated directly"""
+    cls = node.__class__
+    if cls is Number:
+        return node.value if literal is None else literal(node)
+    if cls is BinOp:
+        return operators[node.op](_constant_value(node.left, functions, constants, literal, operators),
+                                  _constant_value(node.right, functions, constants, literal, operators))
+    if cls is Call:
+        func, arity = functions[node.name]
+        if len(node.args) != arity:
+            raise ExpressionError(f"{node.name}() takes {arity} argument(s), got {len(node.args)}")
+        args = [_constant_value(arg, functions, constants, literal, operators) for arg in node.args]
+        if arity == 1 and func in _PURE_FUNCTIONS:
+            return _call_pure(func, args[0])
+        return func(*args)
+    if cls is UnaryOp:
+        value = _constant_value(node.operand, functions, constants, literal, operators)
+        return -value if node.op == '-' else +value
+    if cls is Name:
+        return constants[node.name]
+    raise ExpressionError(f"Unsupported node {node!r}")
+
+def _fold_call(node, func, args):
+    """Constant of func(*args), or node unchanged if the call raises"""
+    try:
+        return Constant(func(*args))
+    except Exception:
+        return node
+
+def _children(node):
+    """Child nodes of a tree node"""
+    if isinstance(node, UnaryOp):
+        return (node.operand,)
+    if isinstance(node, BinOp):
+        return (node.left, node.right)
+    if isinstance(node, Call):
+        return node.args
+    return ()
+
+def compile_expression(expression, angle_mode='deg', variables=()):
+    """
+    Parse and compile expression text
+    
+    Args:
+        expression (str): Expression string
+        angle_mode (str): 'deg' or 'rad'
+        variables (tuple): Free variable names, in argument order
+    
+    Returns:
+        CompiledExpression: Executable expression, or None for empty input
+    """
+    tree = parse(expression)
+    if tree is None:
+        return None
+    return compile_tree(tree, FUNCTION_TABLES[angle_mode], CONSTANTS, variables)
+
+def _compile_node(node, functions, constants, slots, literal=None, operators=BINARY_OPERATORS, memoize=False):
+    """Recursively turn a node into a closure taking the variable tuple"""
+    if isinstance(node, Number):
+        value = node.value if literal is None else literal(node)
+        return lambda env: value
+    
+    if isinstance(node, Constant):
+        value = node.value
+        return lambda env: value
+    
+    if isinstance(node, Shared):
+        index = node.index
+        return lambda env: env[index]
+    
+    if isinstance(node, Name):
+        name = node.name
+        if name in slots:
+            index = slots[name]
+            return lambda env: env[index]
+        if name in constants:
+            value = constants[name]
+            return lambda env: value
+        raise ExpressionError(f"Unknown name {name!r}")
+    
+    if isinstance(node, UnaryOp):
+        operand = _compile_node(node.operand, functions, constants, slots, literal, operators, memoize)
+        if node.op == '-':
+            return lambda env: -operand(env)
+        return lambda env: +operand(env)
+    
+    if isinstance(node, BinOp):
+        func = operators[node.op]
+        left = _compile_node(node.left, functions, constants, slots, literal, operators, memoize)
+        right = _compile_node(node.right, functions, constants, slots, literal, operators, memoize)
+        return lambda env: func(left(env), right(env))
+    
+    if isinstance(node, Call):
+        try:
+            func, arity = functions[node.name]
+        except KeyError:
+            raise ExpressionError(f"Unknown function {node.name!r}") from None
+        if len(node.args) != arity:
+            raise ExpressionError(f"{node.name}() takes {arity} argument(s), got {len(node.args)}")
+        args = [_compile_node(arg, functions, constants, slots, literal, operators, memoize) for arg in node.args]
+        if arity == 1:
+            arg = args[0]
+            if memoize and func in _RUNTIME_MEMOIZED:
+                return lambda env: _call_pure(func, arg(env))
+            return lambda env: func(arg(env))
+        return lambda env: func(*[arg(env) for arg in args])
+    
+    raise ExpressionError(f"Unsupported node {node!r}")
\ No newline at end of file
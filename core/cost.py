@@ -0,0 +1,285 @@
+"""
+Static Expression Cost Estimator Module
+
+Bounds the magnitude of every intermediate value of an expression tree
+before it is evaluated, so pathological input such as ``9^9^9``,
+``100000!`` or ``99!!`` is rejected in microseconds instead of pinning
+a CPU for seconds or hours.
+
+Magnitudes are tracked as upper bounds on log2|value|. Only exact
+integer arithmetic can get expensive: float results overflow (and
+raise) as soon as they pass ~2**1024, so they are capped there.
+
+Names default to floats. Callers that know better, like the worksheet,
+pass bounds for their current values and the bodies of user functions,
+which are then estimated at each call with the bounds of its arguments.
+"""
+
+import math
+
+from .parser import BinOp, Call, Name, Number, UnaryOp
+
+_FLOAT_BITS = 1024.0  # log2 of the largest finite float
+_LOG2_E = 1 / math.log(2)
+_LOG2_10 = math.log2(10)
+
+class CostLimitError(ValueError):
+    """Raised when an expression is estimated to exceed the cost budget"""
+
+class CostBudget:
+    """Limits applied by the cost estimator (instances are immutable)"""
+    __slots__ = ('max_bits', 'max_factorial', 'max_literal_digits', 'max_depth')
+    
+    def __init__(self, max_bits=1_000_000, max_factorial=50_000, max_literal_digits=1000, max_depth=200):
+        """
+        Args:
+            max_bits (int): Largest integer result or intermediate, in bits
+            max_factorial (int): Largest factorial argument
+            max_literal_digits (int): Longest integer literal, in decimal digits
+            max_depth (int): Deepest nesting of operators and calls
+        """
+        object.__setattr__(self, 'max_bits', max_bits)
+        object.__setattr__(self, 'max_factorial', max_factorial)
+        object.__setattr__(self, 'max_literal_digits', max_literal_digits)
+        object.__setattr__(self, 'max_depth', max_depth)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("CostBudget is immutable")
+    
+    def __reduce__(self):
+        # Pickled through the constructor, since attributes cannot be set
+        return (CostBudget, (self.max_bits, self.max_factorial, self.max_literal_digits, self.max_depth))
+    
+    def __repr__(self):
+        return (f"CostBudget(max_bits={self.max_bits}, max_factorial={self.max_factorial}, "
+                f"max_literal_digits={self.max_literal_digits}, max_depth={self.max_depth})")
+
+DEFAULT_COST_BUDGET = CostBudget()
+
+# Upper bounds on log2|f(x)| given log2|x| (float-valued functions)
+_FUNCTION_BITS = {
+    'sin': lambda bits: 0.0,
+    'cos': lambda bits: 0.0,
+    'tan': lambda bits: _FLOAT_BITS,
+    'cot': lambda bits: _FLOAT_BITS,
+    'asin': lambda bits: 8.0,
+    'acos': lambda bits: 8.0,
+    'atan': lambda bits: 8.0,
+    'log': lambda bits: math.log2(max(bits, 1.0)),
+    'ln': lambda bits: math.log2(max(bits, 1.0)),
+    'sqrt': lambda bits: bits / 2,
+    'cbrt': lambda bits: bits / 3,
+    'exp': lambda bits: _FLOAT_BITS if bits > 10 else _LOG2_E * 2.0 ** bits,
+}
+
+def _log2_abs(value):
+    """log2|value| for an int or float literal (-inf for zero)"""
+    if not value:
+        return -math.inf
+    return math.log2(abs(value))
+
+def _log2_add(a, b):
+    """Upper bound of log2(|x| + |y|) given log2|x| = a and log2|y| = b"""
+    high, low = (a, b) if a >= b else (b, a)
+    if low == -math.inf:
+        return high
+    if high == math.inf:
+        return math.inf
+    return high + math.log2(1 + 2.0 ** (low - high))
+
+def _log2_factorial(n):
+    """log2(n!)"""
+    return math.lgamma(n + 1) * _LOG2_E
+
+def value_bound(value):
+    """
+    Bound of a known value, for the names argument of estimate_cost()
+    
+    Returns:
+        tuple: (log2|value|, whether it is an exact int)
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return _FLOAT_BITS, False
+    if isinstance(value, int):
+        return _log2_abs(value), True
+    if math.isnan(value):
+        return -math.inf, False
+    return min(_log2_abs(value), _FLOAT_BITS), False
+
+def estimate_cost(tree, budget=DEFAULT_COST_BUDGET, rational=False, names=None, functions=None):
+    """
+    Check an expression tree against a cost budget
+    
+    Args:
+        tree: Expression tree root node
+        budget (CostBudget): Limits to enforce
+        rational (bool): Evaluation uses exact fractions, so decimal literals
+            and divisions are exact too and bits bound numerator plus denominator
+        names (Mapping): Name -> (log2 bound, is exact int) for names that are
+            not floats, e.g. from value_bound(); only get() is used
+        functions (Mapping): User function name -> (parameter names, body tree)
+    
+    Returns:
+        float: Upper bound on log2 of the result magnitude
+    
+    Raises:
+        CostLimitError: If any limit would be exceeded
+    """
+    return _Estimator(budget, rational, names, functions).estimate(tree, 1)[0]
+
+def estimate_peak_bits(tree, budget=DEFAULT_COST_BUDGET, rational=False, names=None, functions=None):
+    """
+    Check an expression tree and bound its most expensive step
+    
+    Unlike the result bound, this also covers intermediates that are
+    reduced again later, e.g. the 50000! in ``50000!%7``.
+    
+    Args:
+        tree: Expression tree root node
+        budget (CostBudget): Limits to enforce
+        rational (bool): Evaluation uses exact fractions (see estimate_cost)
+        names (Mapping): Bounds of known names (see estimate_cost)
+        functions (Mapping): User function definitions (see estimate_cost)
+    
+    Returns:
+        float: Upper bound on log2 of the largest exact integer computed
+    
+    Raises:
+        CostLimitError: If any limit would be exceeded
+    """
+    estimator = _Estimator(budget, rational, names, functions)
+    estimator.estimate(tree, 1)
+    return estimator.peak_bits
+
+class _Estimator:
+    """Single bottom-up pass computing (log2 bound, is_exact_int) per node"""
+    
+    def __init__(self, budget, rational=False, names=None, functions=None):
+        self.budget = budget
+        self.rational = rational
+        self.names = names or {}  # Bounds of known names
+        self.functions = functions or {}  # User function -> (params, body)
+        self.scope = None  # Parameter bounds inside a user function body
+        self.peak_bits = 0.0  # Largest exact integer result seen
+    
+    def _check_bits(self, bits, what):
+        if bits > self.peak_bits:
+            self.peak_bits = bits
+        if bits > self.budget.max_bits:
+            raise CostLimitError(f"{what} would exceed {self.budget.max_bits} bits")
+    
+    def estimate(self, node, depth):
+        if depth > self.budget.max_depth:
+            raise CostLimitError(f"Expression nests deeper than {self.budget.max_depth} levels")
+        
+        if isinstance(node, Number):
+            value = node.value
+            if isinstance(value, int):
+                # bit_length bounds the digit count without converting to str
+                if value.bit_length() * 0.30103 > self.budget.max_literal_digits:
+                    raise CostLimitError(f"Integer literal longer than {self.budget.max_literal_digits} digits")
+                return _log2_abs(value), True
+            if self.rational:
+                # A decimal literal is an exact fraction m/10^k: size of m plus 10^k
+                digits = len(node.text or repr(value))
+                if digits > self.budget.max_literal_digits:
+                    raise CostLimitError(f"Decimal literal longer than {self.budget.max_literal_digits} digits")
+                return 2 * digits * _LOG2_10, True
+            return _log2_abs(value), False
+        
+        if isinstance(node, Name):
+            name = node.name
+            if self.scope is not None and name in self.scope:
+                return self.scope[name]
+            bound = self.names.get(name)
+            if bound is not None:
+                return bound
+            # Constants are small floats; other names are bound to floats
+            return _FLOAT_BITS if name not in ('pi', 'e') else 2.0, False
+        
+        if isinstance(node, UnaryOp):
+            return self.estimate(node.operand, depth + 1)
+        
+        if isinstance(node, BinOp):
+            return self._binop(node, depth)
+        
+        if isinstance(node, Call):
+            return self._call(node, depth)
+        
+        return _FLOAT_BITS, False
+    
+    def _binop(self, node, depth):
+        left_bits, left_int = self.estimate(node.left, depth + 1)
+        right_bits, right_int = self.estimate(node.right, depth + 1)
+        op = node.op
+        exact = left_int and right_int
+        
+        if op in ('+', '-'):
+            bits = _log2_add(left_bits, right_bits)
+        elif op == '*':
+            bits = left_bits + right_bits if -math.inf not in (left_bits, right_bits) else -math.inf
+        elif op == '/':
+            if not (exact and self.rational):
+                return _FLOAT_BITS, False
+            bits = _log2_add(left_bits, 0.0) + _log2_add(right_bits, 0.0)
+        elif op == '//':
+            bits = left_bits
+        elif op == '%':
+            bits = min(left_bits, right_bits) if exact else right_bits
+        else:  # '^'
+            exponent_node = node.right
+            if isinstance(exponent_node, UnaryOp) and exponent_node.op == '-':
+                if not self.rational:
+                    # Negative integer powers produce floats
+                    return min(left_bits, _FLOAT_BITS), False
+                # Exact reciprocal powers are as large as the positive ones
+                exponent_node = exponent_node.operand
+                right_bits, _ = self.estimate(exponent_node, depth + 2)
+            if self.rational and isinstance(exponent_node, Number):
+                # The result grows with the exponent's magnitude, not its size
+                right_bits = _log2_abs(exponent_node.value)
+            exponent = 2.0 ** right_bits if right_bits < 1024 else math.inf
+            if exponent == 0 or left_bits == -math.inf:
+                bits = 0.0
+            elif left_bits <= 0 and not self.rational:
+                bits = 0.0  # |base| <= 1 never grows
+            else:
+                bits = left_bits * exponent
+        
+        if exact:
+            self._check_bits(bits, f"Result of {op!r}")
+            return bits, True
+        return min(bits, _FLOAT_BITS), False
+    
+    def _call(self, node, depth):
+        args = [self.estimate(arg, depth + 1) for arg in node.args]
+        name = node.name
+        
+        if name == 'factorial' and len(args) == 1:
+            bits = args[0][0]
+            # Small tolerance so that log2 round-off never rejects the limit itself
+            if bits > math.log2(max(self.budget.max_factorial, 1)) + 1e-9:
+                raise CostLimitError(f"Factorial argument may exceed {self.budget.max_factorial}")
+            # Non-negative integral arguments only, so n! <= floor(bound)!
+            result_bits = _log2_factorial(math.floor(2.0 ** bits + 1e-6))
+            self._check_bits(result_bits, "Factorial result")
+            return result_bits, True
+        
+        if name == 'abs' and len(args) == 1:
+            return args[0]
+        
+        if name in _FUNCTION_BITS and len(args) == 1:
+            return min(_FUNCTION_BITS[name](args[0][0]), _FLOAT_BITS), False
+        
+        definition = self.functions.get(name)
+        if definition is not None and len(definition[0]) == len(args):
+            # The body, as evaluated for these arguments: it may return exact
+            # ints, or blow up only for large ones
+            params, body = definition
+            scope, self.scope = self.scope, dict(zip(params, args))
+            try:
+                return self.estimate(body, depth + 1)
+            finally:
+                self.scope = scope
+        
+        return _FLOAT_BITS, False
\ No newline at end of file
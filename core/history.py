@@ -0,0 +1,489 @@
+"""
+Calculation History Storage Module
+
+Fixed-capacity ring buffer of calculation records. Records are kept in
+parallel arrays (float timestamps plus expression/result references) and
+only turned into HistoryEntry objects and display strings when read.
+ConcurrentHistory offers the same interface for many writer threads.
+"""
+
+import bisect
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from array import array
+from operator import itemgetter
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class HistoryEntry:
+    """One history record, formatted lazily"""
+    __slots__ = ('number', 'timestamp', 'expression', 'result')
+    
+    def __init__(self, number, timestamp, expression, result):
+        self.number = number
+        self.timestamp = timestamp
+        self.expression = expression
+        self.result = result
+    
+    @property
+    def time(self):
+        """Timestamp formatted with seconds precision"""
+        return time.strftime(TIME_FORMAT, time.localtime(self.timestamp))
+    
+    def format(self):
+        """
+        Format entry for display
+        
+        Returns:
+            str: e.g. "[1] 2024-01-01 12:30:45: 2+2 = 4"
+        """
+        return f"[{self.number}] {self.time}: {self.expression} = {self.result}"
+    
+    __str__ = format
+    
+    def __repr__(self):
+        return f"HistoryEntry({self.number}, {self.timestamp!r}, {self.expression!r}, {self.result!r})"
+
+class HistoryBuffer:
+    """Fixed-capacity ring buffer of history records, numbered from 1"""
+    
+    def __init__(self, capacity=10):
+        """
+        Initialize history buffer
+        
+        Args:
+            capacity (int): Number of most recent records kept
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._timestamps = array('d', [0.0]) * capacity
+        self._expressions = [None] * capacity
+        self._results = [None] * capacity
+        self.clear()
+    
+    def clear(self, next_number=1):
+        """
+        Drop all records and restart numbering in O(1)
+        
+        Slots are not wiped; stale ones are overwritten as new records arrive.
+        
+        Args:
+            next_number (int): Number the next appended record will get
+        """
+        self._count = next_number - 1  # Number of the newest record
+        self._size = 0  # Records currently kept
+    
+    def append(self, expression, result, timestamp=None):
+        """
+        Add a record, overwriting the oldest one when full
+        
+        Args:
+            expression (str): Calculated expression
+            result (str): Calculation result
+            timestamp (float): Seconds since the epoch (default: now)
+        
+        Returns:
+            int: Number assigned to the record
+        """
+        slot = self._count % self.capacity
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._expressions[slot] = expression
+        self._results[slot] = result
+        self._count += 1
+        if self._size < self.capacity:
+            self._size += 1
+        return self._count
+    
+    @property
+    def next_number(self):
+        """Number the next appended record will get"""
+        return self._count + 1
+    
+    @property
+    def first_number(self):
+        """Number of the oldest record still kept"""
+        return self._count - self._size + 1
+    
+    def __len__(self):
+        return self._size
+    
+    def __bool__(self):
+        return self._size > 0
+    
+    def get(self, number):
+        """
+        Get record by number
+        
+        Args:
+            number (int): Record number
+        
+        Returns:
+            HistoryEntry: The record
+        
+        Raises:
+            IndexError: If the record was never written or has been overwritten
+        """
+        if not self.first_number <= number <= self._count:
+            raise IndexError(f"history record {number} is not available")
+        return self._entry(number)
+    
+    def _entry(self, number):
+        slot = (number - 1) % self.capacity
+        return HistoryEntry(number, self._timestamps[slot], self._expressions[slot], self._results[slot])
+    
+    def iter_entries(self, newest_first=False, start=None):
+        """
+        Iterate over records
+        
+        Args:
+            newest_first (bool): Iteration order
+            start (int): Record number to start from (default: oldest or newest)
+        
+        Yields:
+            HistoryEntry: Records, built on demand
+        """
+        first, last = self.first_number, self._count
+        if newest_first:
+            number = last if start is None else min(start, last)
+            while number >= first:
+                yield self._entry(number)
+                number -= 1
+        else:
+            number = first if start is None else max(start, first)
+            while number <= last:
+                yield self._entry(number)
+                number += 1
+    
+    __iter__ = iter_entries
+    
+    def latest(self, count):
+        """
+        Get the most recent records
+        
+        Args:
+            count (int): Maximum number of records
+        
+        Returns:
+            list: HistoryEntry objects, newest first (O(count))
+        """
+        return self.page(0, count)
+    
+    def page(self, offset, limit, newest_first=True):
+        """
+        Get one page of records
+        
+        Args:
+            offset (int): Records to skip from the newest (or oldest) end
+            limit (int): Maximum number of records in the page
+            newest_first (bool): Paging direction
+        
+        Returns:
+            list: HistoryEntry objects in paging order (O(limit))
+        """
+        first, last = self.first_number, self._count
+        if newest_first:
+            start = last - offset
+            stop = max(start - limit, first - 1)
+            return [self._entry(number) for number in range(start, stop, -1)]
+        start = first + offset
+        stop = min(start + limit, last + 1)
+        return [self._entry(number) for number in range(start, stop)]
+
+class _Records:
+    """
+    Ring of (number, timestamp, expression, result) records with one writer
+    
+    Readers walk it newest-first without a lock while the writer appends:
+    numbers grow with every append, so a slot overwritten meanwhile shows
+    up as a number out of order, and the walk stops there.
+    """
+    __slots__ = ('records', 'count')
+    
+    def __init__(self, capacity):
+        self.records = [None] * capacity
+        self.count = 0  # Records appended so far
+    
+    def append(self, record):
+        self.records[self.count % len(self.records)] = record
+        self.count += 1  # After the slot is written: readers never see an empty one
+    
+    def last(self):
+        """Number of the newest record, or 0 if empty"""
+        count = self.count
+        return self.records[(count - 1) % len(self.records)][0] if count else 0
+    
+    def find(self, number):
+        """The record with this number, or None (binary search over the ring)"""
+        records = self.records
+        capacity = len(records)
+        while True:
+            count = self.count
+            low, high = max(count - capacity, 0), count
+            while low < high:
+                middle = (low + high) // 2
+                record = records[middle % capacity]
+                if record[0] < number:
+                    low = middle + 1
+                elif record[0] > number:
+                    high = middle
+                else:
+                    return record
+            if self.count == count:
+                return None
+            # An append overwrote a slot during the search: search again
+    
+    def newest(self):
+        """Yield the records newest first"""
+        records = self.records
+        capacity = len(records)
+        end = self.count
+        previous = None
+        for index in range(end - 1, max(end - capacity, 0) - 1, -1):
+            record = records[index % capacity]
+            if previous is not None and record[0] >= previous:
+                return  # Overwritten by an append since the walk started
+            previous = record[0]
+            yield record
+
+class _Owner:
+    """Thread-local token whose collection signals that its thread finished"""
+    __slots__ = ('__weakref__',)
+
+class _Epoch:
+    """Records appended since the last clear() of a ConcurrentHistory"""
+    __slots__ = ('start', 'capacity', 'numbers', 'buffers', 'retired', 'local', 'lock')
+    
+    def __init__(self, start, capacity):
+        self.start = start
+        self.capacity = capacity
+        self.numbers = itertools.count(start)  # next() is atomic: numbers are never reused
+        self.buffers = []  # One _Records per live writer thread
+        # Records of finished threads that may still be kept: lists sorted
+        # by number, each more than twice as long as the next
+        self.retired = ()
+        self.local = threading.local()
+        self.lock = threading.Lock()  # Only taken when a writer thread starts or finishes
+    
+    def last(self):
+        """Number of the newest completed append, or start - 1"""
+        last = self.start - 1
+        for buffer in self.buffers[:]:
+            last = max(last, buffer.last())
+        for records in self.retired:
+            last = max(last, records[-1][0])
+        return last
+    
+    def retire(self, buffer):
+        """
+        Move the records a finished thread still has among the kept ones
+        to the retired lists
+        
+        Lists of similar length are merged, so there are O(log capacity)
+        of them and each record is copied O(log capacity) times however
+        many threads finish.
+        """
+        with self.lock:
+            first = self.last() + 1 - self.capacity
+            records = list(itertools.takewhile(lambda record: record[0] >= first, buffer.newest()))
+            records.reverse()
+            lists = [retired for retired in self.retired if retired[-1][0] >= first]
+            while lists and records and len(lists[-1]) <= 2 * len(records):
+                merged = heapq.merge(lists.pop(), records, key=itemgetter(0))
+                records = [record for record in merged if record[0] >= first]
+            if records:
+                lists.append(records)
+            # Readers may see the records twice in between, never not at all
+            self.retired = tuple(lists)
+            self.buffers.remove(buffer)
+
+class ConcurrentHistory:
+    """
+    History records written by many threads without a shared lock
+    
+    Each thread appends to its own bounded buffer; record numbers come
+    from one atomic counter. Reads merge the buffers lazily from their
+    newest ends by number, so they cost O(threads + records read) and
+    see every completed append; numbers are consecutive, so the size and
+    the oldest number follow from the newest one, and get() searches each
+    buffer by number. When a thread finishes, its records that are still
+    kept move to a few shared sorted lists and its own buffer is
+    released. Same interface as HistoryBuffer.
+    """
+    
+    def __init__(self, capacity=10):
+        """
+        Initialize history
+        
+        Args:
+            capacity (int): Number of most recent records kept
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._epoch = _Epoch(1, capacity)
+    
+    def clear(self, next_number=1):
+        """
+        Drop all records and restart numbering
+        
+        Args:
+            next_number (int): Number the next appended record will get
+        """
+        self._epoch = _Epoch(next_number, self.capacity)
+    
+    def append(self, expression, result, timestamp=None):
+        """
+        Add a record to the calling thread's buffer
+        
+        Args:
+            expression (str): Calculated expression
+            result (str): Calculation result
+            timestamp (float): Seconds since the epoch (default: now)
+        
+        Returns:
+            int: Number assigned to the record
+        """
+        epoch = self._epoch
+        local = epoch.local
+        try:
+            buffer = local.buffer
+        except AttributeError:
+            buffer = local.buffer = _Records(self.capacity)
+            with epoch.lock:
+                epoch.buffers.append(buffer)
+            # The thread-local values are dropped when the thread finishes
+            local.owner = _Owner()
+            weakref.finalize(local.owner, epoch.retire, buffer)
+        number = next(epoch.numbers)
+        buffer.append((number, time.time() if timestamp is None else timestamp, expression, result))
+        return number
+    
+    def _newest(self, count=None):
+        """Newest-first (number, timestamp, expression, result) tuples"""
+        epoch = self._epoch
+        limit = self.capacity if count is None else min(count, self.capacity)
+        if limit <= 0:
+            return []
+        # Only the newest `limit` records of each buffer are ever read
+        sources = [buffer.newest() for buffer in epoch.buffers[:]]
+        sources.extend(reversed(records) for records in epoch.retired)
+        records = []
+        previous = None
+        for record in heapq.merge(*sources, key=itemgetter(0), reverse=True):
+            if record[0] != previous:  # A thread's records being retired show up twice
+                records.append(record)
+                previous = record[0]
+                if len(records) >= limit:
+                    break
+        return records
+    
+    def _range(self):
+        """(oldest, newest) number of the kept records; empty if oldest > newest"""
+        epoch = self._epoch
+        last = epoch.last()
+        return max(epoch.start, last + 1 - self.capacity), last
+    
+    def _find(self, number):
+        epoch = self._epoch
+        for buffer in epoch.buffers[:]:
+            record = buffer.find(number)
+            if record is not None:
+                return record
+        for records in epoch.retired:
+            index = bisect.bisect_left(records, (number,))
+            if index < len(records) and records[index][0] == number:
+                return records[index]
+        return None
+    
+    @property
+    def next_number(self):
+        """Number the next appended record will get (once pending appends finish)"""
+        return self._epoch.last() + 1
+    
+    @property
+    def first_number(self):
+        """Number of the oldest record still kept"""
+        return self._range()[0]
+    
+    def __len__(self):
+        first, last = self._range()
+        return max(last - first + 1, 0)
+    
+    def __bool__(self):
+        return self._epoch.last() >= self._epoch.start
+    
+    def get(self, number):
+        """
+        Get record by number
+        
+        Args:
+            number (int): Record number
+        
+        Returns:
+            HistoryEntry: The record
+        
+        Raises:
+            IndexError: If the record is not available
+        """
+        first, last = self._range()
+        record = self._find(number) if first <= number <= last else None
+        if record is None:
+            raise IndexError(f"history record {number} is not available")
+        return HistoryEntry(*record)
+    
+    def iter_entries(self, newest_first=False, start=None):
+        """
+        Iterate over a snapshot of the records
+        
+        Args:
+            newest_first (bool): Iteration order
+            start (int): Record number to start from (default: oldest or newest)
+        
+        Yields:
+            HistoryEntry: Records
+        """
+        records = self._newest()
+        if not newest_first:
+            records.reverse()
+        for record in records:
+            if start is None or (record[0] <= start if newest_first else record[0] >= start):
+                yield HistoryEntry(*record)
+    
+    __iter__ = iter_entries
+    
+    def latest(self, count):
+        """
+        Get the most recent records
+        
+        Args:
+            count (int): Maximum number of records
+        
+        Returns:
+            list: HistoryEntry objects, newest first
+        """
+        return [HistoryEntry(*record) for record in self._newest(count)]
+    
+    def page(self, offset, limit, newest_first=True):
+        """
+        Get one page of records
+        
+        Args:
+            offset (int): Records to skip from the newest (or oldest) end
+            limit (int): Maximum number of records in the page
+            newest_first (bool): Paging direction
+        
+        Returns:
+            list: HistoryEntry objects in paging order
+        """
+        if newest_first:
+            records = self._newest(offset + limit)[offset:]
+        else:
+            # Looked up by number: O(limit) searches, however long the history
+            first, last = self._range()
+            numbers = range(first + offset, min(first + offset + limit, last + 1))
+            records = [record for record in map(self._find, numbers) if record is not None]
+        return [HistoryEntry(*record) for record in records]
\ No newline at end of file
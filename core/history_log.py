@@ -0,0 +1,433 @@
+"""
+Persistent History Log Module
+
+Append-only on-disk log of calculation records, kept in two files:
+
+* ``<path>``      one JSON line ``["expression", "result"]`` per record
+* ``<path>.idx``  fixed-size index records (timestamp, data offset,
+                  expression hash, data length), record n at (n-1)*32
+
+Appends are buffered in memory and written plus fsynced by a background
+thread, so evaluation never waits on the disk. Reads go through
+memory-mapped views of both files; opening a log only checks the tail of
+the index and never replays the data file.
+"""
+
+import atexit
+import contextlib
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from .history import HistoryEntry
+
+INDEX_SUFFIX = '.idx'
+_INDEX_RECORD = struct.Struct('<dQQI4x')  # timestamp, offset, expression hash, length
+_RECORD_SIZE = _INDEX_RECORD.size
+
+def expression_hash(expression):
+    """
+    Stable 64-bit hash of an expression (unlike hash(), same in every process)
+    
+    Args:
+        expression (str): Expression text
+    
+    Returns:
+        int: Hash value
+    """
+    return int.from_bytes(hashlib.blake2b(expression.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class _MappedFile:
+    """Read-only memory map of a growing file, remapped on demand"""
+    
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = None
+        self._size = 0
+    
+    def view(self, size):
+        """
+        Get a map covering at least `size` bytes
+        
+        Args:
+            size (int): Bytes that must be readable
+        
+        Returns:
+            mmap.mmap: Current mapping
+        """
+        if size > self._size:
+            if self._map is not None:
+                self._map.close()
+            self._size = os.fstat(self._file.fileno()).st_size
+            self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+        return self._map
+    
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+class HistoryLog:
+    """Append-only, indexed, memory-mapped history log"""
+    
+    def __init__(self, path, flush_interval=1.0, batch_size=4096, fsync=True):
+        """
+        Open (or create) a history log
+        
+        Args:
+            path (str): Data file path (the index is stored next to it)
+            flush_interval (float): Seconds between background writes
+            batch_size (int): Pending records that trigger an early write
+            fsync (bool): Whether each write is fsynced
+        """
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fsync = fsync
+        
+        self._data_file = open(path, 'ab')
+        self._index_file = open(self.index_path, 'ab')
+        self._data_size = self._data_file.seek(0, os.SEEK_END)
+        self._flushed = self._recover()
+        self._data_map = _MappedFile(path)
+        self._index_map = _MappedFile(self.index_path)
+        
+        self._last_timestamp = self._read_index(self._flushed)[0] if self._flushed else 0.0
+        self._unflushed = []  # (timestamp, expression, result) not yet on disk
+        self._lock = threading.Lock()  # Guards _unflushed and _flushed
+        self._write_lock = threading.Lock()  # Serializes disk writes
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        
+        # expression hash -> record numbers, built lazily on first lookup
+        self._expression_index = None
+        self._indexed = 0
+        
+        self._writer = threading.Thread(target=self._writer_loop, name='HistoryLogWriter', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _recover(self):
+        """
+        Drop a torn index tail left by a crash
+        
+        Returns:
+            int: Number of complete, valid records
+        """
+        size = self._index_file.seek(0, os.SEEK_END)
+        count = size // _RECORD_SIZE
+        with open(self.index_path, 'rb') as index:
+            while count:
+                index.seek((count - 1) * _RECORD_SIZE)
+                _, offset, _, length = _INDEX_RECORD.unpack(index.read(_RECORD_SIZE))
+                if offset + length <= self._data_size:
+                    break
+                count -= 1
+        if count * _RECORD_SIZE != size:
+            self._index_file.truncate(count * _RECORD_SIZE)
+        return count
+    
+    def __len__(self):
+        with self._lock:
+            return self._flushed + len(self._unflushed)
+    
+    @property
+    def next_number(self):
+        """Number the next appended record will get"""
+        return len(self) + 1
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def append(self, expression, result, timestamp=None):
+        """
+        Queue a record for writing
+        
+        Args:
+            expression (str): Calculated expression
+            result (str): Calculation result
+            timestamp (float): Seconds since the epoch (default: now)
+        
+        Returns:
+            int: Number assigned to the record
+        """
+        return self.extend([(expression, result)], timestamp)
+    
+    def extend(self, records, timestamp=None):
+        """
+        Queue several records sharing one timestamp
+        
+        Args:
+            records (iterable): (expression, result) pairs
+            timestamp (float): Seconds since the epoch (default: now)
+        
+        Returns:
+            int: Number of the last record
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._closed:
+                raise ValueError("history log is closed")
+            # Keep timestamps non-decreasing so time lookups can bisect
+            timestamp = max(timestamp, self._last_timestamp)
+            self._last_timestamp = timestamp
+            self._unflushed.extend((timestamp, expression, result) for expression, result in records)
+            if len(self._unflushed) >= self.batch_size:
+                self._wakeup.notify()
+            return self._flushed + len(self._unflushed)
+    
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                if not self._closed:
+                    self._wakeup.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+    
+    def flush(self):
+        """Write and fsync all queued records"""
+        with self._write_lock:
+            with self._lock:
+                batch = self._unflushed[:]
+            if not batch or self._data_file.closed:
+                return
+            
+            data_parts = []
+            index_parts = []
+            offset = self._data_size
+            for timestamp, expression, result in batch:
+                payload = (json.dumps([expression, result], ensure_ascii=False) + '\n').encode('utf-8')
+                index_parts.append(_INDEX_RECORD.pack(timestamp, offset, expression_hash(expression), len(payload)))
+                data_parts.append(payload)
+                offset += len(payload)
+            
+            # Data before index: an index record never points at unwritten data
+            self._write(self._data_file, b''.join(data_parts))
+            self._write(self._index_file, b''.join(index_parts))
+            self._data_size = offset
+            
+            with self._lock:
+                del self._unflushed[:len(batch)]
+                self._flushed += len(batch)
+    
+    def _write(self, file, data):
+        file.write(data)
+        file.flush()
+        if self.fsync:
+            os.fsync(file.fileno())
+    
+    def _read_index(self, number):
+        """(timestamp, offset, hash, length) of flushed record `number`"""
+        position = (number - 1) * _RECORD_SIZE
+        return _INDEX_RECORD.unpack_from(self._index_map.view(position + _RECORD_SIZE), position)
+    
+    def _read_flushed(self, number):
+        timestamp, offset, _, length = self._read_index(number)
+        data = self._data_map.view(offset + length)[offset:offset + length]
+        expression, result = json.loads(data)
+        return HistoryEntry(number, timestamp, expression, result)
+    
+    def get(self, number):
+        """
+        Get record by number
+        
+        Args:
+            number (int): Record number (1-based)
+        
+        Returns:
+            HistoryEntry: The record
+        
+        Raises:
+            IndexError: If no such record exists
+        """
+        with self._lock:
+            flushed = self._flushed
+            if number > flushed:
+                position = number - flushed - 1
+                if position < len(self._unflushed):
+                    timestamp, expression, result = self._unflushed[position]
+                    return HistoryEntry(number, timestamp, expression, result)
+        if not 1 <= number <= flushed:
+            raise IndexError(f"history record {number} does not exist")
+        return self._read_flushed(number)
+    
+    def iter_entries(self, start=1, stop=None):
+        """
+        Stream records in order without loading the log into memory
+        
+        Args:
+            start (int): First record number
+            stop (int): Record number to stop before (default: end of log)
+        
+        Yields:
+            HistoryEntry: Records
+        """
+        stop = len(self) + 1 if stop is None else min(stop, len(self) + 1)
+        for number in range(max(start, 1), stop):
+            yield self.get(number)
+    
+    __iter__ = iter_entries
+    
+    def tail(self, count):
+        """
+        Get the most recent records
+        
+        Args:
+            count (int): Maximum number of records
+        
+        Returns:
+            list: HistoryEntry objects, oldest first
+        """
+        total = len(self)
+        return list(self.iter_entries(max(total - count + 1, 1), total + 1))
+    
+    def _timestamp(self, number):
+        with self._lock:
+            if number > self._flushed:
+                return self._unflushed[number - self._flushed - 1][0]
+        return self._read_index(number)[0]
+    
+    def _bisect(self, timestamp, right):
+        """First record number whose timestamp is >= (or > if right) timestamp"""
+        low, high = 1, len(self) + 1
+        while low < high:
+            middle = (low + high) // 2
+            value = self._timestamp(middle)
+            if value < timestamp or right and value == timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def find_time_range(self, start_time=None, end_time=None):
+        """
+        Find records in a time range by binary search over the index
+        
+        Args:
+            start_time (float): Inclusive lower bound, seconds since the epoch
+            end_time (float): Inclusive upper bound, seconds since the epoch
+        
+        Returns:
+            range: Matching record numbers
+        """
+        first = 1 if start_time is None else self._bisect(start_time, False)
+        stop = len(self) + 1 if end_time is None else self._bisect(end_time, True)
+        return range(first, max(first, stop))
+    
+    def find_expression(self, expression):
+        """
+        Find records of an expression
+        
+        Args:
+            expression (str): Exact expression text
+        
+        Returns:
+            list: Matching record numbers, ascending
+        """
+        key = expression_hash(expression)
+        with self._lock:
+            flushed = self._flushed
+            pending = [
+                flushed + position + 1
+                for position, (_, text, _) in enumerate(self._unflushed) if text == expression
+            ]
+        if self._expression_index is None:
+            self._expression_index = {}
+        if self._indexed < flushed:
+            # Catch up with records flushed since the last lookup
+            start = self._indexed * _RECORD_SIZE
+            view = self._index_map.view(flushed * _RECORD_SIZE)
+            index = self._expression_index
+            number = self._indexed
+            for _, _, record_hash, _ in _INDEX_RECORD.iter_unpack(view[start:flushed * _RECORD_SIZE]):
+                number += 1
+                index.setdefault(record_hash, []).append(number)
+            self._indexed = flushed
+        # Confirm candidates to rule out hash collisions
+        matches = [
+            number for number in self._expression_index.get(key, ())
+            if self._read_flushed(number).expression == expression
+        ]
+        return matches + pending
+    
+    def export_csv(self, destination, start=1, stop=None):
+        """
+        Stream records to CSV (number, timestamp, time, expression, result)
+        
+        Args:
+            destination: File path or writable text file object
+            start (int): First record number
+            stop (int): Record number to stop before (default: end of log)
+        
+        Returns:
+            int: Number of records written
+        """
+        with _open_destination(destination) as out:
+            writer = csv.writer(out)
+            writer.writerow(['number', 'timestamp', 'time', 'expression', 'result'])
+            count = 0
+            for entry in self.iter_entries(start, stop):
+                writer.writerow([entry.number, entry.timestamp, entry.time, entry.expression, entry.result])
+                count += 1
+        return count
+    
+    def export_jsonl(self, destination, start=1, stop=None):
+        """
+        Stream records to JSON Lines
+        
+        Args:
+            destination: File path or writable text file object
+            start (int): First record number
+            stop (int): Record number to stop before (default: end of log)
+        
+        Returns:
+            int: Number of records written
+        """
+        with _open_destination(destination) as out:
+            count = 0
+            for entry in self.iter_entries(start, stop):
+                out.write(json.dumps({
+                    'number': entry.number,
+                    'timestamp': entry.timestamp,
+                    'expression': entry.expression,
+                    'result': entry.result
+                }, ensure_ascii=False))
+                out.write('\n')
+                count += 1
+        return count
+    
+    def close(self):
+        """Flush queued records and close the log"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._writer.join()
+        self.flush()
+        self._data_file.close()
+        self._index_file.close()
+        self._data_map.close()
+        self._index_map.close()
+        atexit.unregister(self.close)
+
+@contextlib.contextmanager
+def _open_destination(destination):
+    """Yield a text file for a path, or pass a file object through"""
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'w', newline='', encoding='utf-8') as out:
+            yield out
+    else:
+        yield destination
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+Keypad Input Validator Module
+
+An incremental automaton over the calculator's input grammar. It keeps
+the lexer state (inside a number, expecting an operand, ...) and the stack
+of open '(' and '|' groups across key presses, so every key is checked and
+applied in O(1) however long the expression is, and the UI can ask which
+keys are currently valid to enable only those buttons.
+"""
+
+from .compiler import CONSTANTS
+from .parser import NAME, NUMBER, ExpressionError, scan
+
+# Automaton modes
+START = 'start'  # Expecting an operand: empty input, after '(' or an operator
+SIGN = 'sign'  # Expecting an operand after a prefix sign
+POINT = 'point'  # A lone '.', digits must follow
+INTEGER = 'integer'  # Inside a number without a point
+DECIMAL = 'decimal'  # Inside a number with a point
+EXPONENT = 'exponent'  # Inside a number with an exponent (only from inserted text)
+NAMED = 'named'  # After a function or variable name from inserted text
+OPERAND = 'operand'  # After a closed operand: constant, ')', closing '|' or postfix
+INVALID = 'invalid'  # Text the grammar cannot continue
+
+_EXPECTING = (START, SIGN)
+_COMPLETE = (INTEGER, DECIMAL, EXPONENT, NAMED, OPERAND)
+
+# Keypad key -> (text appended, key class)
+KEYS = {digit: (digit, 'digit') for digit in '0123456789'}
+KEYS.update({
+    '.': ('.', 'point'),
+    '+': ('+', 'sign'), '-': ('-', 'sign'), '+/-': ('-', 'negate'),
+    '*': ('*', 'binary'), '/': ('/', 'binary'), '%': ('%', 'binary'), 'xⁿ': ('^', 'binary'),
+    'π': ('π', 'constant'), 'e': ('e', 'constant'),
+    'x²': ('x²', 'postfix'), 'x³': ('x³', 'postfix'), '!': ('!', 'postfix'),
+    '(': ('(', 'open'), ')': (')', 'close'), '|x|': ('|', 'bar'),
+})
+for _name in ('sin', 'cos', 'tan', 'cot', 'asin', 'acos', 'atan', 'log', 'ln', '√', '³√'):
+    KEYS[_name] = (_name + '(', 'function')
+
+# (mode, key class) -> next mode; classes that open or close groups are
+# further checked against the innermost open group
+_TRANSITIONS = {}
+for _mode in _EXPECTING:
+    _TRANSITIONS.update({
+        (_mode, 'digit'): INTEGER, (_mode, 'point'): POINT, (_mode, 'exponent'): EXPONENT,
+        (_mode, 'constant'): OPERAND, (_mode, 'name'): NAMED,
+        (_mode, 'function'): START, (_mode, 'open'): START, (_mode, 'bar'): START,
+    })
+for _mode in _COMPLETE:
+    _TRANSITIONS.update({
+        (_mode, 'sign'): START, (_mode, 'binary'): START, (_mode, 'postfix'): OPERAND,
+        (_mode, 'close'): OPERAND, (_mode, 'bar'): OPERAND,
+    })
+_TRANSITIONS.update({
+    # '+/-' types the sign of a negative operand, so only where one may start
+    (START, 'sign'): SIGN, (START, 'negate'): SIGN,
+    (INTEGER, 'digit'): INTEGER, (INTEGER, 'point'): DECIMAL,
+    (POINT, 'digit'): DECIMAL, (DECIMAL, 'digit'): DECIMAL, (EXPONENT, 'digit'): EXPONENT,
+    (NAMED, 'open'): START,
+})
+
+# Token value -> key class, for inserted text
+_OPERATOR_CLASSES = {
+    '+': 'sign', '-': 'sign',
+    '*': 'binary', '/': 'binary', '//': 'binary', '%': 'binary', '^': 'binary',
+    '!': 'postfix', '²': 'postfix', '³': 'postfix',
+    '(': 'open', ')': 'close', '|': 'bar',
+}
+
+# (mode, innermost group) -> frozenset of valid keys, filled on first use
+_VALID_KEYS = {}
+
+def _advance(state, kind, length):
+    """
+    Apply one key class to a state
+    
+    Args:
+        state (tuple): (mode, groups, length); groups is None or an
+            (innermost symbol, outer groups, depth) linked stack
+        kind (str): Key class
+        length (int): Text length after the key
+    
+    Returns:
+        tuple: Next state, or None if the key is not valid here
+    """
+    mode, groups, _ = state
+    next_mode = _TRANSITIONS.get((mode, kind))
+    if next_mode is None:
+        return None
+    if kind == 'function' or kind == 'open':
+        return next_mode, ('(', groups, groups[2] + 1 if groups else 1), length
+    if kind == 'bar' and mode in _EXPECTING:
+        return next_mode, ('|', groups, groups[2] + 1 if groups else 1), length
+    if kind == 'close' or kind == 'bar':
+        if groups is None or groups[0] != ('(' if kind == 'close' else '|'):
+            return None
+        return next_mode, groups[1], length
+    return next_mode, groups, length
+
+class InputValidator:
+    """Incremental validator of keypad input"""
+    
+    def __init__(self, text=""):
+        """
+        Args:
+            text (str): Initial display text
+        """
+        self.reset(text)
+    
+    def reset(self, text=""):
+        """
+        Start over from a display text (after clearing, '=' or any outside edit)
+        
+        Costs O(len(text)); an invalid text leaves the validator in a state
+        where no key is valid until it is deleted or cleared.
+        
+        Args:
+            text (str): New display text
+        """
+        self._steps = [(START, None, 0)]  # State after each applied key or token
+        if text and not self._feed(text):
+            self._steps.append((INVALID, None, len(text)))
+    
+    @property
+    def length(self):
+        """Length of the text the validator has seen"""
+        return self._steps[-1][2]
+    
+    @property
+    def depth(self):
+        """Number of unclosed '(' and '|' groups"""
+        groups = self._steps[-1][1]
+        return groups[2] if groups else 0
+    
+    @property
+    def is_complete(self):
+        """Whether the text is a whole expression, ready for '='"""
+        mode, groups, _ = self._steps[-1]
+        return mode in _COMPLETE and groups is None
+    
+    @property
+    def is_invalid(self):
+        """Whether reset() was given a text no key can continue"""
+        return self._steps[-1][0] == INVALID
+    
+    def is_valid(self, key):
+        """
+        Check a keypad key in O(1)
+        
+        Args:
+            key (str): Button label, e.g. '7', 'sin', 'x²'
+        
+        Returns:
+            bool: Whether pressing the key keeps the input well formed
+        """
+        try:
+            _, kind = KEYS[key]
+        except KeyError:
+            return False
+        return _advance(self._steps[-1], kind, 0) is not None
+    
+    def press(self, key):
+        """
+        Apply a keypad key in O(1)
+        
+        Args:
+            key (str): Button label
+        
+        Returns:
+            str: Text to append to the display, or None if the key is not valid
+        """
+        try:
+            text, kind = KEYS[key]
+        except KeyError:
+            return None
+        state = self._steps[-1]
+        state = _advance(state, kind, state[2] + len(text))
+        if state is None:
+            return None
+        self._steps.append(state)
+        return text
+    
+    def insert(self, text):
+        """
+        Apply inserted text such as a recalled result, if it fits here
+        
+        The text must start a new operand; costs O(len(text)).
+        
+        Args:
+            text (str): Text to append
+        
+        Returns:
+            bool: Whether the text was valid and applied
+        """
+        if not text or self._steps[-1][0] not in _EXPECTING:
+            return False
+        return self._feed(text)
+    
+    def delete(self):
+        """
+        Undo the last key in O(1)
+        
+        Returns:
+            int: Number of characters to remove from the end of the display
+        """
+        if len(self._steps) == 1:
+            return 0
+        removed = self._steps.pop()
+        return removed[2] - self._steps[-1][2]
+    
+    def valid_keys(self):
+        """
+        Get the keys valid at this point, e.g. to enable only their buttons
+        
+        Returns:
+            frozenset: Button labels
+        """
+        state = self._steps[-1]
+        groups = state[1]
+        cache_key = (state[0], groups[0] if groups else None)
+        keys = _VALID_KEYS.get(cache_key)
+        if keys is None:
+            keys = _VALID_KEYS[cache_key] = frozenset(
+                key for key, (_, kind) in KEYS.items() if _advance(state, kind, 0) is not None
+            )
+        return keys
+    
+    def _feed(self, text):
+        """Apply the tokens of text; on failure keep the old state and return False"""
+        steps = self._steps
+        keep = len(steps)
+        if self._feed_tokens(text):
+            length = steps[keep - 1][2] + len(text)
+            if steps[-1][2] != length:
+                steps.append(steps[-1][:2] + (length,))  # Trailing spaces
+            return True
+        del steps[keep:]
+        return False
+    
+    def _feed_tokens(self, text):
+        """Append a state per token of text (per character of plain numbers)"""
+        steps = self._steps
+        base = steps[-1][2]
+        try:
+            for (kind, value, pos), end, _ in scan(text, 0, steps[-1][0] in _COMPLETE):
+                if kind == NUMBER and 'e' not in value and 'E' not in value:
+                    # One step per character, so deleting works digit by digit
+                    for offset, char in enumerate(value, base + pos + 1):
+                        state = _advance(steps[-1], 'point' if char == '.' else 'digit', offset)
+                        if state is None:
+                            return False
+                        steps.append(state)
+                    continue
+                if kind == NUMBER:
+                    key_class = 'exponent'
+                elif kind == NAME:
+                    key_class = 'constant' if value in CONSTANTS else 'name'
+                else:
+                    key_class = _OPERATOR_CLASSES.get(value, 'other')
+                state = _advance(steps[-1], key_class, base + end)
+                if state is None:
+                    return False
+                steps.append(state)
+        except ExpressionError as error:
+            # A trailing '.' is a number still being typed
+            if error.position != len(text) - 1 or text[-1] != '.':
+                return False
+            state = _advance(steps[-1], 'point', base + len(text))
+            if state is None:
+                return False
+            steps.append(state)
+        return True
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Evaluation Instrumentation Module
+
+Per-stage timers and counters for CalculatorCore. Instrumentation is off
+by default and then costs one attribute check per evaluation; once
+enabled, every evaluate_expression / calculate call is timed stage by
+stage:
+    
+    normalize  replace × and ÷
+    cache      compiled-expression cache lookup
+    parse      tokenize and build the expression tree (cache misses)
+    cost       cost budget check (cache misses)
+    compile    compile the tree into closures (cache misses over the worksheet)
+    evaluate   run the compiled expression; on a cache miss this includes
+               the compiler evaluating a tree without variables at once
+    format     render the result string
+    record     update last result, history and the persistent log
+
+Hooks receive one Observation per evaluation, e.g. to feed a metrics
+exporter.
+"""
+
+import threading
+import time
+
+STAGES = ('normalize', 'cache', 'parse', 'cost', 'compile', 'evaluate', 'format', 'record')
+
+class Observation:
+    """Measurements of one evaluation, passed to hooks"""
+    __slots__ = ('expression', 'result', 'error', 'stages', 'total_ns', 'cache_hit')
+    
+    def __init__(self, expression, result, error, stages, total_ns, cache_hit):
+        self.expression = expression
+        self.result = result  # Result string, or None on error or empty input
+        self.error = error  # Exception raised, or None
+        self.stages = stages  # stage name -> nanoseconds, for the stages that ran
+        self.total_ns = total_ns
+        self.cache_hit = cache_hit
+    
+    def __repr__(self):
+        return (f"Observation({self.expression!r}, result={self.result!r}, error={self.error!r}, "
+                f"total_ns={self.total_ns})")
+
+class Stopwatch:
+    """Splits elapsed time into named stages"""
+    __slots__ = ('stages', 'start', '_last')
+    
+    def __init__(self):
+        self.stages = {}
+        self.start = self._last = time.perf_counter_ns()
+    
+    def lap(self, stage):
+        """Charge the time since the previous lap to `stage` (adding up repeated laps)"""
+        now = time.perf_counter_ns()
+        stages = self.stages
+        stages[stage] = stages.get(stage, 0) + now - self._last
+        self._last = now
+    
+    def elapsed(self):
+        """Nanoseconds since the stopwatch started"""
+        return time.perf_counter_ns() - self.start
+
+class Instrumentation:
+    """Thread-safe counters, per-stage timers and hooks for one or more calculators"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hooks = []
+        self.reset()
+    
+    def reset(self):
+        """Zero all counters and timers"""
+        with self._lock:
+            self.calls = 0
+            self.errors = {}  # exception type name -> count
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.hook_errors = 0
+            # stage -> [calls, total ns, max ns]
+            self.stage_times = {stage: [0, 0, 0] for stage in STAGES}
+            self.total_time = [0, 0, 0]
+    
+    def add_hook(self, hook):
+        """
+        Call hook(observation) after every instrumented evaluation
+        
+        Hooks run on the evaluating thread; exceptions they raise are
+        counted in hook_errors and otherwise ignored.
+        
+        Args:
+            hook (callable): Receives an Observation
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+    
+    def remove_hook(self, hook):
+        """Stop calling a hook added with add_hook()"""
+        with self._lock:
+            self._hooks = [existing for existing in self._hooks if existing is not hook]
+    
+    def observe(self, expression, result, error, stopwatch, cache_hit):
+        """
+        Record one evaluation
+        
+        Args:
+            expression (str): Input expression
+            result (str): Result string, or None
+            error (Exception): Exception raised, or None
+            stopwatch (Stopwatch): Stage timings of the evaluation
+            cache_hit (bool): Whether the compiled expression was cached
+        """
+        total = stopwatch.elapsed()
+        stages = stopwatch.stages
+        with self._lock:
+            self.calls += 1
+            if error is not None:
+                name = type(error).__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+            if cache_hit:
+                self.cache_hits += 1
+            elif 'cache' in stages:
+                self.cache_misses += 1
+            for stage, elapsed in stages.items():
+                timer = self.stage_times[stage]
+                timer[0] += 1
+                timer[1] += elapsed
+                if elapsed > timer[2]:
+                    timer[2] = elapsed
+            timer = self.total_time
+            timer[0] += 1
+            timer[1] += total
+            if total > timer[2]:
+                timer[2] = total
+            hooks = self._hooks
+        if hooks:
+            observation = Observation(expression, result, error, stages, total, cache_hit)
+            for hook in hooks:
+                try:
+                    hook(observation)
+                except Exception:
+                    with self._lock:
+                        self.hook_errors += 1
+    
+    def snapshot(self):
+        """
+        Get a consistent copy of all counters
+        
+        Returns:
+            dict: calls, errors (by exception type), cache_hits, cache_misses,
+            hook_errors, total and stages; timers are dicts with calls,
+            total_us, mean_us and max_us
+        """
+        def timer_stats(timer):
+            calls, total, longest = timer
+            return {
+                'calls': calls,
+                'total_us': total / 1000,
+                'mean_us': total / calls / 1000 if calls else 0.0,
+                'max_us': longest / 1000,
+            }
+        
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': dict(self.errors),
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'hook_errors': self.hook_errors,
+                'total': timer_stats(self.total_time),
+                'stages': {stage: timer_stats(timer) for stage, timer in self.stage_times.items()},
+            }
\ No newline at end of file
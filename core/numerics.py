@@ -0,0 +1,383 @@
+"""
+Numerical Methods Module
+
+Root finding, integration and differentiation of an expression in one
+variable. The expression is compiled once into a callable, so an answer
+costs a few dozen to a few hundred evaluations of closures instead of as
+many parse-and-evaluate round trips:
+
+* solve: Brent's method on a bracket with a sign change
+* integrate: adaptive 15-point Gauss–Kronrod quadrature
+* derivative: central differences with Richardson extrapolation (Ridders)
+
+Where NumPy is installed, the points each step needs (a bracket scan, the
+Kronrod nodes of two subintervals, every step size of a derivative) are
+evaluated in one vectorized batch. Results carry the number of
+evaluations and the time taken.
+"""
+
+import heapq
+import math
+import sys
+import time
+
+from .compiler import CONSTANTS, FUNCTION_TABLES, compile_tree
+from .parser import ExpressionError, parse
+
+# Gauss–Kronrod 7/15 nodes on [-1, 1] (positive half, descending) and weights
+_KRONROD_NODES = (
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0,
+)
+_KRONROD_WEIGHTS = (
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714,
+)
+# Weights of the embedded 7-point Gauss rule, on the odd Kronrod nodes
+_GAUSS_WEIGHTS = (
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327,
+)
+
+_SCAN_POINTS = 64  # Points sampled to find a sign change in a bracket
+
+class NumericResult:
+    """Value of a numerical operation with its cost"""
+    __slots__ = ('value', 'error', 'evaluations', 'batches', 'elapsed', 'converged')
+    
+    def __init__(self, value, error, evaluations, batches, elapsed, converged=True):
+        self.value = value
+        self.error = error  # Estimated absolute error
+        self.evaluations = evaluations  # Points the expression was evaluated at
+        self.batches = batches  # Vectorized calls among them
+        self.elapsed = elapsed  # Seconds
+        self.converged = converged  # Whether the tolerance was reached
+    
+    def __repr__(self):
+        return (f"NumericResult({self.value!r}, error={self.error:.3g}, evaluations={self.evaluations}, "
+                f"batches={self.batches}, elapsed={self.elapsed * 1000:.3f} ms, converged={self.converged})")
+
+class Function:
+    """Compiled function of one variable that counts its evaluations"""
+    
+    def __init__(self, scalar, batch=None):
+        """
+        Args:
+            scalar (callable): x -> value
+            batch (callable): NumPy array of x -> array of values, or None
+        """
+        self.scalar = scalar
+        self.batch = batch
+        self.evaluations = 0
+        self.batches = 0
+    
+    def __call__(self, x):
+        self.evaluations += 1
+        value = float(self.scalar(x))
+        if not math.isfinite(value):
+            raise ValueError(f"Expression is not finite at {x!r}")
+        return value
+    
+    def many(self, points, strict=True):
+        """
+        Evaluate at several points, in one vectorized call when possible
+        
+        Args:
+            points (list): Values of the variable
+            strict (bool): Raise for a non-finite value; otherwise points
+                outside the domain give nan or ±inf, as in NumPy
+        
+        Returns:
+            list: float values
+        
+        Raises:
+            ValueError: If strict and the expression is not finite at some point
+        """
+        if self.batch is None:
+            if strict:
+                return [self(x) for x in points]
+            return [self._lenient(x) for x in points]
+        self.evaluations += len(points)
+        self.batches += 1
+        values = self.batch(points).tolist()
+        if not strict:
+            return values
+        for x, value in zip(points, values):
+            if not math.isfinite(value):
+                raise ValueError(f"Expression is not finite at {x!r}")
+        return values
+    
+    def _lenient(self, x):
+        """Value at x, or nan outside the domain"""
+        self.evaluations += 1
+        try:
+            return float(self.scalar(x))
+        except ExpressionError:
+            raise
+        except (ArithmeticError, ValueError, TypeError):
+            # TypeError: factorial of a non-integral float
+            return math.nan
+
+def compile_function(expression, variable='x', angle_mode='deg', use_numpy=None):
+    """
+    Compile expression text into a Function of one variable
+    
+    Args:
+        expression (str): Expression string, e.g. 'sin(x)*x²-1'
+        variable (str): Name of the variable
+        angle_mode (str): 'deg' or 'rad'
+        use_numpy (bool): Force or disable vectorized batches (default:
+            use them when NumPy is installed)
+    
+    Returns:
+        Function: Evaluation-counting callable
+    
+    Raises:
+        ExpressionError: If the expression is empty, malformed or uses
+            names other than the variable and built-in constants
+    """
+    tree = parse(expression)
+    if tree is None:
+        raise ExpressionError("Empty expression")
+    compiled = compile_tree(tree, FUNCTION_TABLES[angle_mode], CONSTANTS, (variable,))
+    return Function(compiled, _batch(expression, variable, angle_mode, use_numpy))
+
+def _batch(expression, variable, angle_mode, use_numpy):
+    """Vectorized evaluator for Function.batch, or None"""
+    # Imported on use: NumPy is slow to load and unneeded for scalar work
+    from .vectorized import HAS_NUMPY, compile_vectorized
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    if not use_numpy:
+        return None
+    return compile_vectorized(expression, (variable,), angle_mode, use_numpy=True)
+
+def solve(function, bracket, tolerance=1e-12, max_iterations=200):
+    """
+    Find a root of function inside a bracket with Brent's method
+    
+    If the function has the same sign at both ends, the bracket is first
+    scanned for a sign change (one batch of points).
+    
+    Args:
+        function (Function): Function to solve
+        bracket (tuple): (a, b) interval containing the root
+        tolerance (float): Absolute tolerance on the root
+        max_iterations (int): Iteration limit
+    
+    Returns:
+        NumericResult: Root; error bounds the distance to the true root
+    
+    Raises:
+        ValueError: If no sign change is found or the function is not
+            finite at a point it was evaluated at
+    """
+    start = time.perf_counter()
+    a, b = (float(end) for end in bracket)
+    if not a < b:
+        a, b = b, a
+    fa, fb = function.many([a, b])
+    if fa * fb > 0:
+        a, b, fa, fb = _scan(function, a, b)
+    
+    # Brent (1973): bisection, secant and inverse quadratic interpolation,
+    # keeping the root bracketed between b and c
+    c, fc = a, fa
+    d = e = b - a
+    converged = False
+    for _ in range(max_iterations):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * sys.float_info.epsilon * abs(b) + 0.5 * tolerance
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0:
+            converged = True
+            break
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = function(b)
+    return NumericResult(b, abs(c - b) if fb else 0.0, function.evaluations, function.batches, time.perf_counter() - start,
+                         converged)
+
+def _scan(function, a, b):
+    """Narrow [a, b] to the first subinterval with a sign change"""
+    step = (b - a) / _SCAN_POINTS
+    points = [a + step * index for index in range(_SCAN_POINTS + 1)]
+    points[-1] = b
+    values = function.many(points)
+    for index in range(_SCAN_POINTS):
+        if values[index] * values[index + 1] <= 0:
+            return points[index], points[index + 1], values[index], values[index + 1]
+    raise ValueError(f"No sign change found in [{a!r}, {b!r}]")
+
+def integrate(function, a, b, tolerance=1e-10, max_intervals=500):
+    """
+    Integrate function over [a, b] with adaptive Gauss–Kronrod quadrature
+    
+    The subinterval with the largest error estimate is halved until the
+    total estimate is within tolerance (absolute, or relative to the
+    result, whichever is looser).
+    
+    Args:
+        function (Function): Integrand
+        a (float): Lower bound
+        b (float): Upper bound (finite, may be below a)
+        tolerance (float): Error tolerance
+        max_intervals (int): Subinterval limit
+    
+    Returns:
+        NumericResult: Integral and its error estimate; converged is False
+        if the interval limit was reached first
+    
+    Raises:
+        ValueError: For infinite bounds, or if the integrand is not finite
+            at a node
+    """
+    start = time.perf_counter()
+    a, b = float(a), float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ValueError("Integration bounds must be finite")
+    sign = 1.0
+    if b < a:
+        a, b, sign = b, a, -1.0
+    
+    (value, error), = _kronrod(function, [(a, b)])
+    heap = [(-error, a, b, value)]  # Largest error first
+    total, total_error = value, error
+    while total_error > max(tolerance, tolerance * abs(total)) and len(heap) < max_intervals:
+        _, left, right, _ = heapq.heappop(heap)
+        middle = 0.5 * (left + right)
+        if not left < middle < right:
+            break  # Interval too small to split
+        halves = ((left, middle), (middle, right))
+        for (low, high), (value, error) in zip(halves, _kronrod(function, halves)):
+            heapq.heappush(heap, (-error, low, high, value))
+        total = math.fsum(item[3] for item in heap)
+        total_error = math.fsum(-item[0] for item in heap)
+    converged = total_error <= max(tolerance, tolerance * abs(total))
+    return NumericResult(sign * total, total_error, function.evaluations, function.batches,
+                         time.perf_counter() - start, converged)
+
+def _kronrod(function, intervals):
+    """
+    15-point Kronrod estimates of several intervals, from one batch of nodes
+    
+    Returns:
+        list: (integral, error estimate) per interval, the error being the
+        difference to the embedded 7-point Gauss rule
+    """
+    points = []
+    for low, high in intervals:
+        center, half = 0.5 * (low + high), 0.5 * (high - low)
+        points.extend(center - half * node for node in _KRONROD_NODES)
+        points.extend(center + half * node for node in _KRONROD_NODES[-2::-1])
+    values = function.many(points)
+    estimates = []
+    for index, (low, high) in enumerate(intervals):
+        half = 0.5 * (high - low)
+        f = values[15 * index:15 * index + 15]
+        kronrod = _KRONROD_WEIGHTS[7] * f[7]
+        gauss = _GAUSS_WEIGHTS[3] * f[7]
+        for node in range(7):
+            pair = f[node] + f[14 - node]
+            kronrod += _KRONROD_WEIGHTS[node] * pair
+            if node % 2:
+                gauss += _GAUSS_WEIGHTS[node // 2] * pair
+        estimates.append((kronrod * half, abs(kronrod - gauss) * half))
+    return estimates
+
+def _differences(function, at, step, shrink, levels):
+    """Geometrically shrinking steps and the values at at ± each, nan outside the domain"""
+    steps = [step / shrink ** level for level in range(levels)]
+    return steps, function.many([point for h in steps for point in (at + h, at - h)], strict=False)
+
+def derivative(function, at, step=None, levels=10):
+    """
+    Differentiate function at a point with Ridders' method
+    
+    Central differences at geometrically shrinking steps are extrapolated
+    to step zero; the result is the extrapolation with the smallest error
+    estimate. All 2 * levels points are evaluated in one batch. Near the
+    edge of the domain (e.g. ln(x) at 0.05), where the larger steps reach
+    past it, all steps are evaluated again in another batch, starting
+    well inside the largest step that stays in the domain.
+    
+    Args:
+        function (Function): Function to differentiate
+        at (float): Point
+        step (float): Initial step (default: 0.1 scaled to the point)
+        levels (int): Number of step sizes
+    
+    Returns:
+        NumericResult: Derivative and its error estimate
+    
+    Raises:
+        ValueError: If the function is not finite near the point
+    """
+    start = time.perf_counter()
+    at = float(at)
+    if step is None:
+        step = 0.1 * max(1.0, abs(at))
+    shrink = 1.4
+    # Below this, differences are mostly rounding error
+    smallest = 1e-9 * max(1.0, abs(at))
+    while True:
+        steps, values = _differences(function, at, step, shrink, levels)
+        first = next((level for level in range(levels)
+                      if math.isfinite(values[2 * level]) and math.isfinite(values[2 * level + 1])), None)
+        if first == 0:
+            break
+        # Steps comparable to the distance to the edge extrapolate badly
+        step = steps[-1] / shrink if first is None else steps[first] / 4
+        if step < smallest:
+            raise ValueError(f"Expression is not finite near {at!r}")
+    
+    error = math.inf
+    result = None
+    previous = []
+    for level, h in enumerate(steps):
+        high, low = values[2 * level], values[2 * level + 1]
+        if not (math.isfinite(high) and math.isfinite(low)):
+            break  # A singularity between the steps
+        # Extrapolation tableau row: central difference, then Richardson steps
+        row = [(high - low) / (2 * h)]
+        factor = shrink * shrink
+        for column in range(1, level + 1):
+            row.append((row[column - 1] * factor - previous[column - 1]) / (factor - 1))
+            factor *= shrink * shrink
+            estimate = max(abs(row[column] - row[column - 1]), abs(row[column] - previous[column - 1]))
+            if estimate <= error:
+                error, result = estimate, row[column]
+        if level and abs(row[level] - previous[level - 1]) >= 2 * error:
+            break  # Higher orders only add rounding error
+        previous = row
+    if result is None:
+        result, error = previous[0], math.inf
+    return NumericResult(result, error, function.evaluations, function.batches, time.perf_counter() - start,
+                         math.isfinite(error))
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+Parallel Evaluation Module
+
+Spreads batches of expressions over a pool of worker processes. Each
+expression gets a wall-clock budget; a worker stuck on one expression
+(e.g. ``9^9^9`` or ``100000!``) is killed and replaced, and that
+expression's result becomes an EvaluationTimeout.
+
+An expression using variables or functions of another calculator is sent
+as a (definitions, expression) pair; the worker replays the definitions
+on a scratch calculator before evaluating it. A third item, when true,
+asks for the full digits of a big integer result as well. If the
+expression is itself a definition, the worker applies it and returns the
+values of the variables it updated, for the other calculator to adopt.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from .bignum import format_number, full_digits
+from .calculator_core import CalculatorCore
+from .cost import DEFAULT_COST_BUDGET
+from .worksheet import split_definition
+
+_IDLE = -1.0
+
+def _text(item):
+    """Expression text of an expression or (definitions, expression[, full]) tuple"""
+    return item[1] if isinstance(item, tuple) else item
+
+def _calculate_with(core, definitions, expression, full=False):
+    """
+    Evaluate after replaying worksheet definitions on a scratch calculator
+    
+    Returns:
+        The result string, or (result, full digits) if `full` is set; for a
+        definition, name -> (value, error) of the variables it updated, or
+        (that dict, full digits of the defined variable or None)
+    """
+    scratch = CalculatorCore(expression_cache=core.expression_cache, cost_budget=core.cost_budget)
+    scratch.set_angle_mode(core.angle_mode)
+    for definition in definitions:
+        scratch.define(definition)
+    definition = split_definition(expression.strip())
+    if definition is not None:
+        cells = scratch.worksheet.cells
+        updated = scratch.worksheet.define(*definition)
+        values = {name: (cells[name].value, cells[name].error) for name in updated if cells[name].params is None}
+        if not full:
+            return values
+        cell = cells[definition[0]]
+        if cell.params is not None or cell.error is not None or cell.compiled is None:
+            return values, None
+        return values, full_digits(format_number(cell.value))
+    result = scratch.calculate(expression)
+    return (result, full_digits(result)) if full else result
+
+class EvaluationTimeout(TimeoutError):
+    """Result placeholder for an expression that exceeded its time budget"""
+    
+    def __init__(self, expression, timeout):
+        super().__init__(f"Evaluation exceeded {timeout:g} s: {_text(expression)!r}")
+        self.expression = _text(expression)
+        self.timeout = timeout
+
+class WorkerCrashed(RuntimeError):
+    """Result placeholder for an expression whose worker process died"""
+    
+    def __init__(self, expression, exitcode):
+        super().__init__(f"Worker exited with code {exitcode} on {_text(expression)!r}")
+        self.expression = _text(expression)
+        self.exitcode = exitcode
+
+def _worker_main(conn, progress, angle_mode, cache_size, cost_budget):
+    """
+    Worker process loop
+    
+    Receives lists of expressions (or (definitions, expression[, full])
+    tuples) and replies with a list of results (result string, exception or
+    None). Before each expression it writes
+    its position in the task and its start time into `progress`, so the
+    parent can tell which expression is running and for how long.
+    """
+    core = CalculatorCore(cache_size=cache_size, cost_budget=cost_budget)
+    core.set_angle_mode(angle_mode)
+    calculate = core.calculate
+    clock = time.monotonic
+    while True:
+        try:
+            expressions = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if expressions is None:
+            return
+        results = []
+        for position, expression in enumerate(expressions):
+            # Start time first: a reader that sees the new position also sees its start time
+            progress[1] = clock()
+            progress[0] = position
+            try:
+                if isinstance(expression, tuple):
+                    results.append(_calculate_with(core, *expression))
+                else:
+                    results.append(calculate(expression))
+            except Exception as e:
+                results.append(e)
+        progress[0] = _IDLE
+        conn.send(results)
+
+class _Worker:
+    """Handle on one worker process and the task it is running"""
+    
+    def __init__(self, context, angle_mode, cache_size, cost_budget):
+        self.progress = context.RawArray('d', 2)
+        self.progress[0] = _IDLE
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.progress, angle_mode, cache_size, cost_budget),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.task = None  # (indices, expressions) currently assigned
+    
+    def submit(self, task):
+        self.task = task
+        self.conn.send(task[1])
+    
+    def running(self):
+        """
+        Returns:
+            tuple: (position in task, start time) or None if between expressions
+        """
+        position = self.progress[0]
+        if position == _IDLE:
+            return None
+        return int(position), self.progress[1]
+    
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+    
+    def close(self, timeout=1.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class ParallelEvaluator:
+    """Evaluate expression batches on a pool of worker processes"""
+    
+    def __init__(self, workers=None, timeout=1.0, angle_mode='deg', chunk_size=None,
+                 cache_size=1024, mp_context=None, cost_budget=DEFAULT_COST_BUDGET):
+        """
+        Initialize evaluator (worker processes start lazily on first use)
+        
+        Args:
+            workers (int): Number of worker processes (default: CPU count)
+            timeout (float): Wall-clock seconds allowed per expression
+            angle_mode (str): 'deg' or 'rad'
+            chunk_size (int): Expressions sent to a worker at a time (default: automatic)
+            cache_size (int): Compiled expression cache size in each worker
+            mp_context: multiprocessing context or start method name
+            cost_budget (CostBudget): Limits the workers reject expressions with
+        """
+        if angle_mode not in ('deg', 'rad'):
+            raise ValueError(f"Invalid angle mode {angle_mode!r}")
+        self.num_workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.angle_mode = angle_mode
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self.cost_budget = cost_budget
+        if mp_context is None or isinstance(mp_context, str):
+            mp_context = multiprocessing.get_context(mp_context)
+        self._context = mp_context
+        self._workers = []
+        self.timeouts = 0  # Expressions that hit the time budget
+        self.restarts = 0  # Workers killed and replaced
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _spawn(self):
+        return _Worker(self._context, self.angle_mode, self.cache_size, self.cost_budget)
+    
+    def _ensure_workers(self):
+        while len(self._workers) < self.num_workers:
+            self._workers.append(self._spawn())
+    
+    def _replace(self, worker):
+        worker.kill()
+        self.restarts += 1
+        replacement = self._spawn()
+        self._workers[self._workers.index(worker)] = replacement
+        return replacement
+    
+    def map(self, expressions):
+        """
+        Evaluate expressions in parallel
+        
+        Args:
+            expressions (iterable): Mathematical expression strings, or
+                (definitions, expression[, full]) tuples where definitions is
+                a tuple of worksheet definition texts the expression uses
+        
+        Returns:
+            list: One item per input, in order: the result (see
+            _calculate_with() for tuples), the
+            exception raised for that expression (EvaluationTimeout if it
+            ran out of time), or None for empty input
+        """
+        expressions = list(expressions)
+        
+        # Evaluate each distinct expression once
+        unique = {}
+        for expression in expressions:
+            unique.setdefault(expression, len(unique))
+        unique_expressions = list(unique)
+        unique_results = [None] * len(unique_expressions)
+        
+        chunk_size = self.chunk_size or max(1, min(256, len(unique_expressions) // (self.num_workers * 8)))
+        pending = deque()
+        for start in range(0, len(unique_expressions), chunk_size):
+            indices = list(range(start, min(start + chunk_size, len(unique_expressions))))
+            pending.append((indices, unique_expressions[start:start + chunk_size]))
+        
+        self._ensure_workers()
+        poll_interval = min(0.05, self.timeout / 4)
+        
+        while True:
+            for worker in self._workers:
+                if worker.task is None and pending:
+                    worker.submit(pending.popleft())
+            busy = [worker for worker in self._workers if worker.task is not None]
+            if not busy:
+                break
+            
+            ready = wait([worker.conn for worker in busy], poll_interval)
+            now = time.monotonic()
+            for worker in busy:
+                indices, chunk = worker.task
+                if worker.conn in ready:
+                    try:
+                        results = worker.conn.recv()
+                    except EOFError:
+                        results = None
+                    if results is not None:
+                        for index, result in zip(indices, results):
+                            unique_results[index] = result
+                        worker.task = None
+                        continue
+                    # The worker died mid-task (e.g. killed by the OS)
+                    running = worker.running()
+                    position = running[0] if running else 0
+                    error = WorkerCrashed(chunk[position], worker.process.exitcode)
+                else:
+                    running = worker.running()
+                    if running is None or now - running[1] <= self.timeout:
+                        continue
+                    position = running[0]
+                    error = EvaluationTimeout(chunk[position], self.timeout)
+                    self.timeouts += 1
+                
+                # Fail the stuck expression and resubmit the rest of the task
+                unique_results[indices[position]] = error
+                retry = [i for i in range(len(chunk)) if i != position]
+                if retry:
+                    pending.appendleft(([indices[i] for i in retry], [chunk[i] for i in retry]))
+                self._replace(worker)
+        
+        return [unique_results[unique[expression]] for expression in expressions]
+    
+    def close(self):
+        """Stop all worker processes"""
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
\ No newline at end of file
@@ -0,0 +1,375 @@
+"""
+Expression Tokenizer and Parser Module
+
+Turns calculator input such as ``sin(30)+3x²-|−2|!`` into an expression
+tree in a single left-to-right pass.
+"""
+
+import os
+import re
+
+# Token kinds
+NUMBER = 'number'
+NAME = 'name'
+OP = 'op'
+END = 'end'
+
+# One alternative per token class, tried in order at the current position
+_TOKEN_PATTERN = re.compile(r"""
+      (?P<ws>\s+)
+    | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<suffix>x[²³ⁿ]|x\^y)
+    | (?P<name>[A-Za-z_][A-Za-z_0-9]*|π|³√|√)
+    | (?P<op>\*\*|//|[-+*/%^×÷−!²³,()|])
+""", re.VERBOSE)
+
+# Alternate spellings mapped to their canonical token value
+_CANONICAL = {
+    '×': '*', '÷': '/', '−': '-', '**': '^',
+    'x²': '²', 'x³': '³', 'xⁿ': '^', 'x^y': '^',
+    'π': 'pi', '√': 'sqrt', '³√': 'cbrt',
+}
+
+# Binary operators: precedence and right associativity
+BINARY_PRECEDENCE = {
+    '+': (1, False), '-': (1, False),
+    '*': (2, False), '/': (2, False), '//': (2, False), '%': (2, False),
+    '^': (4, True),
+}
+# Prefix sign operators bind tighter than * but looser than ^ (as in Python)
+UNARY_PRECEDENCE = 3
+
+# Postfix operators and the node they expand to
+POSTFIX_OPERATORS = ('!', '²', '³')
+
+# Tokens after which an operand has just been completed
+_OPERAND_END_OPS = frozenset([')', '!', '²', '³'])
+
+class ExpressionError(ValueError):
+    """Raised for malformed expressions"""
+    
+    def __init__(self, message, position=None):
+        super().__init__(message if position is None else f"{message} at position {position}")
+        self.position = position
+
+class Number:
+    """Numeric literal node"""
+    __slots__ = ('value', 'text')
+    
+    def __init__(self, value, text=None):
+        self.value = value
+        self.text = text  # Literal as written, for exact decimal conversion
+    
+    def __repr__(self):
+        return f"Number({self.value!r})"
+
+class Name:
+    """Constant or variable reference node"""
+    __slots__ = ('name',)
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def __repr__(self):
+        return f"Name({self.name!r})"
+
+class UnaryOp:
+    """Prefix sign node"""
+    __slots__ = ('op', 'operand')
+    
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+    
+    def __repr__(self):
+        return f"UnaryOp({self.op!r}, {self.operand!r})"
+
+class BinOp:
+    """Binary operator node"""
+    __slots__ = ('op', 'left', 'right')
+    
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+    
+    def __repr__(self):
+        return f"BinOp({self.op!r}, {self.left!r}, {self.right!r})"
+
+class Call:
+    """Function call node"""
+    __slots__ = ('name', 'args')
+    
+    def __init__(self, name, args):
+        self.name = name
+        self.args = tuple(args)
+    
+    def __repr__(self):
+        return f"Call({self.name!r}, {list(self.args)!r})"
+
+def scan(text, pos=0, operand_end=False):
+    """
+    Lex tokens from a position, resuming from a saved lexer state
+    
+    Args:
+        text (str): Expression string
+        pos (int): Offset to start lexing at
+        operand_end (bool): Whether the token before `pos` completed an operand
+    
+    Yields:
+        tuple: ((kind, value, position), end offset, operand_end after the token);
+        NUMBER values are the literal text
+    
+    Raises:
+        ExpressionError: On a character no token can start with
+    """
+    match = _TOKEN_PATTERN.match
+    length = len(text)
+    
+    while pos < length:
+        m = match(text, pos)
+        if m is None:
+            raise ExpressionError(f"Unexpected character {text[pos]!r}", pos)
+        kind = m.lastgroup
+        value = m.group(kind)
+        
+        if kind == 'ws':
+            pos = m.end()
+            continue
+        
+        if kind == 'suffix' and not operand_end:
+            # Not after an operand: 'x' is a variable name, rescan the rest
+            operand_end = True
+            yield (NAME, 'x', pos), pos + 1, operand_end
+            pos += 1
+            continue
+        
+        value = _CANONICAL.get(value, value)
+        if kind == 'number':
+            token = (NUMBER, value, pos)  # Converted by the parser, which keeps the text
+            operand_end = True
+        elif kind == 'name':
+            token = (NAME, value, pos)
+            operand_end = True
+        else:
+            token = (OP, value, pos)
+            # A bar after an operand closes |x| (still an operand end),
+            # otherwise it opens one (still expecting an operand)
+            if value != '|':
+                operand_end = value in _OPERAND_END_OPS
+        pos = m.end()
+        yield token, pos, operand_end
+
+def tokenize(text):
+    """
+    Split expression text into tokens
+    
+    Args:
+        text (str): Expression string
+    
+    Returns:
+        list: (kind, value, position) tuples terminated by an END token
+    """
+    tokens = [token for token, _, _ in scan(text)]
+    tokens.append((END, None, len(text)))
+    return tokens
+
+class IncrementalTokenizer:
+    """
+    Tokenizer that keeps its state across edits of the same text
+    
+    Each update re-lexes only from shortly before the first changed
+    character, so typing or deleting at the end costs O(1) amortized.
+    """
+    
+    # Longest lookahead across a token boundary ('2e+5', 'x^y'), in characters
+    _LOOKAHEAD = 3
+    
+    def __init__(self):
+        self.text = ""
+        self.tokens = []  # (kind, value, position) without the END token
+        self.depth = 0  # Unclosed '(' count
+        self.error = None  # ExpressionError for text the lexer stopped at
+        self._ends = []  # End offset of each token
+        self._states = []  # (operand_end, depth) after each token
+    
+    def update(self, text):
+        """
+        Move to new text, re-lexing only the changed tail
+        
+        Args:
+            text (str): New full text
+        """
+        old = self.text
+        if text.startswith(old):
+            prefix = len(old)
+        elif old.startswith(text):
+            prefix = len(text)
+        else:
+            prefix = len(os.path.commonprefix((old, text)))
+        
+        # Drop tokens that the edit could extend or merge with
+        keep = len(self.tokens)
+        limit = prefix - self._LOOKAHEAD
+        while keep and self._ends[keep - 1] > limit:
+            keep -= 1
+        del self.tokens[keep:]
+        del self._ends[keep:]
+        del self._states[keep:]
+        
+        pos = self._ends[-1] if keep else 0
+        operand_end, depth = self._states[-1] if keep else (False, 0)
+        self.text = text
+        self.error = None
+        try:
+            for token, end, operand_end in scan(text, pos, operand_end):
+                if token[0] == OP:
+                    if token[1] == '(':
+                        depth += 1
+                    elif token[1] == ')':
+                        depth -= 1
+                self.tokens.append(token)
+                self._ends.append(end)
+                self._states.append((operand_end, depth))
+        except ExpressionError as e:
+            self.error = e
+        self.depth = self._states[-1][1] if self.tokens else 0
+    
+    def completed_tokens(self):
+        """
+        Token list for the current text with open parentheses closed
+        
+        Returns:
+            list: Tokens ready for Parser, or None if the text cannot be
+            completed that way (lex error, empty, ends mid-expression)
+        """
+        if self.error is not None or not self.tokens or self.depth < 0:
+            return None
+        if not self._states[-1][0]:
+            return None
+        end = len(self.text)
+        return self.tokens + [(OP, ')', end)] * self.depth + [(END, None, end)]
+
+def _parse_number(text):
+    """Convert a numeric literal to int when possible, float otherwise"""
+    if '.' in text or 'e' in text or 'E' in text:
+        return float(text)
+    return int(text)
+
+class Parser:
+    """Precedence-climbing parser over a token list"""
+    
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = 0
+    
+    def parse(self):
+        """
+        Parse the whole token stream
+        
+        Returns:
+            Expression tree root node, or None for empty input
+        """
+        if self.tokens[0][0] == END:
+            return None
+        node = self._parse_expression(0)
+        kind, value, pos = self.tokens[self.index]
+        if kind != END:
+            raise ExpressionError(f"Unexpected {value!r}", pos)
+        return node
+    
+    def _advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+    
+    def _expect(self, value):
+        kind, found, pos = self._advance()
+        if kind != OP or found != value:
+            raise ExpressionError(f"Expected {value!r}", pos)
+    
+    def _parse_expression(self, min_precedence):
+        left = self._parse_unary()
+        tokens = self.tokens
+        while True:
+            kind, op, _ = tokens[self.index]
+            if kind != OP or op not in BINARY_PRECEDENCE:
+                return left
+            precedence, right_assoc = BINARY_PRECEDENCE[op]
+            if precedence < min_precedence:
+                return left
+            self.index += 1
+            right = self._parse_expression(precedence if right_assoc else precedence + 1)
+            left = BinOp(op, left, right)
+    
+    def _parse_unary(self):
+        kind, value, _ = self.tokens[self.index]
+        if kind == OP and value in ('+', '-'):
+            self.index += 1
+            return UnaryOp(value, self._parse_expression(UNARY_PRECEDENCE))
+        return self._parse_postfix()
+    
+    def _parse_postfix(self):
+        node = self._parse_primary()
+        tokens = self.tokens
+        while True:
+            kind, value, _ = tokens[self.index]
+            if kind != OP or value not in POSTFIX_OPERATORS:
+                return node
+            self.index += 1
+            if value == '!':
+                node = Call('factorial', (node,))
+            else:
+                node = BinOp('^', node, Number(2 if value == '²' else 3))
+    
+    def _parse_primary(self):
+        kind, value, pos = self._advance()
+        if kind == NUMBER:
+            return Number(_parse_number(value), value)
+        if kind == NAME:
+            next_kind, next_value, _ = self.tokens[self.index]
+            if next_kind == OP and next_value == '(':
+                self.index += 1
+                return Call(value, self._parse_arguments())
+            return Name(value)
+        if kind == OP and value == '(':
+            node = self._parse_expression(0)
+            self._expect(')')
+            return node
+        if kind == OP and value == '|':
+            node = self._parse_expression(0)
+            self._expect('|')
+            return Call('abs', (node,))
+        if kind == END:
+            raise ExpressionError("Unexpected end of expression", pos)
+        raise ExpressionError(f"Unexpected {value!r}", pos)
+    
+    def _parse_arguments(self):
+        kind, value, _ = self.tokens[self.index]
+        if kind == OP and value == ')':
+            self.index += 1
+            return ()
+        args = [self._parse_expression(0)]
+        while True:
+            kind, value, pos = self._advance()
+            if kind == OP and value == ',':
+                args.append(self._parse_expression(0))
+            elif kind == OP and value == ')':
+                return args
+            else:
+                raise ExpressionError("Expected ',' or ')'", pos)
+
+def parse(text):
+    """
+    Parse expression text into an expression tree
+    
+    Args:
+        text (str): Expression string
+    
+    Returns:
+        Expression tree root node, or None for empty input
+    
+    Raises:
+        ExpressionError: If the expression is malformed
+    """
+    return Parser(tokenize(text)).parse()
\ No newline at end of file
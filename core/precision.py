@@ -0,0 +1,438 @@
+"""
+Arbitrary-Precision Evaluation Module
+
+Compiles expression trees for evaluation in one of three number domains:
+
+* ``float``    native doubles (the default, see compiler.FUNCTION_TABLES)
+* ``decimal``  decimal.Decimal rounded to a chosen number of significant
+               digits; functions use series evaluated with guard digits
+* ``fraction`` exact fractions.Fraction; functions only return results
+               that are exactly rational (sqrt(9/4), sin(30) in degrees)
+               and raise ValueError otherwise
+
+Decimal precisions that fit in a double take a fast path: the expression
+runs on floats and only the result is rounded to the requested digits.
+"""
+
+import decimal
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+from .bignum import format_integer, int_to_decimal
+from .compiler import BINARY_OPERATORS, CONSTANTS, FUNCTION_TABLES, compile_tree
+from .parser import BinOp, Call, ExpressionError, Name, UnaryOp
+
+PRECISION_MODES = ('float', 'decimal', 'fraction')
+FLOAT_DIGITS = 15  # Significant digits a double always round-trips
+DEFAULT_DECIMAL_DIGITS = 28  # decimal module default
+_GUARD_DIGITS = 5  # Extra digits carried inside function evaluation
+
+# --- Decimal domain ---------------------------------------------------------
+
+def _decimal_pi(precision):
+    """pi to `precision` digits (series from the decimal module documentation)"""
+    with decimal.localcontext() as ctx:
+        ctx.prec = precision + 2
+        three = Decimal(3)
+        last, total, term, n, na, d, da = 0, three, three, 1, 0, 0, 24
+        while total != last:
+            last = total
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            term = term * n / d
+            total += term
+    return total
+
+def _guarded(func):
+    """Run func with guard digits and round its result to the caller's precision"""
+    def wrapped(x):
+        with decimal.localcontext() as ctx:
+            ctx.prec += _GUARD_DIGITS
+            result = func(x, ctx.prec)
+        return +result
+    return wrapped
+
+def _reduce_angle(x, precision):
+    """x modulo 2*pi into [-pi, pi], with enough digits to absorb the size of x"""
+    with decimal.localcontext() as ctx:
+        ctx.prec = precision + max(x.adjusted(), 0) + 2
+        pi = _decimal_pi(ctx.prec)
+        x = x.remainder_near(2 * pi)
+    return x
+
+def _decimal_sin_cos(x, precision):
+    """(sin x, cos x) by Taylor series after reducing x into [-pi, pi]"""
+    x = _reduce_angle(x, precision)
+    x2 = x * x
+    sin_total, cos_total = x, Decimal(1)
+    sin_term, cos_term = x, Decimal(1)
+    n = 1
+    while True:
+        sin_term = -sin_term * x2 / ((n + 1) * (n + 2))
+        cos_term = -cos_term * x2 / (n * (n + 1))
+        n += 2
+        if sin_total + sin_term == sin_total and cos_total + cos_term == cos_total:
+            return sin_total, cos_total
+        sin_total += sin_term
+        cos_total += cos_term
+
+def _decimal_sin(x, precision):
+    return _decimal_sin_cos(x, precision)[0]
+
+def _decimal_cos(x, precision):
+    return _decimal_sin_cos(x, precision)[1]
+
+def _decimal_tan(x, precision):
+    sin, cos = _decimal_sin_cos(x, precision)
+    return sin / cos
+
+def _decimal_cot(x, precision):
+    sin, cos = _decimal_sin_cos(x, precision)
+    return cos / sin
+
+def _decimal_atan(x, precision):
+    """atan by argument halving and the Taylor series"""
+    if x.is_nan():
+        raise ValueError("math domain error")
+    sign = -1 if x < 0 else 1
+    x = abs(x)
+    if x.is_infinite():
+        return sign * _decimal_pi(precision) / 2
+    invert = x > 1
+    if invert:
+        x = 1 / x
+    # atan(x) = 2 atan(x / (1 + sqrt(1 + x^2))); a few halvings speed up the series
+    halvings = 0
+    while x > Decimal('0.1'):
+        x = x / (1 + (1 + x * x).sqrt())
+        halvings += 1
+    x2 = x * x
+    total, term, n = x, x, 1
+    while True:
+        term = -term * x2
+        n += 2
+        step = term / n
+        if total + step == total:
+            break
+        total += step
+    total *= 2 ** halvings
+    if invert:
+        total = _decimal_pi(precision) / 2 - total
+    return sign * total
+
+def _decimal_asin(x, precision):
+    if abs(x) > 1:
+        raise ValueError("math domain error")
+    if abs(x) == 1:
+        return x * _decimal_pi(precision) / 2
+    return _decimal_atan(x / (1 - x * x).sqrt(), precision)
+
+def _decimal_acos(x, precision):
+    return _decimal_pi(precision) / 2 - _decimal_asin(x, precision)
+
+def _decimal_cbrt(x, precision):
+    """Real cube root by Newton's method from a float or logarithmic estimate"""
+    if not x or not x.is_finite():
+        return x
+    magnitude = x.copy_abs()
+    if abs(magnitude.adjusted()) < 300:
+        y = Decimal(float(magnitude) ** (1 / 3))
+    else:
+        y = (magnitude.ln() / 3).exp()
+    while True:
+        next_y = y - (y * y * y - magnitude) / (3 * y * y)
+        if next_y == y:
+            return y.copy_sign(x)
+        y = next_y
+
+def _decimal_factorial(x):
+    if x != x.to_integral_value():
+        raise ValueError("factorial() only accepts integral values")
+    # Decimal(int) is quadratic in the number of digits
+    return +int_to_decimal(math.factorial(int(x)))
+
+def _decimal_floordiv(x, y):
+    """Floor division with Python semantics (Decimal's // truncates)"""
+    quotient, remainder = divmod(x, y)
+    if remainder and (remainder < 0) != (y < 0):
+        quotient -= 1
+    return quotient
+
+def _decimal_mod(x, y):
+    """Modulo with the sign of the divisor, like Python's %"""
+    remainder = x % y
+    if remainder and (remainder < 0) != (y < 0):
+        remainder += y
+    return remainder
+
+def _decimal_degrees_in(func):
+    def wrapped(x, precision):
+        return func(x * _decimal_pi(precision) / 180, precision)
+    return wrapped
+
+def _decimal_degrees_out(func):
+    def wrapped(x, precision):
+        return func(x, precision) * 180 / _decimal_pi(precision)
+    return wrapped
+
+_DECIMAL_TRIG = {'sin': _decimal_sin, 'cos': _decimal_cos, 'tan': _decimal_tan, 'cot': _decimal_cot}
+_DECIMAL_INV_TRIG = {'asin': _decimal_asin, 'acos': _decimal_acos, 'atan': _decimal_atan}
+
+def _build_decimal_table(angle_mode):
+    table = {}
+    for name, func in _DECIMAL_TRIG.items():
+        table[name] = (_guarded(_decimal_degrees_in(func) if angle_mode == 'deg' else func), 1)
+    for name, func in _DECIMAL_INV_TRIG.items():
+        table[name] = (_guarded(_decimal_degrees_out(func) if angle_mode == 'deg' else func), 1)
+    table.update({
+        'log': (lambda x: x.log10(), 1),
+        'ln': (lambda x: x.ln(), 1),
+        'sqrt': (lambda x: x.sqrt(), 1),
+        'cbrt': (_guarded(_decimal_cbrt), 1),
+        'abs': (abs, 1),
+        'exp': (lambda x: x.exp(), 1),
+        'factorial': (_decimal_factorial, 1),
+    })
+    return table
+
+DECIMAL_FUNCTION_TABLES = {mode: _build_decimal_table(mode) for mode in FUNCTION_TABLES}
+
+DECIMAL_OPERATORS = dict(BINARY_OPERATORS, **{'//': _decimal_floordiv, '%': _decimal_mod})
+
+# --- Fraction domain --------------------------------------------------------
+
+def _integer_root(n, k):
+    """Exact k-th root of a non-negative int, or None"""
+    if n < 2:
+        return n
+    if k == 2:
+        root = math.isqrt(n)
+    else:
+        # Newton's method on integers, from an estimate above the root
+        root = 1 << -(-n.bit_length() // k)
+        while True:
+            next_root = ((k - 1) * root + n // root ** (k - 1)) // k
+            if next_root >= root:
+                break
+            root = next_root
+    return root if root ** k == n else None
+
+def _exact_root(x, k):
+    """Exact k-th root of a Fraction, or raise ValueError"""
+    negative = x < 0
+    if negative and k % 2 == 0:
+        raise ValueError("math domain error")
+    numerator = _integer_root(abs(x.numerator), k)
+    denominator = _integer_root(x.denominator, k)
+    if numerator is None or denominator is None:
+        raise ValueError(f"root of {x} has no exact rational value")
+    root = Fraction(numerator, denominator)
+    return -root if negative else root
+
+def _fraction_pow(base, exponent):
+    """Exact power; fractional exponents need an exact root"""
+    exponent = Fraction(exponent)
+    if exponent.denominator == 1:
+        return Fraction(base) ** exponent.numerator
+    return _exact_root(Fraction(base), exponent.denominator) ** exponent.numerator
+
+def _fraction_factorial(x):
+    if x.denominator != 1:
+        raise ValueError("factorial() only accepts integral values")
+    return Fraction(math.factorial(x.numerator))
+
+def _fraction_log10(x):
+    """log10 of an exact power of ten"""
+    if x > 0:
+        numerator, denominator = x.numerator, x.denominator
+        if denominator == 1:
+            power = len(str(numerator)) - 1
+            if numerator == 10 ** power:
+                return Fraction(power)
+        elif numerator == 1:
+            power = len(str(denominator)) - 1
+            if denominator == 10 ** power:
+                return Fraction(-power)
+    raise ValueError(f"log({x}) has no exact rational value")
+
+def _only_at(points, name):
+    """Function defined exactly only at the given {argument: result} points"""
+    def func(x):
+        try:
+            return points[x]
+        except KeyError:
+            raise ValueError(f"{name}({x}) has no exact rational value") from None
+    return func
+
+# Niven's theorem: the only rational sines of rational degrees are 0, ±1/2, ±1
+_HALF = Fraction(1, 2)
+_SIN_DEGREES = {0: 0, 30: _HALF, 90: 1, 150: _HALF, 180: 0, 210: -_HALF, 270: -1, 330: -_HALF}
+_TAN_DEGREES = {0: 0, 45: 1, 135: -1, 180: 0, 225: 1, 315: -1}
+
+def _periodic(table, period, name):
+    def func(x):
+        value = table.get(x % period)
+        if value is None:
+            raise ValueError(f"{name}({x}) has no exact rational value")
+        return Fraction(value)
+    return func
+
+def _inverse(table, name, low, high):
+    """Inverse of a degree table restricted to the principal range [low, high]"""
+    inverse = {Fraction(value): Fraction(angle) for angle, value in table.items() if low <= angle <= high}
+    return _only_at(inverse, name)
+
+def _build_fraction_table(angle_mode):
+    if angle_mode == 'deg':
+        sin = _periodic(_SIN_DEGREES, 360, 'sin')
+        cos = _periodic({(angle + 270) % 360: value for angle, value in _SIN_DEGREES.items()}, 360, 'cos')
+        tan = _periodic(_TAN_DEGREES, 180, 'tan')
+        cot = _periodic({(90 - angle) % 180: value for angle, value in _TAN_DEGREES.items()}, 180, 'cot')
+        signed_sin = {angle if angle <= 90 else angle - 360: value for angle, value in _SIN_DEGREES.items()}
+        asin = _inverse(signed_sin, 'asin', -90, 90)
+        acos = _inverse({angle: value for angle, value in
+                         ((angle, _SIN_DEGREES[(90 - angle) % 360]) for angle in (0, 60, 90, 120, 180))},
+                        'acos', 0, 180)
+        atan = _inverse({0: 0, 45: 1, -45: -1}, 'atan', -90, 90)
+    else:
+        sin = _only_at({0: Fraction(0)}, 'sin')
+        cos = _only_at({0: Fraction(1)}, 'cos')
+        tan = _only_at({0: Fraction(0)}, 'tan')
+        cot = _only_at({}, 'cot')
+        asin = _only_at({0: Fraction(0)}, 'asin')
+        acos = _only_at({1: Fraction(0)}, 'acos')
+        atan = _only_at({0: Fraction(0)}, 'atan')
+    return {
+        'sin': (sin, 1), 'cos': (cos, 1), 'tan': (tan, 1), 'cot': (cot, 1),
+        'asin': (asin, 1), 'acos': (acos, 1), 'atan': (atan, 1),
+        'log': (_fraction_log10, 1),
+        'ln': (_only_at({1: Fraction(0)}, 'ln'), 1),
+        'sqrt': (lambda x: _exact_root(x, 2), 1),
+        'cbrt': (lambda x: _exact_root(x, 3), 1),
+        'abs': (abs, 1),
+        'exp': (_only_at({0: Fraction(1)}, 'exp'), 1),
+        'factorial': (_fraction_factorial, 1),
+    }
+
+FRACTION_FUNCTION_TABLES = {mode: _build_fraction_table(mode) for mode in FUNCTION_TABLES}
+
+FRACTION_OPERATORS = dict(BINARY_OPERATORS, **{'^': _fraction_pow})
+
+def _names(node):
+    """Yield every Name node's name in a tree"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Name):
+            yield node.name
+        elif isinstance(node, UnaryOp):
+            stack.append(node.operand)
+        elif isinstance(node, BinOp):
+            stack.extend((node.left, node.right))
+        elif isinstance(node, Call):
+            stack.extend(node.args)
+
+# --- Compilation ------------------------------------------------------------
+
+def _round_float(value, digits):
+    """Round a float result to `digits` significant digits (ints stay exact)"""
+    if isinstance(value, float) and math.isfinite(value):
+        return float(f"{value:.{digits}g}")
+    return value
+
+def format_decimal(value):
+    """
+    Format a Decimal without trailing zeros, in plain notation unless it is
+    very large or small
+    
+    Args:
+        value (Decimal): Value to format
+    
+    Returns:
+        str: e.g. '0.3', '1024', '1.2345E+40'
+    """
+    if not value.is_finite():
+        return str(value)
+    value = value.normalize(decimal.Context(prec=max(len(value.as_tuple().digits), 1)))
+    if -7 < value.adjusted() < max(len(value.as_tuple().digits), 16):
+        return format(value, 'f')
+    return str(value)
+
+def format_fraction(value):
+    """
+    Format a Fraction, keeping huge numerators and denominators unconverted
+
+    Args:
+        value (Fraction): Value to format
+
+    Returns:
+        str: e.g. '3/10', '7', or '1.606938044258990e+60000/3'
+    """
+    if value.denominator == 1:
+        return format_integer(value.numerator)
+    return f"{format_integer(value.numerator)}/{format_integer(value.denominator)}"
+
+def compile_precise(tree, angle_mode='deg', mode='float', digits=None):
+    """
+    Compile an expression tree for a precision mode
+    
+    Args:
+        tree: Expression tree root node
+        angle_mode (str): 'deg' or 'rad'
+        mode (str): 'float', 'decimal' or 'fraction'
+        digits (int): Significant digits for 'decimal' (default: 28); a float
+            mode result is rounded to this many digits when given
+    
+    Returns:
+        CompiledExpression: evaluate() returns a float/int, Decimal or
+        Fraction; its format() renders that as the result string
+    
+    Raises:
+        ExpressionError: For unknown names, unknown functions or wrong arity
+    """
+    if mode == 'decimal' and digits is None:
+        digits = DEFAULT_DECIMAL_DIGITS
+    if mode == 'float' or mode == 'decimal' and digits <= FLOAT_DIGITS:
+        # Fast path: doubles carry the requested digits, round only the result
+        compiled = compile_tree(tree, FUNCTION_TABLES[angle_mode], CONSTANTS)
+        if digits is not None:
+            evaluate = compiled.evaluate
+            compiled.evaluate = lambda env: _round_float(evaluate(env), digits)
+        return compiled
+    
+    if mode == 'decimal':
+        context = decimal.Context(prec=digits, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+        with decimal.localcontext(context):
+            pi = _decimal_pi(digits)
+            e = Decimal(1).exp()
+            # Constants are folded while compiling: same context as evaluate()
+            compiled = compile_tree(
+                tree, DECIMAL_FUNCTION_TABLES[angle_mode], {'pi': pi, 'e': e},
+                literal=lambda node: Decimal(node.text or node.value),
+                operators=DECIMAL_OPERATORS
+            )
+        inner = compiled.evaluate
+        
+        def evaluate(env):
+            with decimal.localcontext(context):
+                # Unary plus rounds exact literals to the context as well
+                return +inner(env)
+        
+        compiled.evaluate = evaluate
+        compiled.format = format_decimal
+        return compiled
+    
+    if mode == 'fraction':
+        for name in _names(tree):
+            if name in CONSTANTS:
+                raise ExpressionError(f"{name} has no exact rational value")
+        compiled = compile_tree(
+            tree, FRACTION_FUNCTION_TABLES[angle_mode], {},
+            literal=lambda node: Fraction(node.text or node.value),
+            operators=FRACTION_OPERATORS
+        )
+        compiled.format = format_fraction
+        return compiled
+    
+    raise ValueError(f"Invalid precision mode {mode!r}")
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Live Result Preview Module
+
+Keeps an incremental lexer over the text being typed and evaluates it on
+a background thread, so the caller's thread only pays for re-lexing the
+edited tail on each keystroke. Evaluation goes through the calculator's
+own compile path (CalculatorCore.calculate_tokens), so previews follow
+its angle and precision modes and its worksheet, share its expression
+cache, and never touch its history.
+
+Results of superseded input are dropped. An evaluation that has already
+started cannot be interrupted: it runs to completion, bounded by the
+calculator's cost budget, and the preview of newer input waits for it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .parser import IncrementalTokenizer
+
+class PreviewSession:
+    """Incremental input state plus a single background evaluator"""
+    
+    def __init__(self, core):
+        """
+        Initialize preview session
+        
+        Args:
+            core (CalculatorCore): Calculator previews are evaluated by. It is
+                called from the preview thread, so it must be safe to use from
+                several threads (ThreadSafeCalculatorCore)
+        """
+        self.tokenizer = IncrementalTokenizer()
+        self.core = core
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='preview')
+        self._lock = threading.Lock()  # Guards _generation and _future
+        self._generation = 0
+        self._future = None
+    
+    @property
+    def generation(self):
+        """Counter identifying the current input"""
+        return self._generation
+    
+    def is_current(self, generation):
+        """Whether a result for `generation` still matches the input"""
+        return generation == self._generation
+    
+    def update(self, text):
+        """
+        Feed the new input text (cheap; call on every keystroke)
+        
+        Any preview still pending for older input is cancelled.
+        
+        Args:
+            text (str): Full current input
+        
+        Returns:
+            int: Generation of the new input
+        """
+        self.tokenizer.update(text)
+        return self.cancel()
+    
+    def cancel(self):
+        """
+        Invalidate pending and running previews
+        
+        Returns:
+            int: New generation
+        """
+        with self._lock:
+            self._generation += 1
+            if self._future is not None:
+                self._future.cancel()
+                self._future = None
+            return self._generation
+    
+    def submit(self, callback):
+        """
+        Evaluate the current input in the background
+        
+        Unclosed parentheses are closed implicitly, so 'sin(30' previews
+        as sin(30). Input that ends mid-expression gives no preview.
+        
+        Args:
+            callback (callable): callback(generation, result) called on the
+                worker thread with the result string, or None when there is
+                no preview; skipped if the input changed meanwhile
+        """
+        tokens = self.tokenizer.completed_tokens()
+        text = self.tokenizer.text + ')' * self.tokenizer.depth
+        with self._lock:
+            generation = self._generation
+            if self._future is not None:
+                self._future.cancel()
+            self._future = self._executor.submit(self._evaluate, generation, text, tokens, callback)
+    
+    def _evaluate(self, generation, text, tokens, callback):
+        if generation != self._generation:
+            return
+        result = None
+        if tokens is not None:
+            try:
+                result = self.core.calculate_tokens(text, tokens)
+            except Exception:
+                result = None
+        if generation == self._generation:
+            callback(generation, result)
+    
+    def close(self):
+        """Stop the background evaluator"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
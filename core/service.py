@@ -0,0 +1,627 @@
+"""
+Calculator Network Service Module
+
+Serves calculations to many clients over TCP with asyncio, using line
+delimited JSON: each request is one JSON object on one line, answered by
+one JSON line, in order. Clients may send any number of requests before
+reading the responses (pipelining)::
+    
+    -> {"id": 1, "session": "alice", "op": "evaluate", "expression": "2^10"}
+    <- {"id": 1, "ok": true, "result": "1024"}
+    -> {"id": 2, "op": "frobnicate"}
+    <- {"id": 2, "ok": false, "error": "Unknown op 'frobnicate'"}
+
+Every session has its own calculator state (history, memory, angle mode,
+last result); requests without a "session" use one private to their
+connection. Named sessions outlive connections and are dropped after
+`idle_timeout` seconds without requests. All sessions share one compiled
+expression cache. Expressions estimated to compute integers larger than
+`offload_bits` are evaluated by worker processes (with a time budget), so
+the event loop keeps serving other clients meanwhile; the session's
+variables and functions go along with them. Expensive definitions are
+computed by a worker too, and the session adopts the values. Integer results with
+thousands of digits are answered in scientific notation unless the
+evaluate request sets "full_digits": true.
+
+Run a server with ``python -m core.service --port 8765``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+
+from .bignum import full_digits
+from .cache import LRUCache
+from .calculator_core import CalculatorCore
+from .cost import DEFAULT_COST_BUDGET, CostLimitError, estimate_peak_bits
+from .parser import parse
+from .worksheet import split_definition
+
+class ServiceError(Exception):
+    """Raised by ServiceClient when the service answers with an error"""
+
+class Session:
+    """State of one client session"""
+    __slots__ = ('key', 'name', 'core', 'last_used', 'busy')
+    
+    def __init__(self, key, name, core, now):
+        self.key = key  # Key in CalculatorService.sessions
+        self.name = name
+        self.core = core
+        self.last_used = now
+        self.busy = 0  # Requests of this session currently awaiting a worker
+
+class _Offloader:
+    """Feeds expensive expressions to a ParallelEvaluator in batches"""
+    
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self._pending = []  # (expression, future)
+        self._task = None
+    
+    async def evaluate(self, expression):
+        """
+        Evaluate on a worker process
+        
+        Returns:
+            Result string, or the exception describing the failure
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((expression, future))
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._drain())
+        return await future
+    
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                # Everything queued while the previous batch ran goes out together
+                batch, self._pending = self._pending, []
+                try:
+                    # map() blocks until the batch is done, so it runs on a thread
+                    results = await loop.run_in_executor(None, self.evaluator.map, [item[0] for item in batch])
+                except Exception as e:
+                    results = [e] * len(batch)
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._task = None
+    
+    def close(self):
+        self.evaluator.close()
+
+class CalculatorService:
+    """Line-delimited JSON calculator service with per-session state"""
+    
+    FAIR_SHARE = 32  # Requests served on one connection before yielding to others
+    
+    def __init__(self, host='127.0.0.1', port=0, idle_timeout=300.0, max_sessions=100_000,
+                 offload_bits=4096, offload_timeout=5.0, workers=None, cache_size=4096,
+                 history_size=CalculatorCore.HISTORY_LIMIT, cost_budget=DEFAULT_COST_BUDGET):
+        """
+        Initialize service (call start() or use ``async with`` to listen)
+        
+        Args:
+            host (str): Interface to listen on
+            port (int): TCP port (0 picks a free one, see `address`)
+            idle_timeout (float): Seconds after which an unused named session is dropped
+            max_sessions (int): Most sessions kept at once
+            offload_bits (float): Estimated size of the largest integer computed, in
+                bits, above which an expression is evaluated by a worker process
+            offload_timeout (float): Wall-clock seconds a worker may spend per expression
+            workers (int): Worker processes per angle mode (default: CPU count)
+            cache_size (int): Compiled expressions shared by all sessions
+            history_size (int): History records kept per session
+            cost_budget (CostBudget): Limits for rejecting expensive expressions
+        """
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.offload_bits = offload_bits
+        self.offload_timeout = offload_timeout
+        self.workers = workers
+        self.history_size = history_size
+        self.cost_budget = cost_budget
+        self.address = None  # (host, port) once listening
+        
+        # name -> Session for named sessions; ('connection', n) -> Session for
+        # the private one of each connection, which no request can name
+        self.sessions = {}
+        self._expression_cache = LRUCache(cache_size)  # Shared by every session's core
+        self._bits_cache = LRUCache(cache_size)  # expression -> estimated peak bits
+        self._offloaders = {}  # angle mode -> _Offloader, created on first use
+        self._connection_ids = itertools.count(1)
+        self._server = None
+        self._sweeper = None
+        self._connections = set()
+        
+        self.requests = 0  # Requests answered
+        self.offloaded = 0  # Expressions evaluated by worker processes
+        self.expired = 0  # Sessions dropped for being idle
+        
+        self._ops = {
+            'ping': self._op_ping,
+            'evaluate': self._op_evaluate,
+            'evaluate_many': self._op_evaluate_many,
+            'set_angle_mode': self._op_set_angle_mode,
+            'state': self._op_state,
+            'memory': self._op_memory,
+            'history': self._op_history,
+            'clear_history': self._op_clear_history,
+            'close_session': self._op_close_session,
+        }
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def start(self):
+        """
+        Start listening
+        
+        Returns:
+            CalculatorService: self
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.address = self._server.sockets[0].getsockname()[:2]
+        self._sweeper = asyncio.ensure_future(self._sweep_idle_sessions())
+        return self
+    
+    async def serve_forever(self):
+        """Serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+    
+    async def close(self):
+        """Stop listening, drop every connection and session, stop workers"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        for offloader in self._offloaders.values():
+            offloader.close()
+        self._offloaders.clear()
+        self.sessions.clear()
+    
+    def stats(self):
+        """
+        Get service counters
+        
+        Returns:
+            dict: sessions, connections, requests, offloaded, expired and the
+            shared cache statistics
+        """
+        return {
+            'sessions': len(self.sessions),
+            'connections': len(self._connections),
+            'requests': self.requests,
+            'offloaded': self.offloaded,
+            'expired': self.expired,
+            'cache': self._expression_cache.stats(),
+        }
+    
+    def _session(self, key):
+        """Get or create a session by name, or a connection's private session by its tuple key"""
+        now = asyncio.get_running_loop().time()
+        session = self.sessions.get(key)
+        if session is None:
+            if len(self.sessions) >= self.max_sessions:
+                raise ServiceError("Too many sessions")
+            core = CalculatorCore(
+                cost_budget=self.cost_budget,
+                history_size=self.history_size,
+                expression_cache=self._expression_cache
+            )
+            name = key if isinstance(key, str) else f"{key[0]}-{key[1]}"
+            session = self.sessions[key] = Session(key, name, core, now)
+        session.last_used = now
+        return session
+    
+    async def _sweep_idle_sessions(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(min(self.idle_timeout / 2, 60.0))
+            deadline = loop.time() - self.idle_timeout
+            # Private sessions live exactly as long as their connection
+            idle = [
+                key for key, session in self.sessions.items()
+                if isinstance(key, str) and session.last_used < deadline and not session.busy
+            ]
+            for key in idle:
+                del self.sessions[key]
+            self.expired += len(idle)
+    
+    async def _handle_connection(self, reader, writer):
+        self._connections.add(writer)
+        default_session = ('connection', next(self._connection_ids))
+        served = 0
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than the stream limit: the framing is lost
+                    writer.write(self._encode({'id': None, 'ok': False, 'error': "Request too long"}))
+                    break
+                if not line:
+                    break
+                if line.isspace():
+                    continue
+                response = await self._respond(line, default_session)
+                writer.write(self._encode(response))
+                # Only waits when the client is not reading its responses
+                await writer.drain()
+                served += 1
+                if not served % self.FAIR_SHARE:
+                    # Buffered requests never suspend readline(): let other connections run
+                    await asyncio.sleep(0)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            self.sessions.pop(default_session, None)
+            writer.close()
+    
+    @staticmethod
+    def _encode(response):
+        return (json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8')
+    
+    async def _respond(self, line, default_session):
+        """Turn one request line into its response object"""
+        self.requests += 1
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'id': None, 'ok': False, 'error': "Invalid JSON"}
+        if not isinstance(request, dict):
+            return {'id': None, 'ok': False, 'error': "Request must be a JSON object"}
+        
+        response = {'id': request.get('id')}
+        try:
+            op = self._ops.get(request.get('op'))
+            if op is None:
+                raise ServiceError(f"Unknown op {request.get('op')!r}")
+            name = request.get('session')
+            session = self._session(default_session if name is None else str(name))
+            response['ok'] = True
+            response.update(await op(session, request))
+        except Exception as e:
+            response['ok'] = False
+            response['error'] = str(e) or type(e).__name__
+        return response
+    
+    def _estimate_bits(self, expression, worksheet):
+        """
+        Estimated log2 size of the largest intermediate, cached per expression
+        text unless it uses the session's worksheet
+        
+        Raises:
+            CostLimitError: If the expression exceeds the cost budget
+        """
+        if worksheet:
+            tree = parse(expression.strip().replace('×', '*').replace('÷', '/'))
+            if tree is not None and worksheet.uses(tree):
+                # Depends on the current values of the session's variables
+                return worksheet.check_cost(tree)
+        bits = self._bits_cache.get(expression)
+        if bits is None:
+            tree = parse(expression.strip().replace('×', '*').replace('÷', '/'))
+            bits = 0.0
+            if tree is not None and self.cost_budget is not None:
+                bits = estimate_peak_bits(tree, self.cost_budget)
+            self._bits_cache.put(expression, bits)
+        return bits
+    
+    def _offloader(self, angle_mode):
+        offloader = self._offloaders.get(angle_mode)
+        if offloader is None:
+            from .parallel import ParallelEvaluator
+            evaluator = ParallelEvaluator(self.workers, self.offload_timeout, angle_mode, chunk_size=1)
+            offloader = self._offloaders[angle_mode] = _Offloader(evaluator)
+        return offloader
+    
+    def _definition_bits(self, definition, worksheet):
+        """
+        Estimated log2 size of the largest intermediate of a definition and
+        of the variables it updates (for their current inputs)
+        
+        Raises:
+            CostLimitError: If a variable's body exceeds the cost budget
+        """
+        name, params, body = definition
+        bits = 0.0 if params is not None else self._estimate_bits(body, worksheet)
+        cells = worksheet.cells
+        for dependent in worksheet.dependents_of(name):
+            cell = cells[dependent]
+            if cell.params is None and cell.compiled is not None:
+                try:
+                    bits = max(bits, worksheet.check_cost(cell.tree))
+                except CostLimitError:
+                    # The new definition may bring it within budget: a worker finds out
+                    return math.inf
+        return bits
+    
+    def _offloader(self, angle_mode):
+        offloader = self._offloaders.get(angle_mode)
+        if offloader is None:
+            from .parallel import ParallelEvaluator
+            evaluator = ParallelEvaluator(self.workers, self.offload_timeout, angle_mode, chunk_size=1,
+                                          cost_budget=self.cost_budget)
+            offloader = self._offloaders[angle_mode] = _Offloader(evaluator)
+        return offloader
+    
+    async def _evaluate(self, session, expression, full=False):
+        """
+        Evaluate for a session, on a worker process if it is expensive
+        
+        Definitions are applied to the session's worksheet; an expensive
+        one is computed by a worker first and its values adopted.
+        
+        Args:
+            full (bool): Answer with all digits of a big integer result
+                (history keeps the scientific notation)
+        
+        Returns:
+            str: Result, or None for empty input
+        """
+        if not isinstance(expression, str):
+            raise ServiceError("Expression must be a string")
+        core = session.core
+        worksheet = core.worksheet
+        normalized = expression.strip().replace('×', '*').replace('÷', '/')
+        definition = split_definition(normalized)
+        if definition is None:
+            bits = self._estimate_bits(expression, worksheet)
+        else:
+            bits = self._definition_bits(definition, worksheet)
+        
+        if bits <= self.offload_bits:
+            result = core.calculate(expression)
+            answer = full_digits(result) if full else result
+        else:
+            # Workers do not know the session's variables and functions
+            definitions = tuple(worksheet.definitions())
+            self.offloaded += 1
+            session.busy += 1
+            try:
+                outcome = await self._offloader(core.angle_mode).evaluate((definitions, normalized, full))
+            finally:
+                session.busy -= 1
+            if isinstance(outcome, Exception):
+                raise outcome
+            if definition is None:
+                result, answer = outcome if full else (outcome, outcome)
+            else:
+                values, answer = outcome if full else (outcome, None)
+                if tuple(worksheet.definitions()) != definitions:
+                    # Another request changed the worksheet meanwhile
+                    values = answer = None
+                result = core._define(*definition, values)
+                if answer is None:
+                    answer = full_digits(result) if full else result
+        if result is not None:
+            core.record(expression.strip(), result)
+        return answer
+    
+    async def _op_ping(self, session, request):
+        return {}
+    
+    async def _op_evaluate(self, session, request):
+        # Big integers are shown in scientific notation unless asked for
+        full = bool(request.get('full_digits'))
+        return {'result': await self._evaluate(session, request.get('expression'), full)}
+    
+    async def _op_evaluate_many(self, session, request):
+        results = []
+        for expression in request.get('expressions', ()):
+            try:
+                results.append({'result': await self._evaluate(session, expression)})
+            except Exception as e:
+                results.append({'error': str(e) or type(e).__name__})
+        return {'results': results}
+    
+    async def _op_set_angle_mode(self, session, request):
+        if not session.core.set_angle_mode(request.get('mode')):
+            raise ServiceError(f"Invalid angle mode {request.get('mode')!r}")
+        return {}
+    
+    async def _op_state(self, session, request):
+        core = session.core
+        return {
+            'session': session.name,
+            'angle_mode': core.get_angle_mode(),
+            'memory': core.memory,
+            'last_result': core.last_result,
+        }
+    
+    async def _op_memory(self, session, request):
+        core = session.core
+        action = request.get('action')
+        value = request.get('value')
+        if action == 'recall':
+            pass
+        elif action == 'clear':
+            core.memory_clear()
+        elif action in ('store', 'add', 'subtract'):
+            method = getattr(core, f"memory_{action}")
+            if not method(value):
+                raise ServiceError(f"Invalid memory value {value!r}")
+        else:
+            raise ServiceError(f"Unknown memory action {action!r}")
+        return {'memory': core.memory}
+    
+    async def _op_history(self, session, request):
+        limit = request.get('limit', session.core.history.capacity)
+        entries = session.core.get_history_page(0, int(limit))
+        return {'history': [
+            {'number': entry.number, 'timestamp': entry.timestamp,
+             'expression': entry.expression, 'result': entry.result}
+            for entry in entries
+        ]}
+    
+    async def _op_clear_history(self, session, request):
+        session.core.clear_history()
+        return {}
+    
+    async def _op_close_session(self, session, request):
+        self.sessions.pop(session.key, None)
+        return {}
+
+class ServiceClient:
+    """
+    Asyncio client for CalculatorService
+    
+    send() queues a request without waiting, so many requests can be in
+    flight on one connection; responses arrive in request order.
+    """
+    
+    def __init__(self, reader, writer, session=None):
+        self._reader = reader
+        self._writer = writer
+        self.session = session
+        self._ids = itertools.count(1)
+        self._waiting = []  # Futures of sent requests, oldest first
+        self._head = 0
+        self._receiver = asyncio.ensure_future(self._receive())
+    
+    @classmethod
+    async def connect(cls, host, port, session=None):
+        """
+        Open a connection
+        
+        Args:
+            host (str): Service host
+            port (int): Service port
+            session (str): Session used by every request (default: one per connection)
+        
+        Returns:
+            ServiceClient: Connected client
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, session)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _receive(self):
+        error = ConnectionError("Connection closed")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                future = self._waiting[self._head]
+                self._waiting[self._head] = None
+                self._head += 1
+                if self._head > 1024 and self._head * 2 > len(self._waiting):
+                    del self._waiting[:self._head]
+                    self._head = 0
+                if not future.cancelled():
+                    future.set_result(json.loads(line))
+        except Exception as e:
+            error = e
+        for future in self._waiting[self._head:]:
+            if not future.done():
+                future.set_exception(error)
+        self._waiting.clear()
+        self._head = 0
+    
+    def send(self, op, **fields):
+        """
+        Send a request without waiting for its response
+        
+        Args:
+            op (str): Operation name
+            **fields: Request fields
+        
+        Returns:
+            asyncio.Future: Resolves to the response object
+        """
+        request = {'id': next(self._ids), 'op': op}
+        if self.session is not None:
+            request['session'] = self.session
+        request.update(fields)
+        future = asyncio.get_running_loop().create_future()
+        if self._receiver.done():
+            future.set_exception(ConnectionError("Connection closed"))
+            return future
+        self._waiting.append(future)
+        self._writer.write((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        return future
+    
+    async def request(self, op, **fields):
+        """
+        Send a request and wait for its response
+        
+        Returns:
+            dict: Response fields
+        
+        Raises:
+            ServiceError: If the service reported an error
+        """
+        future = self.send(op, **fields)
+        await self._writer.drain()
+        response = await future
+        if not response.get('ok'):
+            raise ServiceError(response.get('error'))
+        return response
+    
+    async def evaluate(self, expression):
+        """
+        Evaluate an expression in this client's session
+        
+        Returns:
+            str: Result, or None for empty input
+        """
+        return (await self.request('evaluate', expression=expression))['result']
+    
+    async def close(self):
+        """Close the connection"""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._receiver
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m core.service', description="Run the calculator service.")
+    parser.add_argument('--host', default='127.0.0.1', help="interface to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help="seconds before an idle session is dropped")
+    parser.add_argument('--max-sessions', type=int, default=100_000, help="most sessions kept at once")
+    parser.add_argument('--workers', type=int, help="worker processes for expensive expressions")
+    args = parser.parse_args(argv)
+    
+    async def serve():
+        service = CalculatorService(
+            args.host, args.port, idle_timeout=args.idle_timeout,
+            max_sessions=args.max_sessions, workers=args.workers
+        )
+        async with service:
+            print(f"Serving on {service.address[0]}:{service.address[1]}", flush=True)
+            await service.serve_forever()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Thread-Safe Calculator Core Module
+
+CalculatorCore variant for embedding in multi-threaded programs. The
+evaluation path is pure: calculate() only reads the shared compiled
+expression cache, whose entries are immutable. The mutable state is
+kept in structures that threads update without contending:
+
+* history: per-thread buffers numbered by one atomic counter, merged on read
+* memory: a base value plus per-thread deltas, summed on read
+* last_result: per thread, so ANS refers to the calling thread's result
+
+The worksheet is the exception: definitions, and expressions reading
+them, run under one lock.
+"""
+
+import threading
+import weakref
+
+from .cache import SharedCache
+from .calculator_core import CalculatorCore
+from .compiler import CompiledExpression
+from .history import ConcurrentHistory, _Owner
+
+class _MemoryCell:
+    """Delta written only by its owner thread"""
+    __slots__ = ('state',)
+    
+    def __init__(self):
+        self.state = (-1, 0)  # (generation, delta), replaced as a whole
+
+class ThreadSafeMemory:
+    """
+    Memory register updated concurrently without lost updates
+    
+    add() only touches the calling thread's cell. store() and clear()
+    start a new generation, which makes every older delta obsolete. When
+    a thread finishes, its delta moves into the base and its cell is
+    dropped, so reading costs O(live threads).
+    """
+    
+    def __init__(self, value=0):
+        self._lock = threading.Lock()  # Guards _base, _generation and _cells
+        self._base = value
+        self._generation = 0
+        self._cells = set()
+        self._local = threading.local()
+    
+    def _cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = _MemoryCell()
+            with self._lock:
+                self._cells.add(cell)
+            # The thread-local values are dropped when the thread finishes
+            self._local.owner = _Owner()
+            weakref.finalize(self._local.owner, self._retire, cell)
+            return cell
+    
+    def _retire(self, cell):
+        """Fold the delta of a finished thread into the base"""
+        with self._lock:
+            generation, delta = cell.state
+            if generation == self._generation:
+                self._base += delta
+            self._cells.discard(cell)
+    
+    @property
+    def value(self):
+        """Current value: base plus this generation's deltas"""
+        with self._lock:
+            base, generation = self._base, self._generation
+            cells = list(self._cells)
+        for cell in cells:
+            cell_generation, delta = cell.state
+            if cell_generation == generation:
+                base += delta
+        return base
+    
+    def store(self, value):
+        """Replace the value"""
+        with self._lock:
+            self._base = value
+            self._generation += 1
+    
+    def add(self, value):
+        """Add to the value (use a negative value to subtract)"""
+        cell = self._cell()
+        generation = self._generation
+        cell_generation, delta = cell.state
+        if cell_generation != generation:
+            delta = 0
+        cell.state = (generation, delta + value)
+
+class ThreadSafeCalculatorCore(CalculatorCore):
+    """CalculatorCore whose methods may be called from many threads at once"""
+    
+    history_class = ConcurrentHistory
+    cache_class = SharedCache
+    
+    def __init__(self, *args, **kwargs):
+        """Same arguments as CalculatorCore"""
+        self._memory = ThreadSafeMemory()
+        self._local = threading.local()
+        self._worksheet_lock = threading.RLock()  # Guards the worksheet's cells
+        super().__init__(*args, **kwargs)
+    
+    @property
+    def memory(self):
+        """Memory value"""
+        return self._memory.value
+    
+    @memory.setter
+    def memory(self, value):
+        self._memory.store(value)
+    
+    @property
+    def last_result(self):
+        """Last result calculated by the calling thread"""
+        return getattr(self._local, 'last_result', None)
+    
+    @last_result.setter
+    def last_result(self, value):
+        self._local.last_result = value
+    
+    def memory_add(self, value):
+        """Add value to memory"""
+        try:
+            self._memory.add(float(value))
+            return True
+        except (ValueError, TypeError, ArithmeticError):
+            return False
+    
+    def memory_subtract(self, value):
+        """Subtract value from memory"""
+        try:
+            self._memory.add(-float(value))
+            return True
+        except (ValueError, TypeError, ArithmeticError):
+            return False
+    
+    def set_angle_mode(self, mode):
+        """Set angle mode (deg or rad)"""
+        with self._worksheet_lock:
+            return super().set_angle_mode(mode)
+    
+    def _compile_over_worksheet(self, tree, variables=(), bounds=None):
+        """Compile under the worksheet lock, and evaluate under it too"""
+        lock = self._worksheet_lock
+        with lock:
+            compiled = super()._compile_over_worksheet(tree, variables, bounds)
+        evaluate = compiled.evaluate
+        
+        def locked(env):
+            with lock:
+                return evaluate(env)
+        
+        return CompiledExpression(tree, compiled.variables, locked)
+    
+    def _define(self, name, params, body, values=None):
+        with self._worksheet_lock:
+            return super()._define(name, params, body, values)
+    
+    def undefine(self, name):
+        """Remove a variable or function"""
+        with self._worksheet_lock:
+            return super().undefine(name)
+    
+    def get_variables(self):
+        """Get the defined variables and functions"""
+        with self._worksheet_lock:
+            return super().get_variables()
+    
+    def export_state(self):
+        """Get the user-visible state"""
+        with self._worksheet_lock:
+            return super().export_state()
+    
+    def import_state(self, state):
+        """Take over state from export_state()"""
+        with self._worksheet_lock:
+            super().import_state(state)
\ No newline at end of file
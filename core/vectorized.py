@@ -0,0 +1,277 @@
+"""
+Vectorized Expression Evaluation Module
+
+Compiles an expression with free variables, e.g. ``sin(x)*x²+ln(y)``, into
+a function evaluated over whole arrays of variable values in one pass.
+Uses NumPy ufuncs when NumPy is installed and falls back to a pure-Python
+loop over the scalar compiler otherwise. Both compute in floats and give
+the same IEEE results where the calculator raises: ``x/0`` is ±inf,
+``ln(0)`` is -inf, ``sqrt(-1)`` is nan and ``10^400`` is inf.
+"""
+
+import math
+import operator
+
+from .compiler import BINARY_OPERATORS, CONSTANTS, FUNCTION_TABLES, compile_tree
+from .parser import ExpressionError, parse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+def _build_numpy_function_tables():
+    """
+    Build name -> (ufunc, arity) tables mirroring compiler.FUNCTION_TABLES
+    
+    Returns:
+        dict: angle mode -> function table
+    """
+    # Largest n with n! representable as a double
+    factorial_table = np.array([math.factorial(n) for n in range(171)], dtype=float)
+    
+    def factorial(x):
+        x = np.asarray(x, dtype=float)
+        out = np.full(x.shape, np.nan)
+        valid = (x >= 0) & (x == np.floor(x))
+        n = x[valid]
+        out[valid] = np.where(n <= 170, factorial_table[np.minimum(n, 170).astype(np.intp)], np.inf)
+        return out
+    
+    def cot(x):
+        return 1 / np.tan(x)
+    
+    trig = {'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'cot': cot}
+    inv_trig = {'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan}
+    other = {
+        'log': np.log10,
+        'ln': np.log,
+        'sqrt': np.sqrt,
+        'cbrt': np.cbrt,
+        'abs': np.abs,
+        'exp': np.exp,
+        'factorial': factorial,
+    }
+    
+    def degrees_in(func):
+        return lambda x: func(np.radians(x))
+    
+    def degrees_out(func):
+        return lambda x: np.degrees(func(x))
+    
+    tables = {}
+    for mode in FUNCTION_TABLES:
+        table = {}
+        for name, func in trig.items():
+            table[name] = (degrees_in(func) if mode == 'deg' else func, 1)
+        for name, func in inv_trig.items():
+            table[name] = (degrees_out(func) if mode == 'deg' else func, 1)
+        for name, func in other.items():
+            table[name] = (func, 1)
+        tables[mode] = table
+    return tables
+
+NUMPY_FUNCTION_TABLES = _build_numpy_function_tables() if HAS_NUMPY else None
+
+def _float_literal(node):
+    """Number literal as a float, ±inf when out of range (as NumPy converts it)"""
+    try:
+        return float(node.value)
+    except OverflowError:
+        return math.copysign(math.inf, node.value)
+
+def _numpy_literal(node):
+    """Number literal as a NumPy float, so folded constants overflow to inf too"""
+    return np.float64(_float_literal(node))
+
+def _odd(x):
+    return x.is_integer() and x % 2 == 1
+
+def _ieee_binary(func):
+    """Wrap a float operator to return NumPy's result where Python raises"""
+    def wrapped(a, b):
+        try:
+            return func(a, b)
+        except ZeroDivisionError:
+            if func is operator.mod or a == 0 or a != a:
+                return math.nan
+            return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return wrapped
+
+def _ieee_power(a, b):
+    try:
+        result = a ** b
+    except ZeroDivisionError:
+        # Zero to a negative power
+        return math.copysign(math.inf, a) if _odd(b) else math.inf
+    except OverflowError:
+        return -math.inf if a < 0 and _odd(b) else math.inf
+    # Negative base to a fractional power
+    return math.nan if isinstance(result, complex) else result
+
+def _ieee_function(func, pole=None):
+    """Wrap a math function to return NumPy's result where it raises"""
+    def wrapped(x):
+        try:
+            return func(x)
+        except OverflowError:
+            return math.inf
+        except (ValueError, ZeroDivisionError):
+            return pole(x) if pole is not None and x == 0 else math.nan
+    return wrapped
+
+def _ieee_factorial(x):
+    """Factorial as in the NumPy table: nan off the integers, inf past 170"""
+    if not x >= 0:
+        return math.nan
+    if x > 170:
+        return math.inf if x == math.inf or x.is_integer() else math.nan
+    if not x.is_integer():
+        return math.nan
+    return float(math.factorial(int(x)))
+
+def _build_python_function_tables():
+    """
+    Build the fallback's name -> (callable, arity) tables: the calculator's
+    functions, with NumPy's results instead of exceptions
+    
+    Returns:
+        dict: angle mode -> function table
+    """
+    poles = {
+        'log': lambda x: -math.inf,
+        'ln': lambda x: -math.inf,
+        'cot': lambda x: math.copysign(math.inf, x),
+    }
+    tables = {}
+    for mode, functions in FUNCTION_TABLES.items():
+        table = {name: (_ieee_function(func, poles.get(name)), arity) for name, (func, arity) in functions.items()}
+        table['factorial'] = (_ieee_factorial, 1)
+        tables[mode] = table
+    return tables
+
+PYTHON_FUNCTION_TABLES = _build_python_function_tables()
+PYTHON_OPERATORS = dict(BINARY_OPERATORS)
+PYTHON_OPERATORS.update({
+    '/': _ieee_binary(operator.truediv),
+    '//': _ieee_binary(operator.floordiv),
+    '%': _ieee_binary(operator.mod),
+    '^': _ieee_power,
+})
+
+class VectorizedExpression:
+    """Expression evaluated element-wise over arrays of variable values"""
+    
+    def __init__(self, expression, variables, angle_mode='deg', use_numpy=None):
+        """
+        Compile expression for array evaluation
+        
+        Args:
+            expression (str): Expression string
+            variables (tuple): Free variable names, in argument order
+            angle_mode (str): 'deg' or 'rad'
+            use_numpy (bool): Force or disable NumPy (default: use it when installed)
+        
+        Raises:
+            ExpressionError: If the expression is empty or malformed
+        """
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY
+        elif use_numpy and not HAS_NUMPY:
+            raise ImportError("NumPy is not installed")
+        
+        tree = parse(expression)
+        if tree is None:
+            raise ExpressionError("Empty expression")
+        
+        self.expression = expression
+        self.variables = tuple(variables)
+        self.angle_mode = angle_mode
+        self.use_numpy = use_numpy
+        if use_numpy:
+            # Constants are folded while compiling: silence warnings as evaluation does
+            with np.errstate(all='ignore'):
+                self.compiled = compile_tree(tree, NUMPY_FUNCTION_TABLES[angle_mode], CONSTANTS, self.variables,
+                                             _numpy_literal)
+        else:
+            self.compiled = compile_tree(tree, PYTHON_FUNCTION_TABLES[angle_mode], CONSTANTS, self.variables,
+                                         _float_literal, PYTHON_OPERATORS)
+    
+    def __call__(self, *columns):
+        """
+        Evaluate over columns of variable values
+        
+        Invalid points (domain errors, division by zero, overflow) yield
+        nan or inf instead of raising.
+        
+        Args:
+            *columns: One array-like per variable, broadcast together
+        
+        Returns:
+            numpy.ndarray of float, or list of float without NumPy
+        
+        Raises:
+            ValueError: If the columns cannot be broadcast together
+        """
+        if len(columns) != len(self.variables):
+            raise TypeError(f"expected {len(self.variables)} columns, got {len(columns)}")
+        if self.use_numpy:
+            return self._evaluate_numpy(columns)
+        return self._evaluate_python(columns)
+    
+    def _evaluate_numpy(self, columns):
+        arrays = tuple(np.asarray(column, dtype=float) for column in columns)
+        shape = np.broadcast_shapes(*(array.shape for array in arrays)) if arrays else ()
+        with np.errstate(all='ignore'):
+            result = np.asarray(self.compiled.evaluate(arrays), dtype=float)
+        if result.shape != shape:
+            # Constant sub-results (e.g. no variables) still yield one value per point
+            result = np.broadcast_to(result, shape).copy()
+        return result
+    
+    def _evaluate_python(self, columns):
+        evaluate = self.compiled.evaluate
+        columns = [_python_column(column) for column in columns]
+        # Broadcast as NumPy does in one dimension: length-1 columns repeat
+        lengths = {len(column) for column in columns} - {1}
+        if len(lengths) > 1:
+            raise ValueError(f"columns of lengths {sorted(lengths)} cannot be broadcast together")
+        length = lengths.pop() if lengths else 1
+        columns = [column * length if len(column) == 1 else column for column in columns]
+        if not columns:
+            return [_evaluate_point(evaluate, ())]
+        return [_evaluate_point(evaluate, values) for values in zip(*columns)]
+
+def _python_column(column):
+    """Column as a list of floats; scalars become one-element columns"""
+    if isinstance(column, (str, bytes)) or not hasattr(column, '__iter__'):
+        return [float(column)]
+    return list(map(float, column))
+
+def _evaluate_point(evaluate, env):
+    """Evaluate one point, mapping errors left over to nan/inf like NumPy does"""
+    try:
+        return float(evaluate(env))
+    except ZeroDivisionError:
+        return math.nan
+    except OverflowError:
+        return math.inf
+    except (ValueError, TypeError):
+        return math.nan
+
+def compile_vectorized(expression, variables, angle_mode='deg', use_numpy=None):
+    """
+    Compile expression into a function over arrays of variable values
+    
+    Args:
+        expression (str): Expression string, e.g. 'sin(x)*x²+ln(y)'
+        variables (tuple): Free variable names, in argument order
+        angle_mode (str): 'deg' or 'rad'
+        use_numpy (bool): Force or disable NumPy (default: use it when installed)
+    
+    Returns:
+        VectorizedExpression: Callable taking one column per variable
+    """
+    return VectorizedExpression(expression, variables, angle_mode, use_numpy)
\ No newline at end of file
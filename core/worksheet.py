@@ -0,0 +1,477 @@
+"""
+Worksheet Module
+
+Named variables and user-defined functions::
+    
+    a = 3
+    f(x) = sin(x)*x²
+    b = f(a)+1
+
+Every definition is compiled once and kept in a dependency graph, like
+the cells of a spreadsheet. Redefining a name re-evaluates only the cells
+that depend on it, each once, in topological order; a definition that
+would make a cycle (including a recursive function) is rejected.
+Cells are evaluated like float mode input (integer results stay exact),
+in the angle mode of the function table.
+
+With a cost budget, every evaluation is first checked by the static
+cost estimator, with variables bounded by their current values and user
+functions estimated at each call site for the bounds of the arguments:
+``b = 9`` makes ``9^9^b`` as expensive as ``9^9^9``, and ``f(x) = x^x``
+is only rejected once called as ``f(100000)``.
+"""
+
+import re
+
+from .compiler import CONSTANTS, CompiledExpression, _children, compile_tree
+from .cost import _FLOAT_BITS, estimate_peak_bits, value_bound
+from .parser import Call, ExpressionError, Name, parse
+
+# name = body, or name(param, ...) = body; '==' is not a definition
+DEFINITION_PATTERN = re.compile(
+    r"\s*([A-Za-z_][A-Za-z_0-9]*)\s*"
+    r"(?:\(\s*((?:[A-Za-z_][A-Za-z_0-9]*(?:\s*,\s*[A-Za-z_][A-Za-z_0-9]*)*)?)\s*\))?"
+    r"\s*=(?!=)(.*)\Z",
+    re.DOTALL,
+)
+
+def split_definition(text):
+    """
+    Recognize a definition
+    
+    Args:
+        text (str): Calculator input
+    
+    Returns:
+        tuple: (name, parameter names or None for a variable, body text),
+        or None if the text is not a definition
+    """
+    if '=' not in text:
+        return None
+    match = DEFINITION_PATTERN.match(text)
+    if match is None:
+        return None
+    name, params, body = match.groups()
+    if params is not None:
+        params = tuple(param.strip() for param in params.split(',')) if params.strip() else ()
+    return name, params, body.strip()
+
+def _arity(params):
+    return None if params is None else len(params)
+
+class Cell:
+    """One definition: a variable with its value, or a function"""
+    __slots__ = ('name', 'params', 'body', 'tree', 'variables', 'functions', 'compiled', 'value', 'error')
+    
+    def __init__(self, name, params, body, tree, variables, functions):
+        self.name = name
+        self.params = params  # Parameter names, or None for a variable
+        self.body = body
+        self.tree = tree
+        self.variables = variables  # Variables read, in slot order after the parameters
+        self.functions = functions  # User functions called
+        self.compiled = None
+        self.value = None
+        self.error = None  # Exception raised by compiling or evaluating, if any
+    
+    @property
+    def references(self):
+        """Names of the cells this one depends on"""
+        return self.variables + self.functions
+    
+    @property
+    def text(self):
+        """Definition as entered, normalized"""
+        if self.params is None:
+            return f"{self.name} = {self.body}"
+        return f"{self.name}({', '.join(self.params)}) = {self.body}"
+    
+    def __repr__(self):
+        return f"Cell({self.text!r}, value={self.value!r}, error={self.error!r})"
+
+class _ValueBounds:
+    """Cost estimator view of the cells: bounds of the current variable values"""
+    __slots__ = ('cells', 'overrides')
+    
+    def __init__(self, cells, overrides):
+        self.cells = cells
+        self.overrides = overrides  # Free variables shadowing the cells
+    
+    def get(self, name):
+        if self.overrides and name in self.overrides:
+            return self.overrides[name]
+        cell = self.cells.get(name)
+        if cell is None or cell.params is not None or cell.error is not None:
+            return None
+        return value_bound(cell.value)
+
+class _FunctionBodies:
+    """Cost estimator view of the cells: parameters and body of user functions"""
+    __slots__ = ('cells',)
+    
+    def __init__(self, cells):
+        self.cells = cells
+    
+    def get(self, name):
+        cell = self.cells.get(name)
+        if cell is None or cell.params is None:
+            return None
+        return cell.params, cell.tree
+
+class Worksheet:
+    """Variables and user functions with incremental recomputation"""
+    
+    def __init__(self, functions, constants=CONSTANTS, cost_budget=None):
+        """
+        Args:
+            functions (dict): Built-in name -> (callable, arity) function table
+            constants (dict): Built-in name -> value constants
+            cost_budget (CostBudget): Limits checked before every evaluation
+                (None disables the check)
+        """
+        self.functions = functions
+        self.constants = constants
+        self.cost_budget = cost_budget
+        self.cells = {}  # name -> Cell
+        self.dependents = {}  # name -> names of the cells referencing it
+        self.evaluations = 0  # Variable evaluations so far, to check recomputation stays incremental
+        self._callers = {}  # function name -> (callable, arity) entry for compiled code
+    
+    def __contains__(self, name):
+        return name in self.cells
+    
+    def __len__(self):
+        return len(self.cells)
+    
+    def __iter__(self):
+        """Cells in dependency order"""
+        cells = self.cells
+        return (cells[name] for name in self._order(list(cells)))
+    
+    def define(self, name, params, body, values=None):
+        """
+        Define or redefine a variable or function, then update its dependents
+        
+        Args:
+            name (str): Variable or function name
+            params (tuple): Parameter names, or None to define a variable
+            body (str): Expression text
+            values (dict): name -> (value, error) of updated variables
+                computed elsewhere (e.g. by a worker process applying the
+                same definition to a copy); these are taken as is
+        
+        Returns:
+            list: Names of the cells updated, the defined one first, in
+            the order they were updated
+        
+        Raises:
+            ExpressionError: For a malformed body, reserved or unknown names,
+                or a cycle; the worksheet is left unchanged
+            CostLimitError: If a variable's body exceeds the cost budget for
+                the current values; the worksheet is left unchanged
+        """
+        if name in self.functions or name in self.constants:
+            raise ExpressionError(f"Cannot redefine built-in {name!r}")
+        if params is not None:
+            for index, param in enumerate(params):
+                if param in self.functions or param in self.constants:
+                    raise ExpressionError(f"Parameter {param!r} shadows a built-in")
+                if param in params[:index]:
+                    raise ExpressionError(f"Duplicate parameter {param!r}")
+        tree = parse(body)
+        if tree is None:
+            raise ExpressionError(f"Empty definition of {name!r}")
+        variables, functions = self._references(tree, params or ())
+        if name in variables or name in functions or self._reaches(name, variables + functions):
+            raise ExpressionError(f"Circular definition of {name!r}")
+        if params is None:
+            # Function bodies are checked where they are called, once the
+            # arguments are known
+            self.check_cost(tree)
+        
+        cell = Cell(name, params, body, tree, variables, functions)
+        cell.compiled = self._compile(tree, (params or ()) + variables, functions)
+        old = self.cells.get(name)
+        if old is not None:
+            for reference in old.references:
+                self.dependents[reference].discard(name)
+        for reference in cell.references:
+            self.dependents.setdefault(reference, set()).add(name)
+        self.cells[name] = cell
+        if params is None:
+            self._callers.pop(name, None)
+        else:
+            caller = self._callers.get(name)
+            self._callers[name] = (caller[0] if caller else self._caller(name), len(params))
+        
+        # Dependents call functions through _callers, which run the current
+        # definition; they only need recompiling when the kind of the name
+        # or the arity changed
+        recompile = old is not None and _arity(old.params) != _arity(params)
+        return self._update(self._order([name]), recompile, values)
+    
+    def undefine(self, name):
+        """
+        Remove a variable or function no other definition uses
+        
+        Raises:
+            ExpressionError: If the name is not defined or still used
+        """
+        cell = self.cells.get(name)
+        if cell is None:
+            raise ExpressionError(f"Unknown name {name!r}")
+        users = self.dependents.get(name)
+        if users:
+            raise ExpressionError(f"{name!r} is used by {', '.join(sorted(users))}")
+        for reference in cell.references:
+            self.dependents[reference].discard(name)
+        self.dependents.pop(name, None)
+        self._callers.pop(name, None)
+        del self.cells[name]
+    
+    def dependents_of(self, name):
+        """Names of the cells using name, directly or not, in update order"""
+        return self._order([name])[1:]
+    
+    def set_functions(self, functions):
+        """
+        Switch to another built-in function table (e.g. on an angle mode
+        change), recompiling and re-evaluating every cell
+        """
+        self.functions = functions
+        self._update(self._order(list(self.cells)), recompile=True)
+    
+    def value(self, name):
+        """
+        Get the value of a variable
+        
+        Raises:
+            ExpressionError: If the name is not a defined variable
+            Exception: Whatever evaluating its definition raised
+        """
+        cell = self.cells.get(name)
+        if cell is None or cell.params is not None:
+            raise ExpressionError(f"Unknown variable {name!r}")
+        if cell.error is not None:
+            raise cell.error
+        return cell.value
+    
+    def definitions(self):
+        """
+        Get all definitions in an order they can be entered again
+        
+        Returns:
+            list: Definition texts, each after the definitions it uses
+        """
+        return [cell.text for cell in self]
+    
+    def uses(self, tree):
+        """Whether an expression tree mentions any defined name"""
+        cells = self.cells
+        if not cells:
+            return False
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (Name, Call)) and node.name in cells:
+                return True
+            stack.extend(_children(node))
+        return False
+    
+    def check_cost(self, tree, bounds=None):
+        """
+        Check an expression against the cost budget for the current values
+        
+        Args:
+            tree: Expression tree root node
+            bounds (dict): Free variable name -> (log2 bound, is exact int),
+                shadowing worksheet variables of the same name
+        
+        Returns:
+            float: Upper bound on log2 of the largest exact integer computed
+            (0.0 without a cost budget)
+        
+        Raises:
+            CostLimitError: If any limit would be exceeded
+        """
+        if self.cost_budget is None:
+            return 0.0
+        cells = self.cells
+        return estimate_peak_bits(tree, self.cost_budget, names=_ValueBounds(cells, bounds),
+                                  functions=_FunctionBodies(cells))
+    
+    def compile(self, tree, variables=(), bounds=None):
+        """
+        Compile an expression over the worksheet, reading the current values
+        of its variables whenever it is evaluated
+        
+        The cost check is done for the current values, so the result is
+        meant to be evaluated right away (or, like in the numerics
+        module, while the worksheet does not change).
+        
+        Args:
+            tree: Expression tree root node
+            variables (tuple): Free variable names, in argument order; they
+                shadow worksheet variables of the same name
+            bounds (dict): Free variable name -> (log2 bound, is exact int)
+                for the cost check; free variables default to any float
+        
+        Returns:
+            CompiledExpression: Taking values for `variables`
+        
+        Raises:
+            ExpressionError: For unknown names or wrong arity
+            CostLimitError: If the expression exceeds the cost budget
+        """
+        variables = tuple(variables)
+        names, functions = self._references(tree, variables)
+        free = dict.fromkeys(variables, (_FLOAT_BITS, False))
+        free.update(bounds or ())
+        self.check_cost(tree, free)
+        compiled = self._compile(tree, variables + names, functions)
+        inputs = self._inputs
+        evaluate = compiled.evaluate
+        return CompiledExpression(tree, variables, lambda env: evaluate(env + inputs(names)))
+    
+    def _references(self, tree, params):
+        """
+        Collect the variables and user functions an expression uses
+        
+        Returns:
+            tuple: (variable names, function names), each sorted
+        
+        Raises:
+            ExpressionError: For names that are neither built in nor defined
+                as the right kind
+        """
+        cells = self.cells
+        variables, functions = set(), set()
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Name):
+                name = node.name
+                if name in params or name in self.constants:
+                    continue
+                cell = cells.get(name)
+                if cell is None or cell.params is not None:
+                    raise ExpressionError(f"Unknown name {name!r}")
+                variables.add(name)
+            elif isinstance(node, Call):
+                name = node.name
+                if name not in self.functions:
+                    cell = cells.get(name)
+                    if cell is None or cell.params is None:
+                        raise ExpressionError(f"Unknown function {name!r}")
+                    functions.add(name)
+            stack.extend(_children(node))
+        return tuple(sorted(variables)), tuple(sorted(functions))
+    
+    def _reaches(self, name, references):
+        """Whether any of the references depends on name, directly or not"""
+        if not references:
+            return False
+        references = set(references)
+        seen = {name}
+        stack = [name]
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent in references:
+                    return True
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return False
+    
+    def _order(self, names):
+        """
+        The given cells and everything depending on them, in topological order
+        
+        Reverse postorder of a depth-first search over the dependents,
+        without recursion so long chains of definitions work.
+        """
+        dependents = self.dependents
+        order = []
+        visited = set()
+        for root in names:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [(root, iter(dependents.get(root, ())))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if child not in visited:
+                        visited.add(child)
+                        stack.append((child, iter(dependents.get(child, ()))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(node)
+        order.reverse()
+        return order
+    
+    def _update(self, order, recompile, values=None):
+        """
+        Re-evaluate cells in topological order, recompiling them first if
+        asked; variables in `values` take their (value, error) from it
+        """
+        cells = self.cells
+        inputs = self._inputs
+        for name in order:
+            cell = cells[name]
+            if recompile:
+                try:
+                    # A referenced name may have changed kind; the set of
+                    # names, and so the graph edges, stay the same
+                    variables, functions = self._references(cell.tree, cell.params or ())
+                    cell.compiled = self._compile(cell.tree, (cell.params or ()) + variables, functions)
+                    cell.variables, cell.functions, cell.error = variables, functions, None
+                except ExpressionError as error:
+                    cell.compiled, cell.value, cell.error = None, None, error
+                    continue
+            if cell.params is not None or cell.compiled is None:
+                continue
+            if values and name in values:
+                cell.value, cell.error = values[name]
+                continue
+            self.evaluations += 1
+            try:
+                self.check_cost(cell.tree)
+                cell.value, cell.error = cell.compiled.evaluate(inputs(cell.variables)), None
+            except Exception as error:
+                cell.value, cell.error = None, error
+        return order
+    
+    def _compile(self, tree, slots, functions):
+        """Compile a tree with the given slot variables and user functions available"""
+        table = self.functions
+        if functions:
+            table = dict(table)
+            table.update((name, self._callers[name]) for name in functions)
+        # Calls of user functions must run each time: their definitions may change
+        return compile_tree(tree, table, self.constants, slots, optimize=not functions)
+    
+    def _inputs(self, variables):
+        """Current values of variables, as an environment tuple"""
+        cells = self.cells
+        values = []
+        for name in variables:
+            cell = cells[name]
+            if cell.error is not None or cell.compiled is None:
+                raise ExpressionError(f"{name!r} has no value: {cell.error}")
+            values.append(cell.value)
+        return tuple(values)
+    
+    def _caller(self, name):
+        """Callable running the current definition of a user function"""
+        cells = self.cells
+        inputs = self._inputs
+        
+        def call(*args):
+            cell = cells[name]
+            if cell.compiled is None:
+                raise ExpressionError(f"{name}() has no valid definition: {cell.error}")
+            return cell.compiled.evaluate(args + inputs(cell.variables))
+        
+        return call
\ No newline at end of file
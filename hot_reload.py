@@ -1,33 +1,71 @@
 """
-热重载启动器 - 使用watchdog监控文件变化自动重启应用
+热重载启动器 - 监控文件变化自动重载应用
+
+    python hot_reload.py            进程内重载（默认）：在运行中的应用里只重新加载改动的
+                                    core/utils/ui 模块及依赖它们的模块，再重建界面；
+                                    历史记录、内存、角度模式和输入内容都会保留
+    python hot_reload.py --restart  重启模式：任何 .py 文件变化都重启整个应用进程
+
+短时间内连续的文件事件（如编辑器保存多个文件）会合并为一次重载。
 """
 
+import ast
+import importlib
+import importlib.util
 import os
 import sys
+import threading
 import time
+import traceback
+import types
 import subprocess
 import signal
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 
-class CodeChangeHandler(FileSystemEventHandler):
-    def __init__(self, restart_callback):
-        self.restart_callback = restart_callback
-        self.last_restart = 0
-        self.restart_delay = 1  # 防抖延迟（秒）
+class CodeChangeHandler:
+    """
+    watchdog事件处理器（只需实现dispatch，不必在导入时加载watchdog）
+    
+    事件不会被丢弃：变化的文件先收集起来，最后一个事件之后安静
+    restart_delay 秒，poll() 才把它们一次性交给回调。
+    """
+    
+    def __init__(self, restart_callback, delay=0.3):
+        self.restart_callback = restart_callback  # 以变化文件路径的集合调用
+        self.restart_delay = delay  # 合并窗口（秒）
+        self._pending = set()
+        self._deadline = 0
+        self._lock = threading.Lock()  # watchdog在自己的线程里分发事件
         
+    def dispatch(self, event):
+        if event.event_type in ('modified', 'created', 'moved'):
+            self.on_modified(event)
+            
     def on_modified(self, event):
         if event.is_directory:
             return
-            
-        # 只监控.py文件
-        if event.src_path.endswith('.py'):
-            current_time = time.time()
-            # 防抖处理，避免频繁重启
-            if current_time - self.last_restart > self.restart_delay:
-                print(f"\n🔍 检测到文件变化: {os.path.basename(event.src_path)}")
-                self.last_restart = current_time
-                self.restart_callback()
+        # 编辑器常先写临时文件再改名，以改名后的路径为准
+        self.add(getattr(event, 'dest_path', '') or event.src_path)
+    
+    def add(self, path):
+        """记录一个变化的文件（只监控.py文件）"""
+        if path.endswith('.py'):
+            with self._lock:
+                self._pending.add(os.path.abspath(path))
+                self._deadline = time.monotonic() + self.restart_delay
+    
+    def poll(self):
+        """
+        合并窗口结束后触发一次回调（由主线程定期调用）
+        
+        Returns:
+            bool: 是否触发了回调
+        """
+        with self._lock:
+            if not self._pending or time.monotonic() < self._deadline:
+                return False
+            paths, self._pending = self._pending, set()
+        self.restart_callback(paths)
+        return True
 
 class HotReloader:
     def __init__(self):
@@ -43,7 +81,7 @@ class HotReloader:
             self.process.wait()
             
         print("🚀 启动应用程序...")
-        self.process = subprocess.Popen([sys.executable, 'main.py'])
+        self.process = subprocess.Popen([sys.executable, 'main.py'] + sys.argv[1:])
         
     def stop_application(self):
         """停止应用程序"""
@@ -52,8 +90,10 @@ class HotReloader:
             self.process.terminate()
             self.process.wait()
             
-    def restart_application(self):
+    def restart_application(self, paths=()):
         """重启应用程序"""
+        names = ', '.join(sorted(os.path.basename(path) for path in paths))
+        print(f"\n🔍 检测到文件变化: {names}")
         self.stop_application()
         self.start_application()
         
@@ -64,6 +104,9 @@ class HotReloader:
         print("支持的文件类型: .py")
         print("按 Ctrl+C 停止监控")
         
+        # 用到时才导入watchdog
+        from watchdog.observers import Observer
+        
         event_handler = CodeChangeHandler(self.restart_application)
         self.observer = Observer()
         self.observer.schedule(event_handler, '.', recursive=True)
@@ -74,7 +117,8 @@ class HotReloader:
         
         try:
             while self.running:
-                time.sleep(1)
+                time.sleep(0.1)
+                event_handler.poll()
         except KeyboardInterrupt:
             print("\n👋 停止监控...")
         finally:
@@ -88,11 +132,269 @@ class HotReloader:
             self.observer.join()
         self.stop_application()
 
+def _top_level_imports(module):
+    """模块顶层（不含函数体内）import 语句导入的模块名"""
+    try:
+        with open(module.__file__, encoding='utf-8') as file:
+            tree = ast.parse(file.read())
+    except (OSError, SyntaxError, TypeError, ValueError):
+        return set()
+    package = module.__name__ if hasattr(module, '__path__') else module.__name__.rpartition('.')[0]
+    names = set()
+    statements = list(tree.body)
+    while statements:
+        node = statements.pop()
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name('.' * node.level + (node.module or ''), package)
+            names.add(base)
+            # from . import x 也可能导入子模块
+            names.update(f"{base}.{alias.name}" for alias in node.names)
+        elif isinstance(node, (ast.If, ast.Try)):
+            for field in ('body', 'orelse', 'finalbody', 'handlers'):
+                statements.extend(getattr(node, field, ()))
+        elif isinstance(node, ast.ExceptHandler):
+            statements.extend(node.body)
+    return names
+
+def _module_dependencies(module, modules):
+    """
+    模块依赖的其他应用模块
+    
+    包括顶层 import 的模块，以及全局变量引用的模块、函数、类及其实例所属的模块
+    （函数体内的 import 在调用时才执行，自然拿到新模块，不算依赖）。
+    """
+    dependencies = set(_top_level_imports(module))
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            dependencies.add(value.__name__)
+        else:
+            dependencies.add(getattr(value, '__module__', None))
+    dependencies.discard(module.__name__)
+    return dependencies & modules.keys()
+
+def reload_order(changed, packages):
+    """
+    需要重新加载的模块，按依赖顺序排列
+    
+    除了改动的模块，所有直接或间接引用它们的模块也要重新加载，
+    否则会继续使用旧的函数和类；被依赖的模块排在前面。
+    
+    Args:
+        changed (set): 改动的模块名
+        packages (tuple): 应用的顶层包名
+    
+    Returns:
+        list: 模块名
+    """
+    modules = {name: module for name, module in list(sys.modules.items())
+               if module is not None and name.split('.')[0] in packages}
+    dependencies = {name: _module_dependencies(module, modules) for name, module in modules.items()}
+    dependents = {name: set() for name in modules}
+    for name, required in dependencies.items():
+        for dependency in required:
+            dependents[dependency].add(name)
+    
+    affected = set()
+    stack = [name for name in changed if name in modules]
+    while stack:
+        name = stack.pop()
+        if name not in affected:
+            affected.add(name)
+            stack.extend(dependents[name])
+    
+    order = []
+    visited = set()
+    
+    def visit(name):
+        if name in visited:
+            return
+        visited.add(name)
+        for dependency in sorted(dependencies[name] & affected):
+            visit(dependency)
+        order.append(name)
+    
+    for name in sorted(affected):
+        visit(name)
+    return order
+
+class InProcessReloader:
+    """进程内热重载：重新加载改动的模块并重建界面，计算器状态搬到新界面上"""
+    
+    PACKAGES = ('core', 'utils', 'ui')  # 可在进程内重载的包
+    POLL_INTERVAL = 0.1  # 主线程检查文件变化的间隔（秒）
+    
+    def __init__(self, app, root='.'):
+        self.app = app
+        self.root = os.path.abspath(root)
+        self.handler = CodeChangeHandler(self.reload)
+        self.observer = None
+        self._mtimes = None  # 未安装watchdog时轮询用的文件修改时间
+        self._reload_started = None
+    
+    def start(self):
+        """开始监控（应用启动后在主线程调用）"""
+        from kivy.clock import Clock
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            print(f"⚠️ 未安装watchdog，改为每 {self.POLL_INTERVAL} 秒检查一次文件修改时间")
+            self._mtimes = self._scan()
+        else:
+            self.observer = Observer()
+            for package in self.PACKAGES:
+                self.observer.schedule(self.handler, os.path.join(self.root, package), recursive=True)
+            # 根目录下的文件（如main.py）只能提示需要重启
+            self.observer.schedule(self.handler, self.root, recursive=False)
+            self.observer.start()
+        Clock.schedule_interval(self._tick, self.POLL_INTERVAL)
+        print("👀 开始监控 core/ utils/ ui/ 的文件变化（进程内重载）")
+    
+    def stop(self):
+        """停止监控"""
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+    
+    def _scan(self):
+        """各监控目录下.py文件的修改时间"""
+        mtimes = {}
+        directories = [(self.root, False)] + [(os.path.join(self.root, package), True) for package in self.PACKAGES]
+        for top, recursive in directories:
+            for directory, subdirectories, files in os.walk(top):
+                for name in files:
+                    if name.endswith('.py'):
+                        path = os.path.join(directory, name)
+                        try:
+                            mtimes[path] = os.stat(path).st_mtime_ns
+                        except OSError:
+                            pass
+                if not recursive:
+                    break
+                subdirectories[:] = [name for name in subdirectories if name != '__pycache__']
+        return mtimes
+    
+    def _tick(self, dt):
+        if self._mtimes is not None:
+            mtimes = self._scan()
+            for path, mtime in mtimes.items():
+                if self._mtimes.get(path) != mtime:
+                    self.handler.add(path)
+            self._mtimes = mtimes
+        self.handler.poll()
+    
+    def _module_name(self, path):
+        """
+        文件对应的模块名
+        
+        Returns:
+            str: 模块名；不在可重载的包里时返回 None
+        """
+        parts = os.path.relpath(path, self.root).split(os.sep)
+        if len(parts) < 2 or parts[0] not in self.PACKAGES:
+            return None
+        parts[-1] = parts[-1][:-len('.py')]
+        if parts[-1] == '__init__':
+            parts.pop()
+        return '.'.join(parts)
+    
+    def reload(self, paths):
+        """
+        重新加载改动的模块并重建界面
+        
+        重载失败（如语法错误）时保留当前界面，修正后再次保存即可重试。
+        
+        Args:
+            paths (set): 变化的文件路径
+        """
+        self._reload_started = time.perf_counter()
+        changed = set()
+        for path in sorted(paths):
+            name = self._module_name(path)
+            if name is None:
+                print(f"⚠️ {os.path.relpath(path, self.root)} 的改动需要重启应用（python hot_reload.py --restart）")
+            elif name in sys.modules:
+                changed.add(name)  # 尚未导入的模块在用到时自然加载新代码
+        if not changed:
+            return
+        
+        order = reload_order(changed, self.PACKAGES)
+        print(f"\n♻️ 重新加载: {', '.join(order)}")
+        try:
+            for name in order:
+                self._forget_widget_classes(sys.modules[name])
+                importlib.reload(sys.modules[name])
+            self._rebuild()
+        except Exception:
+            traceback.print_exc()
+            print("❌ 重载失败，保留当前界面；修正后保存即可重试")
+    
+    @staticmethod
+    def _forget_widget_classes(module):
+        """从Kivy的Factory注销模块定义的控件类，以便注册新版本"""
+        from kivy.factory import Factory
+        from kivy.uix.widget import Widget
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, Widget)
+                    and value.__module__ == module.__name__):
+                Factory.unregister(value.__name__)
+    
+    def _rebuild(self):
+        """用新的类重建界面，把计算器状态和输入内容搬过去"""
+        from kivy.core.window import Window
+        ThreadSafeCalculatorCore = sys.modules['core.threadsafe'].ThreadSafeCalculatorCore
+        CalculatorWidget = sys.modules['ui.calculator_ui'].CalculatorWidget
+        
+        old = self.app.root
+        core = ThreadSafeCalculatorCore(history_size=old.core.history.capacity)
+        core.import_state(old.core.export_state())
+        widget = CalculatorWidget(
+            core=core,
+            live_preview=old.live_preview,
+            debug_overlay=old.debug_label is not None
+        )
+        widget.solution.text = old.solution.text
+        
+        old.close()
+        Window.remove_widget(old)
+        Window.add_widget(widget)
+        self.app.root = widget
+        Window.bind(on_flip=self._on_first_frame)
+    
+    def _on_first_frame(self, window):
+        """新界面画出第一帧：报告从检测到改动到可交互的时间"""
+        window.unbind(on_flip=self._on_first_frame)
+        elapsed = time.perf_counter() - self._reload_started
+        print(f"✅ 重载完成，{elapsed * 1000:.0f} ms 后可交互")
+
+def run_in_process():
+    """在当前进程里运行应用并进程内热重载"""
+    import main as app_main
+    
+    app = app_main.CalculatorApp()
+    reloader = InProcessReloader(app)
+    app.bind(on_start=lambda instance: reloader.start())
+    try:
+        app.run()
+    finally:
+        reloader.stop()
+
 def main():
     """主函数"""
+    # 先取出自己的参数，其余的交给应用（Kivy导入时会解析命令行）
+    restart = '--restart' in sys.argv[1:]
+    if restart:
+        sys.argv.remove('--restart')
+    
     print("🔥 SciCalc Pro 热重载模式")
     print("=" * 40)
     
+    if not restart:
+        run_in_process()
+        return
+    
     # 检查是否安装了watchdog
     try:
         import watchdog
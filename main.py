@@ -1,14 +1,32 @@
 """
 SciCalc Pro - Scientific Calculator
 Modular Main Program Entry
+
+    python main.py            start the calculator window
+    python main.py --batch    evaluate expressions from stdin without the GUI
+                              (see python -m core --help for options)
+    python main.py --debug-overlay
+                              show per-stage evaluation timings in the window
 """
 
+import sys
+
+if __name__ == "__main__" and "--batch" in sys.argv[1:]:
+    # Headless mode: leave before anything imports Kivy
+    from core.cli import main
+    sys.exit(main([arg for arg in sys.argv[1:] if arg != "--batch"]))
+
+# Our own flag: take it out before Kivy parses the command line
+DEBUG_OVERLAY = "--debug-overlay" in sys.argv[1:]
+if DEBUG_OVERLAY:
+    sys.argv.remove("--debug-overlay")
+
 from kivy.app import App
 from ui.calculator_ui import CalculatorWidget
 
 class CalculatorApp(App):
     def build(self):
-        return CalculatorWidget()
+        return CalculatorWidget(debug_overlay=DEBUG_OVERLAY)
 
 if __name__ == "__main__":
     app = CalculatorApp()
@@ -0,0 +1,3 @@
+"""
+tests包初始化文件
+"""
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Tests for the bulk result helpers
+
+format_results and are_valid_numbers must return exactly what the scalar
+format_result and is_valid_number give item by item, with and without NumPy,
+for mostly-repeated and all-distinct inputs alike.
+"""
+
+import random
+
+import pytest
+
+from utils import helpers
+from utils.helpers import NOTATIONS, are_valid_numbers, format_result, format_results, is_valid_number
+
+EDGE_CASES = [
+    '0', '-0', '007', '-0.0', '2.0', '-2.5', '0.1', '0.30000000000000004', '1e5', '1E5', '1e16',
+    '1e-300', '5e-324', '999.9999999999', '123456789012345678', '0.3333333333333333333333333333',
+    '-0.33333333333333333333', '+1.2345678901234567890', '1.5e-5000', '12345678901234567890.5e3',
+    '1606938044258990275541962092341162602522202993782792835301376', '9.990020930143845e+30102',
+    'inf', '-inf', 'nan', 'Error', '1/3', '1_000', ' 3 ', '', '-', 'e5',
+]
+
+def _strings(count, seed=0):
+    rng = random.Random(seed)
+    values = [repr(rng.uniform(-1, 1) * 10 ** rng.randint(-20, 20)) for _ in range(count)]
+    values += [str(rng.randint(-10 ** 20, 10 ** 20)) for _ in range(count)]
+    values += EDGE_CASES
+    rng.shuffle(values)
+    return values
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(helpers, '_numpy', lambda: None)
+    elif helpers._numpy() is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+@pytest.mark.parametrize('notation', NOTATIONS)
+@pytest.mark.parametrize('digits', [1, 4, 10, 15])
+@pytest.mark.parametrize('repeat', [1, 5])
+def test_format_results_matches_scalar(backend, notation, digits, repeat):
+    values = _strings(300) * repeat
+    expected = [format_result(value, digits, notation) for value in values]
+    assert format_results(values, digits, notation) == expected
+    assert format_results(iter(values), digits, notation) == expected
+
+@pytest.mark.parametrize('notation', NOTATIONS)
+def test_format_results_mixed_and_numbers(backend, notation):
+    numbers = [0.0, -0.0, 2.0, -2.5, 1e300, 1e-300, float('inf'), float('nan'), 10 ** 30, 7]
+    mixed = numbers + EDGE_CASES
+    for values in (numbers, mixed):
+        assert format_results(values, 6, notation) == [format_result(value, 6, notation) for value in values]
+
+@pytest.mark.parametrize('notation', NOTATIONS)
+def test_format_results_numpy_arrays(notation):
+    numpy = pytest.importorskip('numpy')
+    floats = [0.0, -0.0, 2.0, -2.5, 1e300, 1e-300, float('inf'), float('-inf'), float('nan'), 1 / 3]
+    cubes = [value ** 3 for value in range(-50, 50)]
+    for scalars, array in ((floats, numpy.array(floats)), (cubes, numpy.array(cubes).reshape(10, 10))):
+        assert format_results(array, 10, notation) == [format_result(value, 10, notation) for value in scalars]
+    strings = numpy.array(EDGE_CASES)
+    assert format_results(strings, 10, notation) == [format_result(value, 10, notation) for value in EDGE_CASES]
+
+def test_format_results_rejects_unknown_notation():
+    with pytest.raises(ValueError):
+        format_results(['1'], 10, 'roman')
+
+@pytest.mark.parametrize('repeat', [1, 5])
+def test_are_valid_numbers_matches_scalar(backend, repeat):
+    values = _strings(300) * repeat
+    assert are_valid_numbers(values) == [is_valid_number(value) for value in values]
+    assert are_valid_numbers(['Error'] * 3 + ['1']) == [False, False, False, True]
+    assert are_valid_numbers([]) == []
+
+def test_are_valid_numbers_arrays():
+    numpy = pytest.importorskip('numpy')
+    assert are_valid_numbers(numpy.arange(6).reshape(2, 3)) == [True] * 6
+    assert are_valid_numbers(numpy.array(EDGE_CASES)) == [is_valid_number(value) for value in EDGE_CASES]
+
+def test_are_valid_numbers_propagates_type_errors():
+    with pytest.raises(TypeError):
+        is_valid_number(None)
+    with pytest.raises(TypeError):
+        are_valid_numbers(['1', None])
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Tests for columnar streaming evaluation input handling
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core.columnar import BinaryColumns, main
+
+def test_binary_columns_reject_partial_records(tmp_path):
+    path = tmp_path / 'x.f64'
+    np.arange(4.0).tofile(path)
+    assert BinaryColumns({'x': str(path)}).rows == 4
+    with open(path, 'ab') as file:
+        file.write(b'\0' * 3)
+    with pytest.raises(ValueError):
+        BinaryColumns({'x': str(path)})
+
+def test_main_reports_missing_files(tmp_path, capsys):
+    missing = str(tmp_path / 'missing.f64')
+    status = main(['--column', f'x={missing}', '--output-dir', str(tmp_path / 'out'), 'r = x*2'])
+    assert status != 0
+    assert missing in capsys.readouterr().err
+    assert main(['--csv', missing, '--output', str(tmp_path / 'out.csv'), 'r = x']) != 0
+
+def test_main_writes_results(tmp_path):
+    np.arange(5.0).tofile(tmp_path / 'x.f64')
+    out = tmp_path / 'out'
+    assert main(['--column', f"x={tmp_path / 'x.f64'}", '--output-dir', str(out), '--quiet', 'r = x*2']) == 0
+    assert np.fromfile(out / 'r.f64').tolist() == [0.0, 2.0, 4.0, 6.0, 8.0]
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Tests for the history containers
+
+ConcurrentHistory must behave like HistoryBuffer for a single writer and
+keep exactly the newest records, in order, when many threads append,
+including after the threads finish and their buffers are retired.
+"""
+
+import gc
+import threading
+
+import pytest
+
+from core.history import ConcurrentHistory, HistoryBuffer
+
+def _fill(history, count, start=0):
+    for index in range(start, start + count):
+        history.append(f"{index}+0", str(index), float(index))
+
+def _numbers(entries):
+    return [entry.number for entry in entries]
+
+def _run_writers(history, threads, ops):
+    """Append from short-lived threads; returns number -> (expression, result)"""
+    appended = {}
+    
+    def writer(name):
+        for index in range(ops):
+            record = (f"{name}:{index}", str(index))
+            appended[history.append(*record)] = record
+    
+    pool = [threading.Thread(target=writer, args=(thread,)) for thread in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    gc.collect()  # Runs the finalizers of the threads' buffers on any interpreter
+    return appended
+
+@pytest.mark.parametrize('count', [0, 3, 10, 25])
+def test_single_writer_matches_history_buffer(count):
+    expected, history = HistoryBuffer(10), ConcurrentHistory(10)
+    _fill(expected, count)
+    _fill(history, count)
+    
+    assert len(history) == len(expected)
+    assert bool(history) == bool(expected)
+    assert history.first_number == expected.first_number
+    assert history.next_number == expected.next_number
+    assert _numbers(history.iter_entries()) == _numbers(expected.iter_entries())
+    assert _numbers(history.latest(4)) == _numbers(expected.latest(4))
+    for offset, limit in [(0, 3), (2, 5), (8, 5), (20, 5)]:
+        for newest_first in (True, False):
+            assert (_numbers(history.page(offset, limit, newest_first))
+                    == _numbers(expected.page(offset, limit, newest_first)))
+    for number in range(0, count + 2):
+        if expected.first_number <= number < expected.next_number:
+            assert str(history.get(number)) == str(expected.get(number))
+        else:
+            with pytest.raises(IndexError):
+                history.get(number)
+
+def test_clear_restarts_numbering():
+    history = ConcurrentHistory(5)
+    _fill(history, 7)
+    history.clear(100)
+    assert len(history) == 0 and not history
+    assert history.first_number == history.next_number == 100
+    assert history.append('1+1', '2') == 100
+    assert history.get(100).result == '2'
+
+@pytest.mark.parametrize('capacity', [1, 7, 50, 10_000])
+def test_many_writers_keep_the_newest_records(capacity):
+    history = ConcurrentHistory(capacity)
+    appended = _run_writers(history, threads=8, ops=300)
+    total = 8 * 300
+    
+    assert sorted(appended) == list(range(1, total + 1))
+    kept = list(range(max(total - capacity, 0) + 1, total + 1))
+    assert len(history) == len(kept)
+    assert history.first_number == kept[0]
+    assert history.next_number == total + 1
+    assert _numbers(history.iter_entries()) == kept
+    assert _numbers(history.latest(capacity)) == kept[::-1]
+    assert _numbers(history.page(1, 5, newest_first=False)) == kept[1:6]
+    for number in kept[:3] + kept[-3:]:
+        entry = history.get(number)
+        assert (entry.expression, entry.result) == appended[number]
+    with pytest.raises(IndexError):
+        history.get(kept[0] - 1)
+    # Finished threads leave no buffers and only a few merged lists
+    assert history._epoch.buffers == []
+    assert len(history._epoch.retired) <= capacity.bit_length()
+
+def test_readers_see_newest_first_while_threads_come_and_go():
+    capacity = 64
+    history = ConcurrentHistory(capacity)
+    problems = []
+    done = threading.Event()
+    
+    def reader():
+        while not done.is_set():
+            numbers = _numbers(history.latest(capacity))
+            if any(newer <= older for newer, older in zip(numbers, numbers[1:])):
+                problems.append(numbers)
+                return
+    
+    reading = threading.Thread(target=reader)
+    reading.start()
+    try:
+        for wave in range(5):
+            _run_writers(history, threads=4, ops=200)
+    finally:
+        done.set()
+        reading.join()
+    
+    assert problems == []
+    assert _numbers(history.iter_entries()) == list(range(4000 - capacity + 1, 4001))
\ No newline at end of file
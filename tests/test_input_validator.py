@@ -0,0 +1,21 @@
+"""
+Tests for the keypad input validator
+"""
+
+from core.input_validator import InputValidator
+
+def test_reset_to_a_result_keys_can_continue():
+    validator = InputValidator()
+    validator.reset("-2.5")
+    assert not validator.is_invalid
+    assert validator.is_valid('+')
+    assert validator.length == 4
+
+def test_reset_to_a_complex_result_is_invalid():
+    validator = InputValidator()
+    validator.reset("(1.0000000000000002+1.7320508075688772j)")
+    assert validator.is_invalid
+    assert not validator.valid_keys()
+    validator.reset()
+    assert not validator.is_invalid
+    assert validator.is_valid('7')
\ No newline at end of file
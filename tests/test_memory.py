@@ -0,0 +1,28 @@
+"""
+Tests for the memory register operations
+"""
+
+import pytest
+
+from core.calculator_core import CalculatorCore
+from core.threadsafe import ThreadSafeCalculatorCore
+
+@pytest.mark.parametrize('core_class', [CalculatorCore, ThreadSafeCalculatorCore])
+def test_memory_rejects_values_that_are_not_numbers(core_class):
+    core = core_class()
+    assert core.memory_store("2.5")
+    assert core.memory_add("1.5")
+    assert core.memory_subtract(1)
+    for value in ("Error", "1/3", None, 10 ** 400):
+        assert not core.memory_store(value)
+        assert not core.memory_add(value)
+        assert not core.memory_subtract(value)
+    assert core.memory_recall() == "3.0"
+
+def test_memory_does_not_swallow_interrupts():
+    class Interrupting:
+        def __float__(self):
+            raise KeyboardInterrupt
+    
+    with pytest.raises(KeyboardInterrupt):
+        CalculatorCore().memory_add(Interrupting())
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Tests for the live result preview
+
+Previews must be evaluated by the calculator itself: in its precision
+mode, with its worksheet, and without adding to its history.
+"""
+
+import threading
+
+import pytest
+
+from core.preview import PreviewSession
+from core.threadsafe import ThreadSafeCalculatorCore
+
+@pytest.fixture
+def core():
+    return ThreadSafeCalculatorCore()
+
+def _preview(session, text):
+    session.update(text)
+    done = threading.Event()
+    results = []
+    
+    def callback(generation, result):
+        results.append(result)
+        done.set()
+    
+    session.submit(callback)
+    assert done.wait(5)
+    return results[0]
+
+def test_preview_matches_calculate(core):
+    session = PreviewSession(core)
+    try:
+        assert _preview(session, "sin(30") == core.calculate("sin(30)")
+        assert _preview(session, "2×(3+4") == "14"
+        assert _preview(session, "2×(3+") is None
+        assert _preview(session, "a = 3") is None
+        assert not core.get_variables()
+    finally:
+        session.close()
+
+def test_preview_follows_precision_and_worksheet(core):
+    session = PreviewSession(core)
+    try:
+        core.set_precision('fraction')
+        assert _preview(session, "1/3+1/6") == core.calculate("1/3+1/6") == "1/2"
+        core.set_precision('float')
+        core.define("a = 4")
+        core.define("f(x) = x²+a")
+        recorded = len(core.history)
+        assert _preview(session, "f(a") == "20"
+        core.set_angle_mode('rad')
+        assert _preview(session, "cos(pi") == core.calculate("cos(pi)") == "-1.0"
+        assert len(core.history) == recorded
+    finally:
+        session.close()
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Tests for the thread-safe calculator core
+
+No memory update may be lost, and the cells of finished threads are
+folded into the base so they do not pile up.
+"""
+
+import gc
+import threading
+
+from core.threadsafe import ThreadSafeCalculatorCore, ThreadSafeMemory
+
+def _in_threads(target, threads):
+    pool = [threading.Thread(target=target) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    gc.collect()  # Runs the finalizers of the threads' cells on any interpreter
+
+def test_memory_keeps_every_update_and_drops_finished_threads():
+    memory = ThreadSafeMemory(5)
+    
+    def add():
+        for _ in range(1000):
+            memory.add(1)
+    
+    for wave in range(3):
+        _in_threads(add, 8)
+        assert memory.value == 5 + 8000 * (wave + 1)
+    assert memory._cells == set()
+
+def test_memory_store_discards_deltas_of_finished_threads():
+    memory = ThreadSafeMemory()
+    added = threading.Event()
+    stored = threading.Event()
+    
+    def add_around_store():
+        memory.add(10)
+        added.set()
+        stored.wait()
+        memory.add(1)
+    
+    thread = threading.Thread(target=add_around_store)
+    thread.start()
+    added.wait()
+    memory.store(100)  # Makes the first delta obsolete
+    stored.set()
+    thread.join()
+    gc.collect()
+    assert memory.value == 101
+    assert memory._cells == set()
+
+def test_core_memory_and_worksheet_from_many_threads():
+    core = ThreadSafeCalculatorCore()
+    core.define('a = 1')
+    errors = []
+    
+    def work():
+        try:
+            for index in range(200):
+                core.memory_add(1)
+                assert core.calculate('a - a') == '0'
+        except Exception as e:
+            errors.append(e)
+    
+    def redefine():
+        for index in range(200):
+            core.define(f'a = {index}')
+    
+    pool = [threading.Thread(target=work) for _ in range(4)] + [threading.Thread(target=redefine)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    assert errors == []
+    assert core.memory == 800
\ No newline at end of file
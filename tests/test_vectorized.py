@@ -0,0 +1,51 @@
+"""
+Tests for vectorized evaluation
+
+The pure-Python fallback must broadcast columns like NumPy does in one
+dimension and give the same IEEE results.
+"""
+
+import math
+
+import pytest
+
+from core.vectorized import HAS_NUMPY, compile_vectorized
+
+BACKENDS = [False, True] if HAS_NUMPY else [False]
+
+def _values(result):
+    return [float(value) for value in (result.ravel() if hasattr(result, 'ravel') else result)]
+
+def _same(a, b):
+    return len(a) == len(b) and all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+@pytest.mark.parametrize('columns, expected', [
+    (([1, 2, 3], 5), [6, 7, 8]),
+    ((5, [1, 2, 3]), [6, 7, 8]),
+    (([1, 2, 3], [10]), [11, 12, 13]),
+    (([1], [1, 2]), [2, 3]),
+    (([2], [3]), [5]),
+    (([], 1), []),
+    (([], [1]), []),
+])
+def test_broadcasts_scalars_and_single_values(use_numpy, columns, expected):
+    f = compile_vectorized('x+y', ('x', 'y'), use_numpy=use_numpy)
+    assert _values(f(*columns)) == expected
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_rejects_mismatched_lengths(use_numpy):
+    f = compile_vectorized('x+y', ('x', 'y'), use_numpy=use_numpy)
+    with pytest.raises(ValueError):
+        f([1, 2], [1, 2, 3])
+    with pytest.raises(TypeError):
+        f([1, 2])
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="NumPy is not installed")
+@pytest.mark.parametrize('expression', ['x/y', 'ln(x)*y', 'sqrt(x-y)', 'x^y', '(x-1)!', 'tan(x)+y%2'])
+def test_fallback_matches_numpy(expression):
+    xs = [-2, -1, 0, 0.5, 1, 2, 90, 400]
+    numpy_f = compile_vectorized(expression, ('x', 'y'), use_numpy=True)
+    python_f = compile_vectorized(expression, ('x', 'y'), use_numpy=False)
+    for y in (0, 3, [2.5]):
+        assert _same(_values(python_f(xs, y)), _values(numpy_f(xs, y)))
\ No newline at end of file
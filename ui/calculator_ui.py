@@ -5,56 +5,154 @@ Calculator UI Components Module
 import kivy
 kivy.require('2.0.0')
 
+from kivy.clock import Clock, mainthread
+from kivy.core.window import Window
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.togglebutton import ToggleButton
-from core.calculator_core import CalculatorCore
+from kivy.uix.widget import Widget
+from core.input_validator import InputValidator
+from core.preview import PreviewSession
+from core.threadsafe import ThreadSafeCalculatorCore
 
 class CalculatorWidget(BoxLayout):
     """Calculator Main Interface Module"""
     
-    def __init__(self, **kwargs):
+    # Scientific keys built after the first frame
+    DEFERRED_BUTTONS = frozenset([
+        'sin', 'cos', 'tan', 'cot', 'asin', 'acos', 'atan', 'log', 'ln', 'π', 'e',
+        'x²', 'x³', 'xⁿ', '√', '³√', '!', '|x|'
+    ])
+    # Keys handled by on_button_press itself; all others are input keys,
+    # enabled only while the input validator accepts them
+    CONTROL_BUTTONS = frozenset([
+        'C', 'CE', 'DEL', '=', 'ANS', 'MR', 'MS', 'M+', 'M-', 'MC', 'DEG/RAD'
+    ])
+    HISTORY_SIZE = 100000  # History records kept (the panel only renders visible rows)
+    PREVIEW_DELAY = 0.15  # Seconds of typing pause before the live preview is evaluated
+    
+    def __init__(self, live_preview=True, debug_overlay=False, core=None, **kwargs):
+        """
+        Args:
+            live_preview (bool): Show the result of the input while typing
+            debug_overlay (bool): Show per-stage evaluation timings and counters
+            core (ThreadSafeCalculatorCore): Calculator to show, e.g. one carried
+                over a code reload (default: a new one); the live preview
+                evaluates through it on a background thread
+        """
         super().__init__(**kwargs)
         self.orientation = "vertical"
         self.padding = 10
         self.spacing = 10
         
         # Initialize core calculation module
-        self.core = CalculatorCore()
+        self.core = ThreadSafeCalculatorCore(history_size=self.HISTORY_SIZE) if core is None else core
         
         # Create mode display
         self.mode_display = self._create_mode_display()
         self.add_widget(self.mode_display)
         
+        # Create instrumentation overlay (debugging aid, off by default)
+        self.debug_label = None
+        if debug_overlay:
+            self._last_observation = None
+            self.core.enable_instrumentation().add_hook(self._on_observation)
+            self.debug_label = self._create_debug_display()
+            self.add_widget(self.debug_label)
+        
         # Create history display area
         self.history_display = self._create_history_display()
         self.add_widget(self.history_display)
         
-        # Create display screen
+        # Create display screen; the validator follows its text key by key
+        self.input_validator = InputValidator()
+        self._input_buttons = {}  # label -> Button, for enabling valid keys only
+        # Display text no key can continue ("Error", a complex result): the next key starts over
+        self._error_shown = None
         self.solution = self._create_display()
         self.add_widget(self.solution)
         
+        # Create live result preview
+        self.preview_label = self._create_preview_display()
+        self.add_widget(self.preview_label)
+        self.live_preview = live_preview
+        self.preview = PreviewSession(self.core)
+        self._preview_trigger = Clock.create_trigger(self._start_preview, self.PREVIEW_DELAY)
+        self.solution.bind(text=self._on_display_changed)
+        
         # Create button layout
         buttons = self._create_buttons()
         
-        # Add buttons
+        # Add buttons; rarely used ones start as empty slots so the first
+        # frame is drawn sooner and the grid does not reflow when they appear
+        self._deferred_buttons = []  # (row layout, placeholder, label)
         for row in buttons:
             h_layout = BoxLayout(spacing=10)
             for label in row:
-                if label == 'DEG/RAD':
-                    # Create toggle button for angle mode
-                    button = ToggleButton(text=f'DEG', font_size=20)
-                    button.bind(on_press=self._toggle_angle_mode)
-                    button.state = 'down' if self.core.get_angle_mode() == 'deg' else 'normal'
+                if label in self.DEFERRED_BUTTONS:
+                    placeholder = Widget()
+                    self._deferred_buttons.append((h_layout, placeholder, label))
+                    h_layout.add_widget(placeholder)
                 else:
-                    button = Button(text=label, font_size=30)
-                    button.bind(on_press=self.on_button_press)
-                h_layout.add_widget(button)
+                    h_layout.add_widget(self._create_button(label))
             self.add_widget(h_layout)
-            
+        
+        # Build the deferred parts right after the first frame
+        self.fully_built = False
+        Window.bind(on_flip=self._on_first_frame)
+    
+    def _create_button(self, label):
+        """
+        Create one keypad button
+        
+        Args:
+            label (str): Button text
+        
+        Returns:
+            Button: Bound button component
+        """
+        if label == 'DEG/RAD':
+            # Create toggle button for angle mode
+            button = ToggleButton(text=f'DEG', font_size=20)
+            button.bind(on_press=self._toggle_angle_mode)
+            button.state = 'down' if self.core.get_angle_mode() == 'deg' else 'normal'
+        else:
+            button = Button(text=label, font_size=30)
+            button.bind(on_press=self.on_button_press)
+            if label not in self.CONTROL_BUTTONS:
+                self._input_buttons[label] = button
+                button.disabled = not self.input_validator.is_valid(label)
+        return button
+    
+    def _on_first_frame(self, window):
+        """Schedule the deferred build once a frame has been shown"""
+        window.unbind(on_flip=self._on_first_frame)
+        Clock.schedule_once(self._build_deferred, 0)
+    
+    def _build_deferred(self, dt=None):
+        """Build the history list and the scientific buttons (runs once)"""
+        if self.fully_built:
+            return
+        self.fully_built = True
+        
+        from ui.history_view import HistoryView
+        # Create virtualized history list (newest on top)
+        self.history_view = HistoryView(
+            fetch_page=self.core.get_history_page,
+            count=lambda: len(self.core.history),
+            size_hint_y=None,
+            height=100
+        )
+        self.history_display.add_widget(self.history_view)
+        
+        for h_layout, placeholder, label in self._deferred_buttons:
+            index = h_layout.children.index(placeholder)
+            h_layout.remove_widget(placeholder)
+            h_layout.add_widget(self._create_button(label), index)
+        self._deferred_buttons = []
+    
     def _create_mode_display(self):
         """Create mode display area"""
         mode_layout = BoxLayout(orientation="horizontal", size_hint_y=None, height=30)
@@ -68,7 +166,7 @@ class CalculatorWidget(BoxLayout):
         
         # Memory display
         self.memory_label = Label(
-            text="Memory: 0",
+            text=f"Memory: {self.core.memory}",
             font_size=16,
             color=(0.8, 0.5, 0.5, 1)
         )
@@ -89,12 +187,49 @@ class CalculatorWidget(BoxLayout):
             multiline=False, readonly=True, halign="right", font_size=55
         )
     
+    def _create_preview_display(self):
+        """
+        Create live result preview line
+        
+        Returns:
+            Label: Preview label shown under the display
+        """
+        preview = Label(
+            text="",
+            font_size=24,
+            size_hint_y=None,
+            height=30,
+            halign="right",
+            color=(0.6, 0.6, 0.6, 1)
+        )
+        preview.bind(size=preview.setter('text_size'))
+        return preview
+    
+    def _create_debug_display(self):
+        """
+        Create instrumentation overlay
+        
+        Returns:
+            Label: Small label showing counters and stage timings
+        """
+        debug = Label(
+            text="Instrumentation on: press = to collect timings",
+            font_size=12,
+            size_hint_y=None,
+            height=50,
+            halign="left",
+            valign="top",
+            color=(0.4, 0.8, 0.4, 1)
+        )
+        debug.bind(size=debug.setter('text_size'))
+        return debug
+    
     def _create_history_display(self):
         """
         Create history display area
         
         Returns:
-            ScrollView: Scroll view containing history records
+            BoxLayout: History header and records list
         """
         # Create history label with clear button
         history_header = BoxLayout(orientation="horizontal", size_hint_y=None, height=30)
@@ -118,26 +253,12 @@ class CalculatorWidget(BoxLayout):
         history_header.add_widget(history_label)
         history_header.add_widget(clear_button)
         
-        # Create history display area
-        self.history_text = TextInput(
-            multiline=True, 
-            readonly=True, 
-            font_size=16,
-            size_hint_y=None,
-            height=100
-        )
-        self.history_text.text = "No history records"
-        
-        # Create scroll view
-        self.scroll_view = ScrollView(size_hint_y=None, height=130)
-        
-        # Create vertical layout
+        # Create vertical layout (the records list is added after the first frame)
+        self.history_view = None
         history_layout = BoxLayout(orientation="vertical", size_hint_y=None, height=130)
         history_layout.add_widget(history_header)
-        history_layout.add_widget(self.history_text)
         
-        self.scroll_view.add_widget(history_layout)
-        return self.scroll_view
+        return history_layout
     
     def _create_buttons(self):
         """
@@ -166,31 +287,54 @@ class CalculatorWidget(BoxLayout):
         """
         current = self.solution.text
         button_text = instance.text
+        if self._error_shown is not None:
+            # Any key starts a new expression in place of the error
+            current = ""
         
+        validator = self.input_validator
         if button_text == 'C':
             # Clear screen
+            validator.reset()
             self.solution.text = ""
         elif button_text == 'CE':
             # Clear entry (clear current input)
+            validator.reset()
             self.solution.text = ""
         elif button_text == 'DEL':
-            # Backspace
-            self.solution.text = current[:-1]
+            if self._error_shown is not None:
+                # Deleting from an error clears it
+                self.solution.text = ""
+                return
+            # Backspace: undo the last key, e.g. all of 'sin('
+            removed = validator.delete()
+            if removed:
+                self.solution.text = current[:-removed]
         elif button_text == '=':
             # Calculate result and display
             result = self.core.evaluate_expression(current)
+            if result is None:
+                return  # Nothing to calculate
+            if result != "Error":
+                validator.reset(result)
+            if result == "Error" or validator.is_invalid:
+                # Also a complex result such as (-8)^(1/3): keys cannot continue it
+                validator.reset()
+                self._error_shown = result
             self.solution.text = result
             
             # Update history display
             self._update_history_display()
+            if self.debug_label is not None:
+                self._update_debug_display()
         elif button_text == 'ANS':
             # Insert last answer
-            if self.core.last_result:
+            if self.core.last_result and validator.insert(self.core.last_result):
                 self.solution.text = current + self.core.last_result
         elif button_text == 'MR':
             # Memory recall
             memory_value = self.core.memory_recall()
-            self.solution.text = current + memory_value
+            if validator.insert(memory_value):
+                self.solution.text = current + memory_value
         elif button_text == 'MS':
             # Memory store
             if current:
@@ -211,17 +355,18 @@ class CalculatorWidget(BoxLayout):
             self.core.memory_clear()
             self._update_memory_display()
         else:
-            # Add button text to current expression
-            if self.core.validate_input(current, button_text):
-                # Handle special cases for functions that need parentheses
-                if button_text in ['sin', 'cos', 'tan', 'cot', 'asin', 'acos', 'atan', 'log', 'ln', '√', '³√']:
-                    self.solution.text = current + button_text + '('
-                elif button_text == '|x|':
-                    self.solution.text = current + '|'
-                elif button_text == 'xⁿ':
-                    self.solution.text = current + '^'
-                else:
-                    self.solution.text = current + button_text
+            # Add button text to current expression ('sin' adds 'sin(', 'xⁿ' adds '^', ...)
+            text = validator.press(button_text)
+            if text is not None:
+                self.solution.text = current + text
+    
+    def close(self):
+        """Stop background work and window bindings, e.g. before the widget is replaced"""
+        Window.unbind(on_flip=self._on_first_frame)
+        self._preview_trigger.cancel()
+        self.preview.close()
+        if self.debug_label is not None:
+            self.core.instrumentation.remove_hook(self._on_observation)
     
     def _toggle_angle_mode(self, instance):
         """Toggle between degree and radian mode"""
@@ -230,26 +375,76 @@ class CalculatorWidget(BoxLayout):
         self.core.set_angle_mode(new_mode)
         instance.text = new_mode.upper()
         self.angle_mode_label.text = f"Angle: {new_mode.upper()}"
+        
+        # Trig results change with the angle mode
+        self._on_display_changed(self.solution, self.solution.text)
+    
+    def _on_display_changed(self, instance, text):
+        """Restart the preview debounce whenever the display text changes"""
+        if self._error_shown is not None and text != self._error_shown:
+            self._error_shown = None
+        if self._error_shown is None and len(text) != self.input_validator.length:
+            # Changed other than through the keypad: re-read the whole text
+            self.input_validator.reset(text)
+        self._update_input_buttons()
+        
+        # Cheap incremental re-lex; also cancels previews of older text
+        self.preview.update(text)
+        self.preview_label.text = ""
+        self._preview_trigger.cancel()
+        if self.live_preview:
+            self._preview_trigger()
+    
+    def _update_input_buttons(self):
+        """Enable exactly the input keys valid after the current text (constant time)"""
+        valid = self.input_validator.valid_keys()
+        for label, button in self._input_buttons.items():
+            button.disabled = label not in valid
+    
+    def _start_preview(self, dt):
+        """Evaluate the current display text off the UI thread"""
+        self.preview.submit(self._show_preview)
+    
+    @mainthread
+    def _show_preview(self, generation, result):
+        """Show a preview result if it still matches the display"""
+        if not self.preview.is_current(generation):
+            return
+        if result is None or result == self.solution.text:
+            self.preview_label.text = ""
+        else:
+            self.preview_label.text = f"= {result}"
     
     def _update_memory_display(self):
         """Update memory display"""
         self.memory_label.text = f"Memory: {self.core.memory}"
     
+    def _on_observation(self, observation):
+        """Instrumentation hook: keep the latest evaluation's measurements"""
+        self._last_observation = observation
+    
+    def _update_debug_display(self):
+        """Show instrumentation counters and the last evaluation's stage timings"""
+        stats = self.core.get_stats()
+        errors = ' '.join(f"{name}:{count}" for name, count in stats['errors'].items()) or 'none'
+        lines = [
+            f"calls {stats['calls']}  cache hits {stats['cache_hits']}/{stats['calls']}  "
+            f"errors {errors}  mean {stats['total']['mean_us']:.0f}us"
+        ]
+        observation = self._last_observation
+        if observation is not None:
+            stages = ' '.join(f"{stage} {elapsed / 1000:.1f}" for stage, elapsed in observation.stages.items())
+            outcome = type(observation.error).__name__ if observation.error is not None else 'ok'
+            lines.append(f"last {observation.total_ns / 1000:.0f}us ({outcome}): {stages}")
+        self.debug_label.text = '\n'.join(lines)
+    
     def _update_history_display(self):
         """Update history display"""
-        history = self.core.get_history()
-        if history:
-            # Reverse history records, newest on top
-            reversed_history = history[::-1]
-            history_text = "\n".join(reversed_history)
-            self.history_text.text = history_text
-            
-            # Auto-scroll to the top (newest record)
-            self.history_text.cursor = (0, 0)
-        else:
-            self.history_text.text = "No history records"
+        # Only the visible rows are re-rendered
+        self._build_deferred()
+        self.history_view.refresh()
     
     def _clear_history(self, instance):
         """Clear history records"""
         self.core.clear_history()
-        self.history_text.text = "No history records"
\ No newline at end of file
+        self._update_history_display()
\ No newline at end of file
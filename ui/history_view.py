@@ -0,0 +1,111 @@
+"""
+Virtualized History Panel Module
+"""
+
+from kivy.properties import NumericProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+
+class HistoryView(BoxLayout):
+    """
+    Newest-first history list that only renders the rows that fit
+    
+    Rows are a fixed pool of labels filled from one page of records, so
+    an update costs O(visible rows) whatever the history size.
+    """
+    
+    row_height = NumericProperty(20)
+    font_size = NumericProperty(14)
+    empty_text = StringProperty("No history records")
+    
+    def __init__(self, fetch_page, count, **kwargs):
+        """
+        Initialize history panel
+        
+        Args:
+            fetch_page (callable): fetch_page(offset, limit) -> HistoryEntry list, newest first
+            count (callable): count() -> total number of records
+        """
+        super().__init__(orientation="vertical", **kwargs)
+        self._fetch_page = fetch_page
+        self._count = count
+        self._rows = []
+        self._newest = 0  # Number of the newest record at the last refresh
+        self._drag = 0  # Accumulated touch drag, in pixels
+        self.offset = 0  # Records scrolled past from the newest end
+        self.bind(height=self._resize_rows)
+        self._resize_rows()
+    
+    def _resize_rows(self, *args):
+        """Grow or shrink the label pool to the number of visible rows"""
+        needed = max(1, int(self.height // self.row_height))
+        while len(self._rows) < needed:
+            row = Label(
+                size_hint_y=None,
+                height=self.row_height,
+                font_size=self.font_size,
+                halign="left",
+                valign="middle",
+                shorten=True,
+                color=(0.8, 0.8, 0.8, 1)
+            )
+            row.bind(size=row.setter('text_size'))
+            self._rows.append(row)
+            self.add_widget(row)
+        while len(self._rows) > needed:
+            self.remove_widget(self._rows.pop())
+        self.refresh()
+    
+    def refresh(self):
+        """Re-render visible rows from the current records"""
+        total = self._count()
+        newest = self._fetch_page(0, 1) if total else []
+        newest_number = newest[0].number if newest else 0
+        if self.offset and newest_number > self._newest:
+            # Keep the rows the user scrolled to in place when new records arrive
+            self.offset += newest_number - self._newest
+        self._newest = newest_number
+        self.offset = max(0, min(self.offset, total - len(self._rows)))
+        
+        entries = self._fetch_page(self.offset, len(self._rows)) if total else []
+        for index, row in enumerate(self._rows):
+            row.text = entries[index].format() if index < len(entries) else ""
+        if not total and self._rows:
+            self._rows[0].text = self.empty_text
+    
+    def scroll(self, rows):
+        """
+        Scroll by a number of rows
+        
+        Args:
+            rows (int): Positive scrolls towards older records
+        """
+        self.offset = max(0, self.offset + rows)
+        self.refresh()
+    
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if touch.is_mouse_scrolling:
+            self.scroll(1 if touch.button == 'scrolldown' else -1)
+            return True
+        touch.grab(self)
+        self._drag = 0
+        return True
+    
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        # Dragging up reveals older records
+        self._drag += touch.dy
+        rows = int(self._drag / self.row_height)
+        if rows:
+            self._drag -= rows * self.row_height
+            self.scroll(rows)
+        return True
+    
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        return True
\ No newline at end of file
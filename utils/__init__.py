@@ -2,6 +2,6 @@
 utils包初始化文件
 """
 
-from .helpers import format_result, is_valid_number
+from .helpers import are_valid_numbers, format_result, format_results, is_valid_number
 
-__all__ = ['format_result', 'is_valid_number']
\ No newline at end of file
+__all__ = ['format_result', 'format_results', 'is_valid_number', 'are_valid_numbers']
\ No newline at end of file
@@ -4,28 +4,212 @@
 
 import math
 
-def format_result(result):
+NOTATIONS = ('general', 'sci', 'eng')  # 常规（整数原样）、科学计数法、工程计数法
+MAX_FLOAT_DIGITS = 17  # 双精度浮点数最多的有效数字位数
+
+def _numpy():
+    """NumPy 为可选依赖，按需导入，缺失时返回 None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def _significant_digits(text):
+    """数字字符串尾数部分的有效数字位数"""
+    mantissa = text.lower().split('e')[0].lstrip('+-').replace('.', '')
+    return len(mantissa.lstrip('0'))
+
+def _engineering(num, digits):
+    """工程计数法：指数为 3 的倍数，如 150e-09"""
+    mantissa, exponent = f"{num:.{digits - 1}e}".split('e')
+    exponent = int(exponent)
+    shift = exponent % 3
+    sign = '-' if mantissa.startswith('-') else ''
+    figures = mantissa.lstrip('-').replace('.', '').ljust(shift + 1, '0')
+    whole, fraction = figures[:shift + 1], figures[shift + 1:]
+    return f"{sign}{whole}{'.' + fraction if fraction else ''}e{exponent - shift:+03d}"
+
+def format_result(result, digits=10, notation='general'):
     """
     格式化计算结果
     
     Args:
-        result (str): 计算结果字符串
-        
+        result (str): 计算结果字符串（也可以是数值）
+        digits (int): 有效数字位数
+        notation (str): 'general' 常规，'sci' 科学计数法，'eng' 工程计数法
+    
     Returns:
-        str: 格式化后的结果
+        str: 格式化后的结果（分数与超出双精度的结果原样返回）
     """
+    if notation not in NOTATIONS:
+        raise ValueError(f"未知的计数法 {notation!r}")
     try:
         # 尝试将结果转换为浮点数
         num = float(result)
-        
-        # 如果是整数，显示为整数形式
-        if num.is_integer():
-            return str(int(num))
-        
-        # 保留合适的小数位数
-        return f"{num:.10g}"
-    except:
+    except (TypeError, ValueError, OverflowError):
+        # 非数字（如分数 '1/3'）原样返回
         return result
+    text = result if isinstance(result, str) else None
+    
+    # 超出浮点数范围的结果（如大整数的科学计数法显示）原样返回
+    if not math.isfinite(num):
+        return result if text is not None else str(num)
+    
+    if notation == 'sci':
+        return f"{num:.{digits - 1}e}"
+    if notation == 'eng':
+        return _engineering(num, digits)
+    
+    # 如果是整数，显示为整数形式
+    if num.is_integer():
+        # 整数字符串原样保留，大整数经浮点数会丢失精度
+        if text is not None and text.lstrip('-').isdigit():
+            return text
+        return str(int(num))
+    
+    # decimal 精度模式的结果有效数字多于双精度，不再经浮点数截断
+    if text is not None and _significant_digits(text) > MAX_FLOAT_DIGITS:
+        return text
+    
+    # 保留合适的小数位数
+    return f"{num:.{digits}g}"
+
+def _all_strings(values):
+    """是否全是 str（不含子类，如 BigInteger）"""
+    return set(map(type, values)) <= {str}
+
+def _parse_floats(values):
+    """
+    用 float() 批量解析字符串列表，无法解析的（如 'Error'）记为 NaN
+    
+    list.extend(map(float, ...)) 整段在 C 中循环，比对象数组的 astype 还快。
+    遇到无效值时 extend 已保留之前解析的值，由列表长度即知无效值的下标，
+    再从共享的迭代器接着解析，总代价 O(n)。
+    
+    Returns:
+        tuple: (float 列表, 无效值的下标列表)
+    """
+    numbers = []
+    invalid = []
+    remaining = iter(values)
+    while True:
+        try:
+            numbers.extend(map(float, remaining))
+            return numbers, invalid
+        except ValueError:
+            invalid.append(len(numbers))
+            numbers.append(math.nan)
+
+def _format_strings(texts, digits, notation):
+    """
+    批量格式化字符串结果：一次解析全部数值（见 _parse_floats），再在一个循环内
+    按情况格式化，省去逐个调用 format_result 的开销
+    
+    实测对字符串而言这比 NumPy 对象数组与 numpy.char 更快。
+    
+    Returns:
+        list: 格式化结果
+    """
+    numbers = _parse_floats(texts)[0]
+    isfinite = math.isfinite
+    if notation == 'sci':
+        pattern = f'%.{digits - 1}e'
+        return [pattern % num if isfinite(num) else text for text, num in zip(texts, numbers)]
+    if notation == 'eng':
+        return [_engineering(num, digits) if isfinite(num) else text for text, num in zip(texts, numbers)]
+    
+    pattern = f'%.{digits}g'
+    formatted = []
+    append = formatted.append
+    for text, num in zip(texts, numbers):
+        if not isfinite(num):
+            append(text)
+        elif num.is_integer():
+            # 整数字符串原样保留
+            append(text if text.lstrip('-').isdigit() else str(int(num)))
+        elif len(text) > MAX_FLOAT_DIGITS and _significant_digits(text) > MAX_FLOAT_DIGITS:
+            # 有效数字多于双精度的字符串原样保留（有效数字不会多于字符数）
+            append(text)
+        else:
+            append(pattern % num)
+    return formatted
+
+def _format_array(numpy, numbers, digits, notation):
+    """
+    用 NumPy 批量格式化数值数组：用掩码区分整数、非有限值等情况，
+    每种情况用同一格式字符串批量格式化
+    
+    Returns:
+        list: 格式化结果（多维数组按 ravel 顺序）
+    """
+    numbers = numbers.astype(numpy.float64).ravel()
+    formatted = numpy.empty(len(numbers), dtype=object)
+    finite = numpy.isfinite(numbers)
+    if not finite.all():
+        formatted[~finite] = [str(num) for num in numbers[~finite].tolist()]
+    
+    if notation == 'general':
+        integral = finite & (numbers == numpy.floor(numbers))
+        fractional = finite & ~integral
+        formatted[integral] = list(map('%d'.__mod__, numbers[integral].tolist()))
+        formatted[fractional] = list(map(f'%.{digits}g'.__mod__, numbers[fractional].tolist()))
+    elif notation == 'sci':
+        formatted[finite] = list(map(f'%.{digits - 1}e'.__mod__, numbers[finite].tolist()))
+    else:
+        formatted[finite] = [_engineering(num, digits) for num in numbers[finite].tolist()]
+    return formatted.tolist()
+
+def format_results(results, digits=10, notation='general'):
+    """
+    批量格式化计算结果，与逐个调用 format_result 的输出相同
+    
+    字符串结果一次解析全部数值后在一个循环内格式化，相同的结果只格式化一次；
+    安装了 NumPy 时数值数组按掩码整批格式化；混合字符串与数值时逐个处理。
+    
+    Args:
+        results (iterable): 计算结果字符串序列，或数值 NumPy 数组（多维数组按 ravel 顺序）
+        digits (int): 有效数字位数
+        notation (str): 'general' 常规，'sci' 科学计数法，'eng' 工程计数法
+    
+    Returns:
+        list: 格式化后的结果，与输入顺序一致
+    """
+    if notation not in NOTATIONS:
+        raise ValueError(f"未知的计数法 {notation!r}")
+    numpy = _numpy()
+    if numpy is not None and isinstance(results, numpy.ndarray):
+        if results.dtype.kind in 'biuf':
+            return _format_array(numpy, results, digits, notation)
+        results = results.ravel().tolist()
+    results = list(results)
+    
+    unique = _unique_strings(results)
+    if unique is not None:
+        if len(unique) * 2 <= len(results):
+            # 重复很多时只格式化不同的结果
+            table = dict(zip(unique, _format_strings(unique, digits, notation)))
+            return list(map(table.__getitem__, results))
+        return _format_strings(results, digits, notation)
+    
+    cache = {}  # 只缓存字符串：相等的数值（0.0 与 -0.0）格式可能不同
+    formatted = []
+    for result in results:
+        if result.__class__ is not str:
+            formatted.append(format_result(result, digits, notation))
+            continue
+        try:
+            formatted.append(cache[result])
+        except KeyError:
+            value = cache[result] = format_result(result, digits, notation)
+            formatted.append(value)
+    return formatted
+
+def _unique_strings(values):
+    """全是字符串时返回去重后的列表，否则返回 None"""
+    if not _all_strings(values):
+        return None
+    return list(dict.fromkeys(values))
 
 def is_valid_number(s):
     """
@@ -41,4 +225,36 @@ def is_valid_number(s):
         float(s)
         return True
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+
+def are_valid_numbers(values):
+    """
+    批量检查字符串是否为有效数字，与逐个调用 is_valid_number 的结果相同
+    
+    Args:
+        values (iterable): 待检查字符串序列或 NumPy 数组
+    
+    Returns:
+        list: 每个值是否为有效数字，与输入顺序一致
+    """
+    dtype = getattr(values, 'dtype', None)  # NumPy 数组
+    if dtype is not None:
+        if dtype.kind in 'biuf':
+            return [True] * values.size
+        values = values.ravel().tolist()
+    else:
+        values = list(values)
+    
+    unique = _unique_strings(values)
+    if unique is not None and len(unique) * 2 <= len(values):
+        # 重复很多时只检查不同的值
+        table = dict.fromkeys(unique, True)
+        for index in _parse_floats(unique)[1]:
+            table[unique[index]] = False
+        return list(map(table.__getitem__, values))
+    
+    # 整批解析，记下无效值的下标
+    valid = [True] * len(values)
+    for index in _parse_floats(values)[1]:
+        valid[index] = False
+    return valid
\ No newline at end of file